@@ -0,0 +1,70 @@
+"""
+Memory-mappable brain templates
+===============================
+
+This example compares the time needed to load a brain template saved as a
+compressed .npz file (default) and as a directory of memory-mappable arrays.
+
+The memory-mappable layout also stores the adjacency matrix of the mesh, the
+index of each hemisphere and the bounding box so that they don't have to be
+recomputed. Existing .npz templates can be converted once using
+:func:`visbrain.io.convert_brain_template`.
+"""
+import shutil
+from time import time
+
+import numpy as np
+
+from visbrain.objects import BrainObj
+from visbrain.io import (convert_brain_template, path_to_tmp,
+                         read_template_dir, get_data_path)
+from visbrain.utils import mesh_edges
+
+
+n_repeat = 10
+
+###############################################################################
+# Convert the B1 template
+###############################################################################
+# The template is converted into a directory of .npy files (B1.template) saved
+# in the temporary folder.
+
+to_path = path_to_tmp(folder='templates')
+path = convert_brain_template('B1', to_path=to_path)
+
+###############################################################################
+# Load-time benchmark
+###############################################################################
+# Compare the time needed to load vertices, faces, normals and to get the
+# adjacency matrix of the mesh.
+
+
+def load_npz():
+    """Load a .npz template then compute the adjacency."""
+    arch = np.load(get_data_path(folder='templates', file='B1.npz'))
+    vertices, faces, normals = arch['vertices'], arch['faces'], arch['normals']
+    return vertices, faces, normals, mesh_edges(faces)
+
+
+def load_mmap():
+    """Load a memory-mappable template (adjacency is precomputed)."""
+    tpl = read_template_dir(path)
+    return tpl['vertices'], tpl['faces'], tpl['normals'], tpl['adjacency']
+
+
+for name, fcn in [('.npz', load_npz), ('.template', load_mmap)]:
+    t_start = time()
+    for k in range(n_repeat):
+        fcn()
+    t_load = 1000. * (time() - t_start) / n_repeat
+    print("%s : %.2fms per load" % (name, t_load))
+
+###############################################################################
+# Use the converted template
+###############################################################################
+# Templates in the visbrain_data/templates folder (or in the temporary folder)
+# are loaded in priority from the memory-mappable layout.
+
+b_obj = BrainObj('B1')
+b_obj.preview()
+shutil.rmtree(path)
@@ -113,7 +113,7 @@ class BrainCbar(object):
         def _get_connect_fcn():
             kwargs = self.cbqt.cbobjs._objs[name].to_kwargs(True)
             self.connect[name].update_from_dict(kwargs)
-            self.connect[name]._build_line()
+            self.connect[name]._update_cbar()
         return _get_connect_fcn
 
     def _fcn_minmax_connect(self, name):
@@ -122,7 +122,7 @@ class BrainCbar(object):
             self.cbqt.cbobjs._objs[name]._clim = self.connect[name]._minmax
             kwargs = self.cbqt.cbobjs._objs[name].to_kwargs(True)
             self.connect[name].update_from_dict(kwargs)
-            self.connect[name]._build_line()
+            self.connect[name]._update_cbar()
         return _get_minmax_connect_fcn
 
     ###########################################################################
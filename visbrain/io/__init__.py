@@ -9,7 +9,9 @@ from .read_data import *  # noqa
 from .read_sleep import *  # noqa
 from .rw_config import *  # noqa
 from .rw_hypno import *  # noqa
+from .rw_template import *  # noqa
 from .rw_utils import *  # noqa
+from .sleep_source import *  # noqa
 from .write_data import *  # noqa
 from .write_image import *  # noqa
 from .write_table import *  # noqa
@@ -8,6 +8,7 @@ This file contain functions to load :
 - CSV (*.csv)
 - JSON (*.json)
 - NIFTI
+- MNE source estimates (*.stc and *.w)
 """
 import numpy as np
 # import os
@@ -16,7 +17,8 @@ from ..utils.transform import array_to_stt
 from .dependencies import is_nibabel_installed
 
 __all__ = ('read_mat', 'read_pickle', 'read_npy', 'read_npz',
-           'read_txt', 'read_csv', 'read_json', 'read_nifti', 'read_stc')
+           'read_txt', 'read_csv', 'read_json', 'read_nifti', 'read_stc',
+           'read_w')
 
 
 def read_mat(path, vars=None):
@@ -89,19 +91,34 @@ def read_nifti(path, hdr_as_array=False):
     return vol, img.header, transform
 
 
-def read_stc(path):
+def read_stc(path, mmap=False, times=None, vertices=None):
     """Read an STC file from the MNE package.
 
     STC files contain activations or source reconstructions
     obtained from EEG and MEG data.
 
-    This function is a copy from the PySurfer package. See :
+    The header is parsed using a few reads and the data block (big-endian
+    float32 stored time point after time point) is memory-mapped. Hence,
+    only the requested time points and vertices are read from the disk.
+
+    Adapted from the PySurfer package. See :
     https://github.com/nipy/PySurfer/blob/master/surfer/io.py
 
     Parameters
     ----------
     path : string
         Path to STC file
+    mmap : bool | False
+        If True, the data are a read-only view of the memory-mapped file
+        (opening a file is then done in constant time whatever its size).
+        Time points and vertices are read on demand when the data are
+        sliced. If a subset of vertices is selected, only those vertices are
+        loaded in memory.
+    times : int | slice | array_like | None
+        Index of the time points to read. If None, all time points are read.
+    vertices : array_like | None
+        Vertex indices (as in the vertices of the file) to read. If None, all
+        vertices are read.
 
     Returns
     -------
@@ -110,40 +127,75 @@ def read_stc(path):
            tmin           The first time point of the data in seconds
            tstep          Time between frames in seconds
            vertices       vertex indices (0 based)
+           times          Time of each time point of the data in seconds
            data           The data matrix (nvert * ntime)
     """
-    fid = open(path, 'rb')
-
-    stc = dict()
-
-    fid.seek(0, 2)  # go to end of file
-    file_length = fid.tell()
-    fid.seek(0, 0)  # go to beginning of file
-
-    # read tmin in ms
-    stc['tmin'] = float(np.fromfile(fid, dtype=">f4", count=1))
-    stc['tmin'] /= 1000.0
-
-    # read sampling rate in ms
-    stc['tstep'] = float(np.fromfile(fid, dtype=">f4", count=1))
-    stc['tstep'] /= 1000.0
+    with open(path, 'rb') as fid:
+        # tmin and tstep (in ms) and number of vertices :
+        tmin, tstep = np.frombuffer(fid.read(8), dtype='>f4')
+        n_vertices = int(np.frombuffer(fid.read(4), dtype='>u4')[0])
+        # Vertices and number of time points :
+        hdr = np.frombuffer(fid.read(4 * (n_vertices + 1)), dtype='>u4')
+        src_vertices, n_times = hdr[:-1].astype(np.int64), int(hdr[-1])
+        fid.seek(0, 2)
+        file_length = fid.tell()
+    offset = 4 * (n_vertices + 4)
+    if file_length - offset != 4 * n_vertices * n_times:
+        raise ValueError('incorrect stc file size')
 
-    # read number of vertices/sources
-    vertices_n = int(np.fromfile(fid, dtype=">u4", count=1))
+    stc = dict(tmin=float(tmin) / 1000., tstep=float(tstep) / 1000.)
+    # Data block of shape (n_times, n_vertices) :
+    data = np.memmap(path, dtype='>f4', mode='r', offset=offset,
+                     shape=(n_times, n_vertices))
+    # Time points :
+    if times is None:
+        times = slice(None)
+    t_idx = np.arange(n_times)[times]
+    data = data[times, ...]
+    if not isinstance(times, slice):  # integer or fancy indexing
+        data = data.reshape(len(np.atleast_1d(t_idx)), n_vertices)
+    stc['times'] = stc['tmin'] + np.atleast_1d(t_idx) * stc['tstep']
+    # Vertices :
+    if vertices is not None:
+        vertices = np.asarray(vertices).ravel()
+        sorter = np.argsort(src_vertices, kind='mergesort')
+        pos = np.searchsorted(src_vertices, vertices, sorter=sorter)
+        pos = sorter[np.clip(pos, 0, n_vertices - 1)]
+        if not np.array_equal(src_vertices[pos], vertices):
+            raise ValueError("Some vertices are not in the stc file.")
+        data, src_vertices = data[:, pos], src_vertices[pos]
+    stc['vertices'] = src_vertices
+    stc['data'] = data.T if mmap else data.astype(np.float32).T
+    return stc
 
-    # read the source vector
-    stc['vertices'] = np.fromfile(fid, dtype=">u4", count=vertices_n)
 
-    # read the number of timepts
-    data_n = int(np.fromfile(fid, dtype=">u4", count=1))
+def read_w(path):
+    """Read a w file from the MNE package.
 
-    if ((file_length / 4 - 4 - vertices_n) % (data_n * vertices_n)) != 0:
-        raise ValueError('incorrect stc file size')
+    w files contain data defined on a subset of vertices (e.g a single time
+    point of an activation). Records (3-bytes vertex index and big-endian
+    float32 value) are read at once.
 
-    # read the data matrix
-    stc['data'] = np.fromfile(fid, dtype=">f4", count=vertices_n * data_n)
-    stc['data'] = stc['data'].reshape([data_n, vertices_n]).T
+    Parameters
+    ----------
+    path : string
+        Path to the w file.
 
-    # close the file
-    fid.close()
-    return stc
+    Returns
+    -------
+    data : dict
+        The w structure. It has the following keys:
+           vertices       vertex indices (0 based)
+           data           The data vector (nvert,)
+    """
+    with open(path, 'rb') as fid:
+        hdr = np.frombuffer(fid.read(5), dtype=np.uint8).astype(np.int64)
+        # Skip two bytes then the number of vertices (3-bytes integer) :
+        n_vertices = (hdr[2] << 16) + (hdr[3] << 8) + hdr[4]
+        dt = np.dtype([('vertex', 'u1', (3,)), ('data', '>f4')])
+        rec = np.frombuffer(fid.read(dt.itemsize * n_vertices), dtype=dt)
+    if len(rec) != n_vertices:
+        raise ValueError('incorrect w file size')
+    vert = rec['vertex'].astype(np.int64)
+    vertices = (vert[:, 0] << 16) + (vert[:, 1] << 8) + vert[:, 2]
+    return dict(vertices=vertices, data=rec['data'].astype(np.float32))
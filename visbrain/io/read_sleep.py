@@ -19,6 +19,8 @@ from .rw_hypno import (read_hypno, oversample_hypno)
 from .dialog import dialog_load
 from .mneio import mne_switch
 from .dependencies import is_mne_installed
+from .sleep_source import (SleepDataSource, ArraySource, MemmapReader,
+                           CachedSource)
 from ..utils import get_dsf, vispy_array
 from ..io import merge_annotations
 from ..config import PROFILER
@@ -50,8 +52,10 @@ class ReadSleepData(object):
             # ---------- USE SLEEP or MNE ----------
             # Find file extension :
             file, ext = get_file_ext(data)
-            # Force to use MNE if preload is False :
-            use_mne = True if not preload else use_mne
+            # Force to use MNE if preload is False (except for memory-mapped
+            # formats) :
+            lazy_ext = ['.eeg', '.vhdr']
+            use_mne = True if not (preload or ext in lazy_ext) else use_mne
             # Get if the file has to be loaded using Sleep or MNE python :
             sleep_ext = ['.eeg', '.vhdr', '.edf', '.trc', '.rec']
             use_mne = True if ext not in sleep_ext else use_mne
@@ -66,9 +70,12 @@ class ReadSleepData(object):
                 args = mne_switch(file, ext, downsample, **kwargs_mne)
             else:  # Load using Sleep functions
                 logger.debug("Load file using Sleep")
-                args = sleep_switch(file, ext, downsample)
+                args = sleep_switch(file, ext, downsample, preload)
             # Get output arguments :
             (sf, downsample, dsf, data, channels, n, offset, annot) = args
+            # Memory-mapped data are read through a cache of blocks :
+            if isinstance(data, MemmapReader):
+                data = CachedSource(data)
             info = ("Data successfully loaded (%s):"
                     "\n- Sampling-frequency : %.2fHz"
                     "\n- Number of time points (before down-sampling): %i"
@@ -91,10 +98,22 @@ class ReadSleepData(object):
             dsf, downsample = get_dsf(downsample, sf)
             n = data.shape[1]
             data = data[:, ::dsf]
+        elif isinstance(data, SleepDataSource):  # data source is defined
+            sf = data.sf if sf is None else sf
+            if not isinstance(sf, (int, float)):
+                raise ValueError("The sampling frequency must either be "
+                                 "defined by the data source or using the sf "
+                                 "parameter.")
+            file = annot = None
+            offset = datetime.time(0, 0, 0)
+            dsf, downsample = 1, sf
+            n = data.shape[1]
+            channels = data.channels if channels is None else channels
         else:
             raise IOError("The data should either be a string which refer to "
-                          "the path of a file or an array of raw data of shape"
-                          " (n_electrodes, n_time_points).")
+                          "the path of a file, an array of raw data of shape"
+                          " (n_electrodes, n_time_points) or a data source "
+                          "(see SleepDataSource).")
 
         # Keep variables :
         self._file = file
@@ -192,14 +211,22 @@ class ReadSleepData(object):
                 hypno = np.zeros((npts,), dtype=np.float32)
 
         # ---------- SCALING ----------
-        # Check amplitude of the data and if necessary apply re-scaling
-        if np.abs(np.ptp(data, 0).mean()) < 0.1:
+        # Check amplitude of the data and if necessary apply re-scaling (for
+        # data sources, only the first minute is checked) :
+        is_lazy = isinstance(data, SleepDataSource)
+        data_chk = data[:, 0:int(60 * self._sf)] if is_lazy else data
+        if np.abs(np.ptp(data_chk, 0).mean()) < 0.1:
             warn("Wrong data amplitude for Sleep software.")
             data *= 1e6
 
         # ---------- CONVERSION ----------=
-        # Convert data and hypno to be contiguous and float 32 (for vispy):
-        self._data = vispy_array(data)
+        # Convert data and hypno to be contiguous and float 32 (for vispy).
+        # Data are then only accessed through a data source (the sampling
+        # frequency and channels of a user data source are left untouched and
+        # kept by the Sleep instance) :
+        if not is_lazy:
+            data = ArraySource(vispy_array(data), self._sf, chanc)
+        self._data = data
         self._hypno = vispy_array(hypno)
         self._time = vispy_array(time)
         self._channels = chanc
@@ -208,7 +235,7 @@ class ReadSleepData(object):
         PROFILER("Check data", level=1)
 
 
-def sleep_switch(file, ext, downsample):
+def sleep_switch(file, ext, downsample, preload=True):
     """Switch between sleep data files.
 
     Parameters
@@ -219,6 +246,9 @@ def sleep_switch(file, ext, downsample):
         Extension name (e.g. '.eeg')
     downsample : int
         Down-sampling frequency.
+    preload : bool | True
+        Load data into memory. If False, BrainVision and ELAN files are
+        memory-mapped and data are read on demand (see MemmapReader).
 
     Returns
     -------
@@ -243,10 +273,10 @@ def sleep_switch(file, ext, downsample):
     path = file + ext
 
     if ext == '.vhdr':  # BrainVision
-        return read_bva(path, downsample)
+        return read_bva(path, downsample, preload=preload)
 
     if ext == '.eeg':  # Elan
-        return read_elan(path, downsample)
+        return read_elan(path, downsample, preload=preload)
 
     elif ext in ['.edf', '.rec']:  # European Data Format
         return read_edf(path, downsample)
@@ -424,15 +454,15 @@ def read_trc(path, downsample):
     return sf, downsample, dsf, data[:, ::dsf], chan, n, start_time, None
 
 
-def read_bva(path, downsample, read_markers=False):
+def read_bva(path, downsample, read_markers=False, preload=True):
     """Read data from a BrainVision (*.vhdr) file.
 
     Poor man's version of https: // gist.github.com / breuderink / 6266871
 
     Assumes that data are saved with the following parameters:
         - Data format: Binary
-        - Orientation: Multiplexed
-        - Format: int16
+        - Orientation: Multiplexed or Vectorized
+        - Format: int16, int32 or float32
 
     Parameters
     ----------
@@ -443,6 +473,9 @@ def read_bva(path, downsample, read_markers=False):
         Down-sampling frequency.
     read_markers : bool | False
         Import markers from the .vmrk files as annotations
+    preload : bool | True
+        Load data into memory. If False, a MemmapReader is returned instead
+        and data are read on demand.
 
     Returns
     -------
@@ -467,6 +500,7 @@ def read_bva(path, downsample, read_markers=False):
     ent = np.genfromtxt(path, delimiter='\n', usecols=[0],
                         dtype=None, skip_header=0, encoding='utf-8')
 
+    marker_path = ''
     for item in ent:
         if 'DataFile=' in item:
             data_file = item.split('=')[1]
@@ -489,8 +523,11 @@ def read_bva(path, downsample, read_markers=False):
 
     # Check binary format
     assert "BINARY" in data_format
-    assert "INT_16" in binary_format
-    assert "MULTIPLEXED" in data_orient
+    formats = {'INT_16': '<i2', 'INT_32': '<i4', 'IEEE_FLOAT_32': '<f4'}
+    dtype = [v for k, v in formats.items() if k in binary_format]
+    assert len(dtype) == 1, "%s not supported" % binary_format
+    orientation = data_orient.strip().lower()
+    assert orientation in ['multiplexed', 'vectorized']
 
     # Extract channel labels and resolution
     start_label = np.array(np.where(np.char.find(ent, 'Ch1=') == 0)).min()
@@ -504,6 +541,7 @@ def read_bva(path, downsample, read_markers=False):
     chan = np.array(list(chan.values())).flatten()
 
     # Read marker file (if present) to extract recording time
+    start_time, anot = datetime.time(0, 0, 0), None
     if os.path.isfile(marker_path):
         vmrk = np.genfromtxt(marker_path, delimiter='\n', usecols=[0],
                              dtype=None, skip_header=0, encoding='utf-8')
@@ -535,27 +573,21 @@ def read_bva(path, downsample, read_markers=False):
         else:
             anot = None
 
-    with io.open(data_path, 'rb') as f:
-        raw = f.read()
-        size = int(len(raw) / 2)
-
-        ints = np.ndarray((n_chan, int(size / n_chan)),
-                          dtype='<i2', order='F', buffer=raw)
-
-        data = np.float32(np.diag(resolution)).dot(ints)
-
-    # Get original signal length :
-    n = data.shape[1]
-
     # Get down-sample factor :
     sf = float(sf)
     chan = list(chan)
     dsf, downsample = get_dsf(downsample, sf)
 
-    return sf, downsample, dsf, data[:, ::dsf], chan, n, start_time, anot
+    # Calibrated data are read (and down-sampled) on demand :
+    data = MemmapReader(data_path, n_chan, dtype=dtype[0],
+                        orientation=orientation, gain=resolution, dsf=dsf)
+    n = data.n_samples
+    data = data if not preload else data[:, :]
 
+    return sf, downsample, dsf, data, chan, n, start_time, anot
 
-def read_elan(path, downsample):
+
+def read_elan(path, downsample, preload=True):
     """Read data from a ELAN (eeg) file.
 
     Elan format specs: http: // elan.lyon.inserm.fr/
@@ -566,6 +598,9 @@ def read_elan(path, downsample):
         Filename(with full path) to Elan .eeg file
     downsample : int
         Down-sampling frequency.
+    preload : bool | True
+        Load data into memory. If False, a MemmapReader is returned instead
+        and data are read on demand.
 
     Returns
     -------
@@ -595,10 +630,8 @@ def read_elan(path, downsample):
     eeg_version = ent[0]
 
     if eeg_version == 'V2':
-        nb_oct = 2
         formread = '>i2'
     elif eeg_version == 'V3':
-        nb_oct = 4
         formread = '>i4'
 
     # Sampling rate
@@ -618,7 +651,6 @@ def read_elan(path, downsample):
 
     # Last 2 channels do not contain data
     nb_chan_data = nb_chan - 2
-    chan_list = slice(nb_chan_data)
     chan = ent[10:10 + nb_chan_data]
 
     # Gain
@@ -636,26 +668,16 @@ def read_elan(path, downsample):
         max_num = float(ent[offset4 + i])
 
         gain[i - 1] = (max_an - min_an) / (max_num - min_num)
-    if gain.dtype != np.float32:
-        gain = gain.astype(np.float32, copy=False)
-
-    # Load memmap
-    nb_bytes = os.path.getsize(path)
-    nb_samples = int(nb_bytes / (nb_oct * nb_chan))
-
-    m_raw = np.memmap(path, dtype=formread, mode='r',
-                      shape=(nb_chan, nb_samples), order={'F'})
-
-    # Get original signal length :
-    n = m_raw.shape[1]
 
     # Get down-sample factor :
     sf = float(sf)
     chan = list(chan)
     dsf, downsample = get_dsf(downsample, sf)
 
-    # Multiply by gain :
-    data = m_raw[chan_list, ::dsf] * \
-        gain[chan_list][..., np.newaxis]
+    # Calibrated data are read (and down-sampled) on demand :
+    data = MemmapReader(path, nb_chan, dtype=formread, gain=gain,
+                        picks=np.arange(nb_chan_data), dsf=dsf)
+    n = data.n_samples
+    data = data if not preload else data[:, :]
 
     return sf, downsample, dsf, data, chan, n, start_time, None
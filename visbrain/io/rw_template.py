@@ -0,0 +1,188 @@
+"""Read and write memory-mappable brain templates.
+
+A template is saved as a directory (<name>.template) of uncompressed .npy
+files that can be loaded using np.load(..., mmap_mode='r'). Hence, loading a
+template is done in constant time and vertices are paged in on demand. The
+directory contains :
+
+- meta.json : version, shapes, bounding box, number of levels / projections
+- vertices.npy, faces.npy, normals.npy : the mesh
+- lr_index.npy : left hemisphere boolean index (inferred if not provided)
+- left_index.npy, right_index.npy : vertex index of each hemisphere
+- adjacency_indptr.npy, adjacency_indices.npy, adjacency_data.npy : CSR
+  adjacency matrix of the mesh (see utils.mesh_edges)
+- level<k>_vertices.npy, level<k>_faces.npy : optional lower resolution
+  levels of the mesh
+- projection<i>_<key>.npy : optional precomputed projection operators
+"""
+import json
+import logging
+import os
+
+import numpy as np
+from scipy import sparse
+
+from .path import (get_files_in_folders, path_to_visbrain_data,
+                   get_data_path, path_to_tmp)
+from ..utils.mesh import convert_meshdata, mesh_edges
+
+logger = logging.getLogger('visbrain')
+
+__all__ = ['write_template_dir', 'read_template_dir',
+           'convert_brain_template']
+
+TEMPLATE_VERSION = 1
+TEMPLATE_EXT = '.template'
+
+
+def write_template_dir(path, vertices, faces, normals=None, lr_index=None,
+                       projections=None, levels=None):
+    """Write a brain template as a directory of .npy files.
+
+    Parameters
+    ----------
+    path : string
+        Path to the template directory (e.g 'B1.template').
+    vertices : array_like
+        Vertices of the template of shape (N, 3).
+    faces : array_like
+        Faces of the template of shape (M, 3).
+    normals : array_like | None
+        The normals of the template, with the same shape as vertices.
+    lr_index : array_like | None
+        Left hemisphere boolean index of shape (N,). If None, vertices with
+        x lower than the mean are considered as belonging to the left
+        hemisphere.
+    projections : list | None
+        List of precomputed projection operators (see
+        BrainObj.add_projection).
+    levels : list | None
+        List of lower resolution levels of the mesh. Each level is a tuple
+        (vertices, faces).
+    """
+    vertices, faces, normals = convert_meshdata(vertices, faces, normals)
+    if lr_index is None:
+        lr_index = vertices[:, 0] <= vertices[:, 0].mean()
+    lr_index = np.asarray(lr_index, dtype=bool)
+    adj = mesh_edges(faces).tocsr()
+    arrays = dict(vertices=vertices, faces=faces, normals=normals,
+                  lr_index=lr_index, left_index=np.flatnonzero(lr_index),
+                  right_index=np.flatnonzero(~lr_index),
+                  adjacency_indptr=adj.indptr,
+                  adjacency_indices=adj.indices, adjacency_data=adj.data)
+    for k, (v, f) in enumerate(levels or []):
+        arrays['level%i_vertices' % k] = np.asarray(v, dtype=np.float32)
+        arrays['level%i_faces' % k] = np.asarray(f, dtype=np.uint32)
+    for i, op in enumerate(projections or []):
+        arrays.update({'projection%i_%s' % (i, k): np.asarray(v) for k, v in
+                       op.items()})
+    meta = dict(version=TEMPLATE_VERSION, n_vertices=len(vertices),
+                n_faces=len(faces), n_levels=len(levels or []),
+                n_projections=len(projections or []),
+                bbox=[vertices.min(0).tolist(), vertices.max(0).tolist()])
+    # Save arrays then metadata (a directory without meta.json is invalid) :
+    if not os.path.isdir(path):
+        os.mkdir(path)
+    for k, v in arrays.items():
+        np.save(os.path.join(path, k + '.npy'), v)
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    logger.info("Brain template saved (%s)." % path)
+
+
+def read_template_dir(path, mmap_mode='r'):
+    """Read a brain template saved as a directory of .npy files.
+
+    Parameters
+    ----------
+    path : string
+        Path to the template directory.
+    mmap_mode : {None, 'r', 'r+', 'c'}
+        Memory-map mode used to load arrays (see np.load).
+
+    Returns
+    -------
+    template : dict
+        Dictionary with the metadata (version, n_vertices, n_faces, bbox...),
+        the arrays of the mesh (vertices, faces, normals, lr_index,
+        left_index, right_index), the sparse adjacency matrix (adjacency),
+        the list of levels (tuples (vertices, faces)) and the list of
+        projection operators (projections).
+    """
+    with open(os.path.join(path, 'meta.json')) as f:
+        tpl = json.load(f)
+    if tpl['version'] > TEMPLATE_VERSION:
+        raise ValueError("Template %s has been saved with a newer version of "
+                         "visbrain (version %i)" % (path, tpl['version']))
+
+    def _load(name):
+        return np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode)
+
+    for k in ['vertices', 'faces', 'normals', 'lr_index', 'left_index',
+              'right_index']:
+        tpl[k] = _load(k)
+    n = tpl['n_vertices']
+    tpl['adjacency'] = sparse.csr_matrix((_load('adjacency_data'),
+                                          _load('adjacency_indices'),
+                                          _load('adjacency_indptr')),
+                                         shape=(n, n))
+    tpl['levels'] = [(_load('level%i_vertices' % k),
+                      _load('level%i_faces' % k)) for k in range(
+                          tpl['n_levels'])]
+    tpl['projections'] = []
+    files = os.listdir(path)
+    for i in range(tpl['n_projections']):
+        pre = 'projection%i_' % i
+        op = {k[len(pre):-4]: _load(k[:-4]) for k in files if k.startswith(
+            pre)}
+        op['radius'] = float(op['radius'])
+        op['contribute'] = bool(op['contribute'])
+        tpl['projections'].append(op)
+    return tpl
+
+
+def convert_brain_template(name, to_path=None, levels=None):
+    """Convert a .npz brain template into a memory-mappable template.
+
+    Parameters
+    ----------
+    name : string
+        Name of the template (e.g 'B1') or path to the .npz file.
+    to_path : string | None
+        Folder where to save the template directory. If None, the template is
+        saved in the visbrain_data/templates folder.
+    levels : list | None
+        List of lower resolution levels of the mesh. Each level is a tuple
+        (vertices, faces).
+
+    Returns
+    -------
+    path : string
+        Path to the template directory.
+    """
+    if not os.path.isfile(name):
+        folders = (path_to_visbrain_data(folder='templates'),
+                   get_data_path(folder='templates'),
+                   path_to_tmp(folder='templates'))
+        files = get_files_in_folders(*folders, file=name + '.npz')
+        if not files:
+            raise ValueError("No template %s found." % name)
+        name = files[0]
+    arch = np.load(name, allow_pickle=True)  # lr_index can be None
+    kw = dict(normals=arch['normals'], levels=levels)
+    if 'lr_index' in arch.keys() and arch['lr_index'].ndim:
+        kw['lr_index'] = arch['lr_index']
+    # Precomputed projection operators :
+    keys = [k for k in arch.keys() if k.startswith('projection')]
+    n_proj = len([k for k in keys if k.endswith('_rows')])
+    kw['projections'] = []
+    for i in range(n_proj):
+        pre = 'projection%i_' % i
+        kw['projections'].append({k[len(pre):]: arch[k] for k in keys if
+                                  k.startswith(pre)})
+    if to_path is None:
+        to_path = path_to_visbrain_data(folder='templates')
+    file = os.path.splitext(os.path.split(name)[1])[0] + TEMPLATE_EXT
+    path = os.path.join(to_path, file)
+    write_template_dir(path, arch['vertices'], arch['faces'], **kw)
+    return path
@@ -0,0 +1,375 @@
+"""Data sources for sleep data.
+
+A data source is an object that can be indexed like an array of shape
+(n_channels, n_points) and that contains the sampling frequency and the
+channel names. This file contain :
+- SleepDataSource : base class of data sources
+- ArraySource : in-memory data
+- MemmapReader : memory-mapped binary files (data are read on demand)
+- CachedSource : LRU cache of fixed-size blocks over another source
+"""
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from ..utils.physio import chunk_stats
+
+__all__ = ('SleepDataSource', 'ArraySource', 'MemmapReader', 'CachedSource')
+
+
+class SleepDataSource(object):
+    """Base class of sleep data sources.
+
+    Sources are indexed using orthogonal indexing (i.e. source[rows, cols]
+    is the (rows x cols) block) and always return float32 data. Subclasses
+    only have to implement the _read(rows, cols) method where rows is a
+    vector of channel indices and cols is either a slice with a positive
+    step or a vector of time indices.
+
+    Parameters
+    ----------
+    shape : tuple
+        Shape of the data (n_channels, n_points).
+    sf : float | None
+        The sampling frequency.
+    channels : list | None
+        List of channel names.
+    chunk : int | 100000
+        Number of time points that are loaded at once when computing
+        statistics over the whole recording (min, max, mean, std). Those
+        statistics are computed once and then cached.
+    """
+
+    def __init__(self, shape, sf=None, channels=None, chunk=100000):
+        """Init."""
+        self.shape = tuple([int(k) for k in shape])
+        self.sf = sf
+        self.channels = channels
+        self._chunk = chunk
+        self._stats = None
+
+    def __len__(self):
+        """Get the number of channels."""
+        return self.shape[0]
+
+    def __array__(self, dtype=None):
+        """Load the whole data."""
+        data = self[:, :]
+        return data if dtype is None else data.astype(dtype)
+
+    def __getitem__(self, key):
+        """Read a block of data."""
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        rows = np.arange(self.shape[0])[self._outer(rows)]
+        cols = slice(None) if cols is Ellipsis else self._outer(cols)
+        if isinstance(cols, slice):
+            start, stop, step = cols.indices(self.shape[1])
+            if step < 0:
+                cols = np.arange(start, stop, step)
+            else:
+                cols = slice(start, max(start, stop), step)
+            data = self._read(np.atleast_1d(rows), cols)
+        else:
+            cols = np.arange(self.shape[1])[cols]
+            data = self._read(np.atleast_1d(rows), np.atleast_1d(cols))
+        # Drop dimensions of integer indices :
+        is_int = [not (isinstance(k, slice) or np.ndim(k)) for k in (rows,
+                                                                     cols)]
+        return data[tuple([0 if k else slice(None) for k in is_int])]
+
+    def _read(self, rows, cols):
+        """Read a block of data (rows x cols)."""
+        raise NotImplementedError
+
+    def read(self, rows=slice(None), sl=slice(None)):
+        """Read a window of data.
+
+        Parameters
+        ----------
+        rows : int | slice | array_like
+            Channels to read (integer, slice, indices or boolean mask).
+        sl : int | slice | array_like
+            Time points to read.
+
+        Returns
+        -------
+        data : array_like
+            The float32 window of data.
+        """
+        return self[rows, sl]
+
+    @staticmethod
+    def _outer(idx):
+        """Convert indices from np.ix_ into 1D indices."""
+        if isinstance(idx, np.ndarray) and (idx.ndim == 2):
+            return idx.ravel()
+        return idx
+
+    def stats(self):
+        """Get the statistics of each channel (see chunk_stats).
+
+        Statistics are computed in a single pass over the data the first time
+        this method is called. Then, cached statistics are returned.
+
+        Returns
+        -------
+        stats : dict
+            Dictionary with the 'min', 'max', 'mean', 'std' and 'dist' of each
+            channel.
+        """
+        if self._stats is None:
+            self._stats = chunk_stats(self, self._chunk)
+        return {k: i.copy() for k, i in self._stats.items()}
+
+    def _scale_stats(self, value):
+        """Scale cached statistics (instead of computing them again)."""
+        if self._stats is None:
+            return None
+        st = self._stats
+        value = np.float32(value)
+        lo, hi = st['min'] * value, st['max'] * value
+        st['min'], st['max'] = np.minimum(lo, hi), np.maximum(lo, hi)
+        st['mean'] = st['mean'] * value
+        st['std'] = st['std'] * np.abs(value)
+        st['dist'] = st['dist'] * np.abs(value)
+
+    def _reduce(self, key, axis):
+        """Get a statistic along the time axis."""
+        if axis not in [1, -1]:
+            raise ValueError("Only the time axis (1) is supported.")
+        return self.stats()[key]
+
+    def min(self, axis=1):
+        """Minimum of each channel."""
+        return self._reduce('min', axis)
+
+    def max(self, axis=1):
+        """Maximum of each channel."""
+        return self._reduce('max', axis)
+
+    def mean(self, axis=1):
+        """Mean of each channel."""
+        return self._reduce('mean', axis)
+
+    def std(self, axis=1):
+        """Standard deviation of each channel."""
+        return self._reduce('std', axis)
+
+    # ----------- NDIM -----------
+    @property
+    def ndim(self):
+        """Get the ndim value."""
+        return 2
+
+    # ----------- DTYPE -----------
+    @property
+    def dtype(self):
+        """Get the dtype value."""
+        return np.dtype(np.float32)
+
+
+class ArraySource(SleepDataSource):
+    """In-memory data source.
+
+    Parameters
+    ----------
+    data : array_like
+        Array of data of shape (n_channels, n_points).
+    sf : float | None
+        The sampling frequency.
+    channels : list | None
+        List of channel names.
+    """
+
+    def __init__(self, data, sf=None, channels=None):
+        """Init."""
+        self._data = np.asarray(data, dtype=np.float32)
+        SleepDataSource.__init__(self, self._data.shape, sf, channels)
+
+    def __imul__(self, value):
+        """Scale the data."""
+        self._data *= value
+        self._scale_stats(value)
+        return self
+
+    def _read(self, rows, cols):
+        """Read a block of data (rows x cols)."""
+        if isinstance(cols, slice):
+            return self._data[rows, cols]
+        return self._data[np.ix_(rows, cols)]
+
+
+class MemmapReader(SleepDataSource):
+    """Lazy reader of calibrated windows of a binary recording.
+
+    The file is memory-mapped and only the requested channels / time points
+    are read, down-sampled and calibrated (float32). Hence, opening a
+    recording is done in constant time and data are paged in on demand
+    (e.g. when scrolling through the Sleep GUI).
+
+    Parameters
+    ----------
+    path : string
+        Path to the binary file.
+    n_chan : int
+        Number of channels stored in the file.
+    dtype : string | '<i2'
+        Data type of the file (e.g '<i2', '>i4', '<f4').
+    orientation : {'multiplexed', 'vectorized'}
+        Use 'multiplexed' if samples of all channels are interleaved
+        (ch1_t1, ch2_t1, ..., ch1_t2, ...) or 'vectorized' if channels are
+        stored one after the other.
+    gain : array_like | None
+        Calibration gain of each channel of shape (n_chan,).
+    picks : array_like | None
+        Indices of the channels to read (e.g. to exclude non-data channels).
+        By default, all channels are read.
+    dsf : int | 1
+        Down-sampling factor. Time points are decimated on the fly.
+    header : int | 0
+        Number of bytes to skip at the beginning of the file.
+    sf : float | None
+        The sampling frequency (after down-sampling).
+    channels : list | None
+        List of channel names.
+    chunk : int | 100000
+        Number of time points that are loaded at once when computing
+        statistics over the whole recording (min, max, mean, std).
+    """
+
+    def __init__(self, path, n_chan, dtype='<i2', orientation='multiplexed',
+                 gain=None, picks=None, dsf=1, header=0, sf=None,
+                 channels=None, chunk=100000):
+        """Init."""
+        assert orientation in ['multiplexed', 'vectorized']
+        dtype = np.dtype(dtype)
+        n_samples = (os.path.getsize(path) - header) // (
+            dtype.itemsize * n_chan)
+        if orientation == 'multiplexed':
+            self._raw = np.memmap(path, dtype=dtype, mode='r', offset=header,
+                                  shape=(n_samples, n_chan)).T
+        else:
+            self._raw = np.memmap(path, dtype=dtype, mode='r', offset=header,
+                                  shape=(n_chan, n_samples))
+        if picks is None:
+            picks = np.arange(n_chan)
+        self._picks = np.asarray(picks, dtype=int)
+        if gain is None:
+            gain = np.ones((n_chan,))
+        self._gain = np.asarray(gain, dtype=np.float32)[self._picks]
+        self._dsf = int(dsf)
+        self._n_samples = n_samples
+        shape = (len(self._picks), -(-n_samples // self._dsf))
+        SleepDataSource.__init__(self, shape, sf, channels, chunk)
+
+    def __imul__(self, value):
+        """Scale the data (only the calibration gain is modified)."""
+        self._gain = self._gain * np.float32(value)
+        self._scale_stats(value)
+        return self
+
+    def _read(self, rows, cols):
+        """Read and calibrate a block of data (rows x cols)."""
+        chans = self._picks[rows]
+        # Decimated time points -> sample indices :
+        if isinstance(cols, slice):
+            cols = slice(cols.start * self._dsf, cols.stop * self._dsf,
+                         cols.step * self._dsf)
+            data = self._raw[chans, cols]
+        else:
+            data = self._raw[np.ix_(chans, cols * self._dsf)]
+        data = data.astype(np.float32)
+        data *= self._gain[rows, np.newaxis]
+        return data
+
+    # ----------- DSF -----------
+    @property
+    def dsf(self):
+        """Get the dsf value."""
+        return self._dsf
+
+    # ----------- N_SAMPLES -----------
+    @property
+    def n_samples(self):
+        """Get the n_samples value."""
+        return self._n_samples
+
+
+class CachedSource(SleepDataSource):
+    """LRU cache of fixed-size blocks of time over another data source.
+
+    Blocks contain all channels and the least recently used blocks are
+    dropped when the cache is full. Hence, the memory used by the cache is
+    bounded by n_channels * block_size * n_blocks values, whatever the
+    length of the recording. Reads spanning more than n_blocks blocks (e.g.
+    a detection over a whole channel) bypass the cache.
+
+    Parameters
+    ----------
+    source : SleepDataSource
+        The data source to cache (e.g. a MemmapReader).
+    block_size : int | 16384
+        Number of time points per block.
+    n_blocks : int | 16
+        Maximum number of blocks kept in memory.
+    """
+
+    def __init__(self, source, block_size=16384, n_blocks=16):
+        """Init."""
+        self._source = source
+        self._block_size = int(block_size)
+        self._n_blocks = int(n_blocks)
+        self._cache = OrderedDict()
+        SleepDataSource.__init__(self, source.shape, source.sf,
+                                 source.channels)
+
+    def __imul__(self, value):
+        """Scale the data (the cache is cleared)."""
+        self._source *= value
+        self._cache.clear()
+        return self
+
+    def _get_block(self, num):
+        """Get a block of data, from the cache if possible."""
+        if num in self._cache:
+            self._cache.move_to_end(num)
+        else:
+            sl = slice(num * self._block_size, (num + 1) * self._block_size)
+            self._cache[num] = self._source[:, sl]
+            if len(self._cache) > self._n_blocks:
+                self._cache.popitem(last=False)
+        return self._cache[num]
+
+    def _read(self, rows, cols):
+        """Read a block of data (rows x cols)."""
+        b = self._block_size
+        if isinstance(cols, slice):
+            if cols.stop <= cols.start:
+                return np.zeros((len(rows), 0), dtype=np.float32)
+            blocks = np.arange(cols.start // b, (cols.stop - 1) // b + 1)
+        else:
+            blocks = np.unique(cols // b)
+        if len(blocks) > self._n_blocks:
+            return self._source[rows, cols]
+        data = np.concatenate([self._get_block(k)[rows, :] for k in blocks],
+                              axis=1)
+        # Indices inside the concatenated blocks :
+        if isinstance(cols, slice):
+            return data[:, cols.start - blocks[0] * b:cols.stop - blocks[
+                0] * b:cols.step]
+        return data[:, np.searchsorted(blocks, cols // b) * b + cols % b]
+
+    def stats(self):
+        """Get the statistics of each channel.
+
+        Statistics are cached by the underlying source (i.e. computed once
+        per file) and the blocks of the cache are left untouched.
+        """
+        return self._source.stats()
+
+    # ----------- SOURCE -----------
+    @property
+    def source(self):
+        """Get the source value."""
+        return self._source
@@ -1,10 +1,22 @@
 """Test function in read_data.py."""
 import pytest
+import numpy as np
 
 from visbrain.io.read_data import (read_mat, read_pickle, read_npy, read_npz,  # noqa
                                    read_txt, read_csv, read_json, read_nifti,
-                                   read_stc)
+                                   read_stc, read_w)
 from visbrain.io.download import download_file
+from visbrain.io.path import path_to_tmp
+
+
+def _write_stc(path, tmin, tstep, vertices, data):
+    """Write an STC file (data of shape (n_vertices, n_times))."""
+    with open(path, 'wb') as fid:
+        np.array([1000. * tmin, 1000. * tstep], dtype='>f4').tofile(fid)
+        np.array([len(vertices)], dtype='>u4').tofile(fid)
+        np.array(vertices, dtype='>u4').tofile(fid)
+        np.array([data.shape[1]], dtype='>u4').tofile(fid)
+        np.array(data.T, dtype='>f4').tofile(fid)
 
 
 class TestReadData(object):
@@ -14,6 +26,55 @@ class TestReadData(object):
         """Test function read_stc."""
         read_stc(download_file("meg_source_estimate-lh.stc"))
 
+    def test_read_stc_mmap(self):
+        """Test reading time ranges / vertices of a memory-mapped STC file."""
+        path = path_to_tmp(file='test-lh.stc', folder='stc')
+        vertices = np.array([3, 10, 42, 7, 100])
+        data = np.random.rand(5, 40).astype(np.float32)
+        _write_stc(path, -.1, .002, vertices, data)
+        stc = read_stc(path)
+        np.testing.assert_array_equal(stc['vertices'], vertices)
+        np.testing.assert_array_equal(stc['data'], data)
+        np.testing.assert_allclose((stc['tmin'], stc['tstep']), (-.1, .002),
+                                   rtol=1e-6)
+        np.testing.assert_allclose(stc['times'][[0, -1]], (-.1, -.022),
+                                   rtol=1e-5)
+        # Memory-mapped view :
+        stc = read_stc(path, mmap=True)
+        assert isinstance(stc['data'], np.memmap)
+        assert stc['data'].shape == (5, 40)
+        np.testing.assert_array_equal(stc['data'][:, 12], data[:, 12])
+        # Time range and vertex subset :
+        for mmap in [False, True]:
+            stc = read_stc(path, mmap=mmap, times=slice(5, 20),
+                           vertices=[42, 3])
+            np.testing.assert_array_equal(stc['data'], data[[2, 0], 5:20])
+            np.testing.assert_array_equal(stc['vertices'], [42, 3])
+            np.testing.assert_allclose(stc['times'][0], -.09, rtol=1e-5)
+        stc = read_stc(path, times=7)
+        np.testing.assert_array_equal(stc['data'], data[:, [7]])
+        with pytest.raises(ValueError):
+            read_stc(path, vertices=[4])
+        # Truncated files :
+        with open(path, 'ab') as fid:
+            fid.write(b'\x00')
+        with pytest.raises(ValueError):
+            read_stc(path)
+
+    def test_read_w(self):
+        """Test function read_w."""
+        path = path_to_tmp(file='test-lh.w', folder='stc')
+        vertices = np.array([0, 5, 70000, 12])
+        data = np.random.rand(4).astype(np.float32)
+        with open(path, 'wb') as fid:
+            fid.write(b'\x00\x00' + len(vertices).to_bytes(3, 'big'))
+            for v, d in zip(vertices, data):
+                fid.write(int(v).to_bytes(3, 'big') + np.array(
+                    [d], dtype='>f4').tobytes())
+        w = read_w(path)
+        np.testing.assert_array_equal(w['vertices'], vertices)
+        np.testing.assert_array_equal(w['data'], data)
+
     @pytest.mark.slow
     def test_read_nifti(self):
         """Test function read_nifti."""
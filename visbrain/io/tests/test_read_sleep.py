@@ -0,0 +1,140 @@
+"""Test functions in read_sleep.py."""
+import numpy as np
+
+from visbrain.io.read_sleep import ReadSleepData, read_bva, read_elan
+from visbrain.io.sleep_source import ArraySource, MemmapReader
+from visbrain.tests._tests_visbrain import _TestVisbrain
+
+
+n_chan, n_pts, sf = 4, 1001, 1000.
+chans = ['Cz', 'Pz', 'Fz', 'Oz']
+gain = np.array([.1, .5, 2., 1.], dtype=np.float32)
+rnd = np.random.RandomState(0)
+raw = rnd.randint(-3000, 3000, (n_chan, n_pts))
+
+
+class TestReadSleep(_TestVisbrain):
+    """Test functions in read_sleep.py."""
+
+    def _write_binary(self, name, dtype, orientation, data=raw):
+        """Write a binary file."""
+        data = data.astype(dtype)
+        data = data.T if orientation == 'multiplexed' else data
+        path = self.to_tmp_dir(name)
+        data.tofile(path)
+        return path
+
+    def _write_bva(self, dtype, orientation):
+        """Write a BrainVision dataset."""
+        formats = {'<i2': 'INT_16', '<i4': 'INT_32', '<f4': 'IEEE_FLOAT_32'}
+        name = 'bva_%s_%s' % (formats[dtype], orientation)
+        self._write_binary(name + '.eeg', dtype, orientation)
+        header = ['Brain Vision Data Exchange Header File Version 1.0',
+                  '[Common Infos]', 'DataFile=%s.eeg' % name,
+                  'MarkerFile=%s.vmrk' % name, 'DataFormat=BINARY',
+                  'DataOrientation=%s' % orientation.upper(),
+                  'NumberOfChannels=%i' % n_chan,
+                  'SamplingInterval=%i' % (1e6 / sf), '[Binary Infos]',
+                  'BinaryFormat=%s' % formats[dtype], '[Channel Infos]']
+        header += ['Ch%i=%s,,%s,uV' % (k + 1, c, str(g)) for k, (c, g) in
+                   enumerate(zip(chans, gain))]
+        with open(self.to_tmp_dir(name + '.vmrk'), 'w') as f:
+            f.write('[Marker Infos]\nMk1=New Segment,,1,1,0,'
+                    '20180101123456000000\n')
+        path = self.to_tmp_dir(name + '.vhdr')
+        with open(path, 'w') as f:
+            f.write('\n'.join(header) + '\n')
+        return path
+
+    def _write_elan(self):
+        """Write an ELAN (V2) dataset."""
+        # Two last channels do not contain data :
+        n_tot = n_chan + 2
+        data = np.r_[raw, np.zeros((2, n_pts), dtype=int)]
+        path = self._write_binary('elan.eeg', '>i2', 'multiplexed', data)
+        ent = ['V2', 'subject', 'date', '01:01:2018', 'No time', '-1',
+               'reserved', 'stim', str(1. / sf), str(n_tot)]
+        ent += chans + ['e1', 'e2']
+        ent += ['type'] * n_tot + ['uV'] * n_tot
+        g = np.r_[gain, 1., 1.]
+        ent += [str(-k * 32768) for k in g] + [str(k * 32767) for k in g]
+        ent += ['-32768'] * n_tot + ['32767'] * n_tot
+        with open(path + '.ent', 'w') as f:
+            f.write('\n'.join(ent) + '\n')
+        elan_gain = (g * 32767 + g * 32768) / (32767. + 32768.)
+        return path, elan_gain[0:n_chan]
+
+    def test_memmap_reader(self):
+        """Test the MemmapReader object."""
+        for orientation in ['multiplexed', 'vectorized']:
+            path = self._write_binary('mm_%s.bin' % orientation, '<i2',
+                                      orientation)
+            data = (raw * gain[:, np.newaxis]).astype(np.float32)
+            for dsf in [1, 3]:
+                reader = MemmapReader(path, n_chan, orientation=orientation,
+                                      gain=gain, dsf=dsf, chunk=100)
+                data_d = data[:, ::dsf]
+                assert reader.shape == data_d.shape
+                np.testing.assert_array_equal(np.asarray(reader), data_d)
+                # Windows and channels :
+                sl, idx = slice(5, 120, 2), np.array([3, 50, 7])
+                mask = np.array([True, False, True, True])
+                np.testing.assert_array_equal(reader[1, sl], data_d[1, sl])
+                np.testing.assert_array_equal(reader[2, ...], data_d[2, :])
+                np.testing.assert_array_equal(reader[mask, sl],
+                                              data_d[mask, sl])
+                np.testing.assert_array_equal(reader[[0, 3], idx],
+                                              data_d[np.ix_([0, 3], idx)])
+                np.testing.assert_array_equal(reader[np.ix_([1, 2], idx)],
+                                              data_d[np.ix_([1, 2], idx)])
+                # Statistics (computed by chunks) :
+                for k in ['min', 'max', 'mean', 'std']:
+                    np.testing.assert_allclose(getattr(reader, k)(1),
+                                               getattr(data_d, k)(1),
+                                               rtol=1e-5)
+        # Channel selection and scaling :
+        reader = MemmapReader(path, n_chan, orientation=orientation,
+                              gain=gain, picks=[1, 3])
+        reader *= 10.
+        np.testing.assert_allclose(reader[:, :], 10. * data[[1, 3], :])
+
+    def test_read_bva(self):
+        """Test function read_bva."""
+        data = raw * gain[:, np.newaxis]
+        for dtype in ['<i2', '<i4', '<f4']:
+            for orientation in ['multiplexed', 'vectorized']:
+                path = self._write_bva(dtype, orientation)
+                args = read_bva(path, 100.)
+                assert args[0] == sf and args[2] == 10 and args[5] == n_pts
+                assert args[4] == chans
+                assert args[6].hour == 12 and args[6].second == 56
+                np.testing.assert_allclose(args[3], data[:, ::10],
+                                           rtol=1e-6)
+                # Lazy loading :
+                reader = read_bva(path, 100., preload=False)[3]
+                assert isinstance(reader, MemmapReader)
+                np.testing.assert_array_equal(reader[:, 10:20],
+                                              args[3][:, 10:20])
+
+    def test_read_elan(self):
+        """Test function read_elan."""
+        path, elan_gain = self._write_elan()
+        args = read_elan(path, 500.)
+        assert args[0] == sf and args[2] == 2 and args[5] == n_pts
+        assert args[4] == chans
+        data = raw * elan_gain[:, np.newaxis]
+        np.testing.assert_allclose(args[3], data[:, ::2], rtol=1e-6)
+        reader = read_elan(path, 500., preload=False)[3]
+        assert reader.shape == (n_chan, 501)
+        np.testing.assert_array_equal(reader[[0, 2], :], args[3][[0, 2], :])
+
+    def test_read_sleep_data_source(self):
+        """Test that ReadSleepData leaves a user data source untouched."""
+        data = (raw * gain[:, np.newaxis]).astype(np.float32)
+        channels = ['EEG ' + k + '-ref' for k in chans]
+        source = ArraySource(data, sf, channels)
+        href = ['art', 'wake', 'rem', 'n1', 'n2', 'n3']
+        rsd = ReadSleepData(source, None, None, np.zeros((n_pts,)), href,
+                            None, False, None, None, None)
+        assert rsd._data is source and rsd._channels == chans
+        assert source.sf == sf and source.channels == channels
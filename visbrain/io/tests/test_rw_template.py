@@ -0,0 +1,121 @@
+"""Test functions in rw_template.py."""
+import os
+
+import numpy as np
+
+from visbrain.io import path_to_tmp
+from visbrain.io.rw_template import (write_template_dir, read_template_dir,
+                                     convert_brain_template)
+from visbrain.utils import mesh_edges
+from visbrain.tests._tests_visbrain import _TestVisbrain
+
+
+rnd = np.random.RandomState(0)
+vertices = rnd.uniform(-10., 10., (100, 3)).astype(np.float32)
+faces = rnd.randint(0, 100, (150, 3)).astype(np.uint32)
+faces[0, :] = [0, 1, 99]
+levels = [(vertices[0:50, :], faces[faces.max(1) < 50, :])]
+projection = dict(radius=10., contribute=False, shape=(500, 3),
+                  rows=np.arange(10), cols=np.arange(10),
+                  dist=rnd.rand(10).astype(np.float32),
+                  dmax=rnd.rand(5, 3).astype(np.float32))
+
+
+class TestRwTemplate(_TestVisbrain):
+    """Test functions in rw_template.py."""
+
+    def _check_template(self, path, projections=True):
+        """Check a template directory."""
+        tpl = read_template_dir(path)
+        assert isinstance(tpl['vertices'], np.memmap)
+        np.testing.assert_array_equal(tpl['vertices'], vertices)
+        np.testing.assert_array_equal(tpl['faces'], faces)
+        assert tpl['normals'].shape == vertices.shape
+        assert tpl['n_vertices'] == 100 and tpl['n_faces'] == 150
+        np.testing.assert_allclose(tpl['bbox'], [vertices.min(0),
+                                                 vertices.max(0)])
+        # Hemispheres :
+        lr = vertices[:, 0] <= vertices[:, 0].mean()
+        np.testing.assert_array_equal(tpl['lr_index'], lr)
+        np.testing.assert_array_equal(tpl['left_index'], np.where(lr)[0])
+        np.testing.assert_array_equal(tpl['right_index'], np.where(~lr)[0])
+        # Adjacency :
+        adj = (tpl['adjacency'] - mesh_edges(faces)).tocsr()
+        assert not adj.count_nonzero()
+        if projections:
+            assert len(tpl['levels']) == 1
+            np.testing.assert_array_equal(tpl['levels'][0][1], levels[0][1])
+            op = tpl['projections'][0]
+            assert op['radius'] == 10. and op['contribute'] is False
+            for k in ['shape', 'rows', 'cols', 'dist', 'dmax']:
+                np.testing.assert_array_equal(op[k], projection[k])
+
+    def test_write_read_template_dir(self):
+        """Test functions write_template_dir and read_template_dir."""
+        path = self.to_tmp_dir('rw.template')
+        write_template_dir(path, vertices, faces, projections=[projection],
+                           levels=levels)
+        self._check_template(path)
+
+    def test_convert_brain_template(self):
+        """Test function convert_brain_template."""
+        path = self.to_tmp_dir('conv.npz')
+        np.savez_compressed(path, vertices=vertices, faces=faces,
+                            normals=vertices, lr_index=None)
+        path_t = convert_brain_template(path, to_path=self.to_tmp_dir())
+        assert path_t == self.to_tmp_dir('conv.template')
+        assert os.path.isdir(path_t)
+        self._check_template(path_t, projections=False)
+
+    def test_replace_template_layout(self):
+        """Test that saving a template replaces the other layout."""
+        from visbrain.objects import BrainObj
+        from visbrain.io import add_brain_template
+        path = path_to_tmp(file='LayoutTpl', folder='templates')
+        add_brain_template('LayoutTpl', vertices, faces, tmpfile=True,
+                           mmap=True)
+        add_brain_template('LayoutTpl', 2. * vertices, faces, tmpfile=True)
+        assert not os.path.isdir(path + '.template')
+        assert os.path.isfile(path + '.npz')
+        b_obj = BrainObj('LayoutTpl')
+        np.testing.assert_array_equal(b_obj.vertices, 2. * vertices)
+        add_brain_template('LayoutTpl', vertices, faces, tmpfile=True,
+                           mmap=True)
+        assert not os.path.isfile(path + '.npz')
+        np.testing.assert_array_equal(BrainObj('LayoutTpl').vertices,
+                                      vertices)
+
+    def test_template_folder_priority(self):
+        """Test that the template layout is selected per folder."""
+        from visbrain.objects import BrainObj
+        from visbrain.io import add_brain_template
+        first = path_to_tmp(folder='templates_first')
+        np.savez_compressed(os.path.join(first, 'PriorityTpl.npz'),
+                            vertices=2. * vertices, faces=faces,
+                            normals=vertices, lr_index=None)
+        add_brain_template('PriorityTpl', vertices, faces, tmpfile=True,
+                           mmap=True)
+
+        class PriorityBrainObj(BrainObj):
+            def _search_in_path(self):
+                return first, path_to_tmp(folder='templates')
+
+        b_obj = PriorityBrainObj('PriorityTpl')
+        np.testing.assert_array_equal(b_obj.vertices, 2. * vertices)
+        assert b_obj._adjacency is None
+
+    def test_load_template_dir(self):
+        """Test loading a memory-mappable template in a BrainObj."""
+        from visbrain.objects import BrainObj
+        from visbrain.io import add_brain_template
+        add_brain_template('MmapTpl', vertices, faces, tmpfile=True,
+                           mmap=True, projections=[projection])
+        assert os.path.isdir(path_to_tmp(file='MmapTpl.template',
+                                         folder='templates'))
+        b_obj = BrainObj('MmapTpl')
+        assert len(b_obj) == 100 and len(b_obj._projections) == 1
+        adj = b_obj._get_adjacency()
+        assert adj is b_obj._adjacency
+        # Activation using the precomputed adjacency matrix :
+        b_obj.add_activation(data=rnd.rand(5), vertices=np.arange(5),
+                             smoothing_steps=2)
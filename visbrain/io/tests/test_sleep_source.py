@@ -0,0 +1,110 @@
+"""Test data sources in sleep_source.py."""
+import numpy as np
+
+from visbrain.io.sleep_source import (SleepDataSource, ArraySource,
+                                      CachedSource)
+
+
+rnd = np.random.RandomState(0)
+data = rnd.rand(5, 1000).astype(np.float32)
+sl, idx = slice(95, 410, 3), np.array([999, 3, 250, 251, 3, 640])
+mask = np.array([True, False, True, False, True])
+
+
+class _CountingSource(ArraySource):
+    """Array source that counts the number of reads."""
+
+    n_reads = 0
+
+    def _read(self, rows, cols):
+        self.n_reads += 1
+        return ArraySource._read(self, rows, cols)
+
+
+class TestSleepSource(object):
+    """Test data sources in sleep_source.py."""
+
+    @staticmethod
+    def _check_indexing(source, ref):
+        """Compare the indexing of a source with the one of an array."""
+        np.testing.assert_array_equal(source[:, :], ref)
+        np.testing.assert_array_equal(np.asarray(source), ref)
+        np.testing.assert_array_equal(source[2, :], ref[2, :])
+        np.testing.assert_array_equal(source[2, 17], ref[2, 17])
+        np.testing.assert_array_equal(source[1:4, sl], ref[1:4, sl])
+        np.testing.assert_array_equal(source[mask, sl], ref[mask, sl])
+        np.testing.assert_array_equal(source[[4, 0], idx],
+                                      ref[np.ix_([4, 0], idx)])
+        np.testing.assert_array_equal(source[np.ix_([1, 3], idx)],
+                                      ref[np.ix_([1, 3], idx)])
+        np.testing.assert_array_equal(source[:, ::-7], ref[:, ::-7])
+        np.testing.assert_array_equal(source.read(3, slice(10, 20)),
+                                      ref[3, 10:20])
+        assert source[:, 20:10].shape == (5, 0)
+
+    def test_array_source(self):
+        """Test the ArraySource object."""
+        source = ArraySource(data, sf=100., channels=list('abcde'))
+        assert isinstance(source, SleepDataSource)
+        assert source.shape == data.shape and source.ndim == 2
+        assert source.sf == 100. and source.channels == list('abcde')
+        self._check_indexing(source, data)
+        for k in ['min', 'max', 'mean', 'std']:
+            np.testing.assert_allclose(getattr(source, k)(1),
+                                       getattr(data, k)(1), rtol=1e-5)
+
+    def test_chunked_statistics(self):
+        """Test statistics computed by chunks."""
+        source = ArraySource(data)
+        source._chunk = 64
+        for k in ['min', 'max', 'mean', 'std']:
+            np.testing.assert_allclose(SleepDataSource.__dict__[k](source, 1),
+                                       getattr(data, k)(1), rtol=1e-5)
+
+    def test_cached_source(self):
+        """Test the CachedSource object."""
+        source = CachedSource(ArraySource(data.copy(), sf=100.), block_size=64,
+                              n_blocks=4)
+        assert source.shape == data.shape and source.sf == 100.
+        self._check_indexing(source, data)
+        # The number of blocks in memory is bounded :
+        for start in range(0, 1000, 50):
+            np.testing.assert_array_equal(source[:, start:start + 100],
+                                          data[:, start:start + 100])
+            assert len(source._cache) <= 4
+        # Least recently used blocks are dropped first :
+        source[:, 0:10]
+        assert list(source._cache)[-1] == 0
+        source[:, 64:74]
+        assert list(source._cache)[-2:] == [0, 1]
+        # Reads spanning more than n_blocks blocks bypass the cache :
+        cache = list(source._cache)
+        np.testing.assert_array_equal(source[1, :], data[1, :])
+        assert list(source._cache) == cache
+        # Scaling clears the cache :
+        source *= 2.
+        assert not len(source._cache)
+        np.testing.assert_allclose(source[:, 100:300], 2. * data[:, 100:300])
+
+    def test_cached_statistics(self):
+        """Test that statistics are computed once per source."""
+        source = _CountingSource(data.copy())
+        source._chunk = 100
+        cached = CachedSource(source, block_size=64, n_blocks=4)
+        stats = cached.stats()
+        n_reads = source.n_reads
+        assert n_reads == 10 and not len(cached._cache)
+        for k in ['min', 'max', 'mean', 'std']:
+            np.testing.assert_allclose(getattr(cached, k)(1),
+                                       getattr(data, k)(1), rtol=1e-5)
+        np.testing.assert_array_equal(source.stats()['dist'], stats['dist'])
+        assert source.n_reads == n_reads
+        # Scaling updates statistics without reading the data :
+        cached *= -2.
+        assert source.n_reads == n_reads
+        for k, ref in zip(['min', 'max', 'mean', 'std'],
+                          [-2. * data.max(1), -2. * data.min(1),
+                           -2. * data.mean(1), 2. * data.std(1)]):
+            np.testing.assert_allclose(cached.stats()[k], ref, rtol=1e-5)
+        np.testing.assert_allclose(cached.stats()['dist'],
+                                   2. * np.ptp(data, 1), rtol=1e-5)
@@ -5,9 +5,34 @@ import pytest
 from visbrain.utils import generate_eeg
 from visbrain.io import (write_fig_hyp, write_fig_spindles,  # noqa
                          write_fig_canvas, write_fig_pyqt)
+from visbrain.io.write_image import (_render_tiles, _render_canvas,
+                                     _save_canvas_tiles, _get_crop_box,
+                                     _crop_image, _crop_region)
+from visbrain.utils import piccrop
 from visbrain.tests._tests_visbrain import _TestVisbrain
 
 
+class _ArrayCanvas(object):
+    """Canvas-like object that renders regions of an image."""
+
+    pixel_scale = 1
+    bgcolor = None
+
+    def __init__(self, img):
+        self.img = img
+        self.size = self.physical_size = img.shape[1::-1]
+        self._backend = self
+        self._physical_size = self.size
+
+    def _vispy_set_physical_size(self, width, height):
+        assert (width, height) == tuple(self.size)
+
+    def render(self, region=None, size=None):
+        x, y, w, h = (0, 0) + tuple(self.size) if region is None else region
+        assert size in [None, (w, h)]
+        return self.img[y:y + h, x:x + w, :]
+
+
 class TestWriteImage(_TestVisbrain):
     """Test functions in write_image.py."""
 
@@ -39,6 +64,75 @@ class TestWriteImage(_TestVisbrain):
         """Test function write_fig_canvas."""
         pass
 
+    def test_render_tiles(self):
+        """Test that tiles are stitched together."""
+        img = np.random.RandomState(0).randint(0, 256, (70, 101, 4)).astype(
+            np.uint8)
+        canvas = _ArrayCanvas(img)
+        for tile_size in [16, 33, 200]:
+            bands = list(_render_tiles(canvas, (0, 0, 101, 70), tile_size))
+            assert all([b.shape[0] <= tile_size for b in bands])
+            np.testing.assert_array_equal(np.concatenate(bands), img)
+        bands = list(_render_tiles(canvas, (10, 5, 50, 40), 16))
+        np.testing.assert_array_equal(np.concatenate(bands), img[5:45, 10:60])
+        np.testing.assert_array_equal(_render_canvas(canvas, tile_size=16),
+                                      img)
+
+    def test_save_canvas_tiles(self):
+        """Test that tiles are streamed to a png file."""
+        read_png = pytest.importorskip('vispy.io').read_png
+        pytest.importorskip('PIL')
+        img = np.random.RandomState(1).randint(0, 256, (70, 101, 4)).astype(
+            np.uint8)
+        img[:, 40:, :] = 200  # constant area
+        file = self.to_tmp_dir('write_image_tiles.png')
+        px = _save_canvas_tiles(file, _ArrayCanvas(img), (0, 0, 101, 70), 32)
+        assert px == (101, 70)
+        np.testing.assert_array_equal(read_png(file), img)
+
+    def test_crop_box(self):
+        """Test the relative bounding box used for cropping."""
+        img = np.zeros((60, 80, 4), dtype=np.uint8)
+        img[20:40, 10:50, :] = 200
+        box = _get_crop_box(img)
+        np.testing.assert_allclose(box, (10. / 80, 20. / 60, 50. / 80,
+                                         40. / 60))
+        np.testing.assert_array_equal(_crop_image(img, box), piccrop(img))
+        np.testing.assert_array_equal(_crop_image(img, box, margin=0),
+                                      img[20:40, 10:50])
+        # The bounding box doesn't depend on the resolution :
+        img_x2 = np.repeat(np.repeat(img, 2, axis=0), 2, axis=1)
+        np.testing.assert_allclose(_get_crop_box(img_x2), box)
+        assert _crop_image(img_x2, box, margin=0).shape == (40, 80, 4)
+        # Region of the canvas :
+        canvas = _ArrayCanvas(img_x2)
+        assert _crop_region(canvas, box) == (10, 30, 100, 60)
+        np.testing.assert_array_equal(
+            _render_canvas(canvas, _crop_region(canvas, box), 32),
+            piccrop(img_x2))
+
+    def test_write_fig_canvas_region(self):
+        """Test cropping the region of a canvas."""
+        read_png = pytest.importorskip('vispy.io').read_png
+        pytest.importorskip('PIL')
+        img = np.zeros((120, 160, 4), dtype=np.uint8)
+        img[10:30, 20:60, :] = 100  # outside of the region
+        img[70:90, 100:130, :] = 200
+        canvas, region = _ArrayCanvas(img), (80, 50, 70, 60)
+        img_r = piccrop(img[50:110, 80:150])
+        file = self.to_tmp_dir('write_image_region.png')
+        # Print size of the bounding box (i.e. the canvas is not resized) :
+        for kw in [dict(), dict(print_size=(30, 20), unit='pixel')]:
+            box = write_fig_canvas(file, canvas, region=region, autocrop=True,
+                                   **kw)
+            np.testing.assert_allclose(box, (20. / 70, 20. / 60, 50. / 70,
+                                             40. / 60))
+            np.testing.assert_array_equal(read_png(file), img_r)
+        # Known bounding box (only the cropped region is rendered) :
+        assert _crop_region(canvas, box, region) == (90, 60, 50, 40)
+        write_fig_canvas(file, canvas, region=region, crop_box=box)
+        np.testing.assert_array_equal(read_png(file), img_r)
+
     @pytest.mark.skip('Should be tested inside modules.')
     def test_write_fig_pyqt(self):
         """Test function write_fig_pyqt."""
@@ -5,6 +5,8 @@
 - write_fig_pyqt : Export a GUI window as a figure
 """
 import os
+import struct
+import zlib
 import logging
 import numpy as np
 from ..utils.color import color2vb
@@ -14,6 +16,9 @@ logger = logging.getLogger('visbrain')
 __all__ = ('write_fig_hyp', 'write_fig_spindles', 'write_fig_canvas',
            'write_fig_pyqt')
 
+# Images larger than this number of pixels are rendered by tiles :
+TILE_SIZE = 4096
+
 
 def write_fig_hyp(data, sf, file=None, start_s=0, grid=False, ascolor=False,
                   dpi=300, colors={-1: '#8bbf56', 0: '#56bf8b', 1: '#aabcce',
@@ -273,7 +278,8 @@ def write_fig_spindles(data, sf, hypno=None, file=None, start_s=0.,
 
 def write_fig_canvas(filename, canvas, widget=None, autocrop=False,
                      region=None, print_size=None, unit='centimeter', dpi=300.,
-                     factor=1., bgcolor=None, transparent=False):
+                     factor=1., bgcolor=None, transparent=False,
+                     tile_size=None, crop_box=None):
     """Export a canvas as a figure.
 
     Parameters
@@ -306,10 +312,69 @@ def write_fig_canvas(filename, canvas, widget=None, autocrop=False,
         Background color of the canvas.
     transparent : bool | False
         Use transparent background.
+    tile_size : int | None
+        Large images exceed the framebuffer limits of the GPU. Hence, if the
+        exported region is larger than tile_size pixels, it is rendered by
+        tiles of (tile_size, tile_size) pixels that are stitched together.
+        For png files (without autocrop), each row of tiles is compressed and
+        written as soon as it is rendered so that the whole image is never
+        held in memory. If None, TILE_SIZE (4096) is used.
+    crop_box : tuple | None
+        Relative bounding box (x_start, y_start, x_end, y_end) of the
+        non-background part of the exported image (i.e. of the region if
+        region is not None, of the whole canvas otherwise), as returned by
+        this function. Use it to crop several figures of the same scene (e.g
+        frames of a time course) without having to find the bounding box of
+        each figure. If not None, autocrop is turned on.
+
+    Returns
+    -------
+    crop_box : tuple | None
+        The relative bounding box used to crop the figure (None if autocrop
+        is False).
+    """
+    autocrop = autocrop or (crop_box is not None)
+    user_box = crop_box is not None
+    backup, crop_box = _prepare_canvas(canvas, widget, autocrop, print_size,
+                                       unit, dpi, factor, bgcolor,
+                                       transparent, crop_box, region)
+    tile_size = TILE_SIZE if tile_size is None else int(tile_size)
+    try:
+        crop = autocrop
+        # If the bounding box is known, only the cropped region is rendered.
+        # A region is not rescaled with the canvas, hence the bounding box
+        # found before resizing it is not reused :
+        if autocrop and (crop_box is not None) and (
+                (region is None) or user_box):
+            region, crop = _crop_region(canvas, crop_box, region), False
+            logger.info("Image cropped to closest non-backround pixels")
+        reg = (0, 0) + tuple(canvas.size) if region is None else region
+        is_png = os.path.splitext(filename)[1] == '.png'
+        if (max(reg[2:]) > tile_size) and is_png and not crop:
+            _save_canvas_tiles(filename, canvas, reg, tile_size)
+        else:
+            img = _render_canvas(canvas, region, tile_size)
+            if crop:
+                crop_box = _get_crop_box(img)
+                img = _crop_image(img, crop_box)
+                logger.info("Image cropped to closest non-backround pixels")
+            _save_canvas_image(filename, img)
+    finally:
+        # Set to the canvas it's previous size :
+        _restore_canvas(canvas, backup)
+    return crop_box
+
+
+def _prepare_canvas(canvas, widget=None, autocrop=False, print_size=None,
+                    unit='centimeter', dpi=300., factor=1., bgcolor=None,
+                    transparent=False, crop_box=None, region=None):
+    """Resize the canvas and set the background color before rendering.
+
+    See write_fig_canvas for the description of inputs. Returns the backup
+    (size, background color) that should be passed to _restore_canvas once
+    rendering is done and the crop box (if autocrop is used with a print
+    size, the canvas is rendered once to get it).
     """
-    from ..utils import piccrop
-    from vispy.io import imsave
-
     # Get the size of the canvas and backend :
     c_size = canvas.size
     b_size = canvas._backend._physical_size
@@ -322,8 +387,7 @@ def write_fig_canvas(filename, canvas, widget=None, autocrop=False,
         canvas.size = b_size
 
     # Backup size / background color :
-    backup_size = canvas.physical_size
-    backup_bgcolor = canvas.bgcolor
+    backup = (canvas.physical_size, canvas.bgcolor)
 
     # dpi checking :
     if print_size is None:
@@ -343,12 +407,14 @@ def write_fig_canvas(filename, canvas, widget=None, autocrop=False,
                             "(width, height) of the image in %s" % unit)
 
         print_size = np.asarray(print_size)
-        # If the user select the auto-croping option, the canvas must be render
-        # before :
+        # If the user select the auto-croping option, the canvas (or the
+        # region) must be render before (if the bounding box is unknown) :
         if autocrop:
-            img = canvas.render()
-            s_output = piccrop(img)[:, :, 0].shape
-            logger.info("Image cropped to closest non-backround pixels")
+            if crop_box is None:
+                crop_box = _get_crop_box(canvas.render(region=region))
+            size = b_size if region is None else region[2:]
+            x_0, y_0, x_1, y_1 = crop_box
+            s_output = ((x_1 - x_0) * size[0], (y_1 - y_0) * size[1])
         else:
             s_output = b_size
         # Unit conversion :
@@ -384,31 +450,218 @@ def write_fig_canvas(filename, canvas, widget=None, autocrop=False,
         canvas.bgcolor = color2vb(bgcolor, alpha=1.)
     if transparent:
         canvas.bgcolor = [0.] * 4
+    return backup, crop_box
+
+
+def _restore_canvas(canvas, backup):
+    """Restore the size and the background color of a canvas."""
+    size, bgcolor = backup
+    canvas._backend._physical_size = size
+    canvas.size = size
+    canvas.bgcolor = bgcolor
+
+
+def _get_crop_box(img):
+    """Get the relative bounding box of the non-background part of an image.
+
+    Returns
+    -------
+    crop_box : tuple
+        The (x_start, y_start, x_end, y_end) bounding box, relative to the
+        width and height of the image. Hence, it doesn't depend on the
+        resolution.
+    """
+    from ..utils import picbbox
+    sl_y, sl_x = picbbox(img, margin=0)
+    height, width = img.shape[0:2]
+    return (sl_x.start / width, sl_y.start / height, sl_x.stop / width,
+            sl_y.stop / height)
+
+
+def _box_to_slices(crop_box, width, height, margin=10):
+    """Get the (rows, columns) slices of a relative bounding box."""
+    x_0, y_0, x_1, y_1 = crop_box
+    sl_x = slice(max(0, int(round(x_0 * width)) - margin),
+                 min(width, int(round(x_1 * width)) + margin))
+    sl_y = slice(max(0, int(round(y_0 * height)) - margin),
+                 min(height, int(round(y_1 * height)) + margin))
+    return sl_y, sl_x
+
+
+def _crop_image(img, crop_box, margin=10):
+    """Crop an image using a relative bounding box."""
+    sl_y, sl_x = _box_to_slices(crop_box, img.shape[1], img.shape[0], margin)
+    return img[sl_y, sl_x, ...]
 
-    # Render the canvas :
-    try:
-        img = canvas.render(region=region)
-    except:
-        raise ValueError("Can not render the canvas. Try to decrease the "
-                         "resolution")
+
+def _crop_region(canvas, crop_box, region=None, margin=10):
+    """Get the region (x_start, y_start, width, height) of a bounding box.
+
+    The bounding box is relative to the region (if not None) or to the whole
+    canvas.
+    """
+    region = (0, 0) + tuple(canvas.size) if region is None else region
+    x_r, y_r, width, height = [int(k) for k in region]
+    sl_y, sl_x = _box_to_slices(crop_box, width, height, margin)
+    return (x_r + sl_x.start, y_r + sl_y.start, sl_x.stop - sl_x.start,
+            sl_y.stop - sl_y.start)
+
+
+def _save_canvas_image(filename, img):
+    """Save an image rendered from a canvas.
+
+    Returns
+    -------
+    px : tuple
+        The (width, height) of the saved image.
+    """
+    from vispy.io import imsave
 
     # Remove alpha for files that are not png or tiff :
     if os.path.splitext(filename)[1] not in ['.png', '.tiff']:
         img = img[..., 0:-1]
 
-    # Apply auto-cropping to the image :
-    if autocrop:
-        img = piccrop(img)
-        logger.info("Image cropped to closest non-backround pixels")
     # Save it :
     imsave(filename, img)
     px = tuple(img[:, :, 0].T.shape)
     logger.info("Image of size %rpx successfully saved (%s)" % (px, filename))
+    return px
+
+
+def _render_canvas(canvas, region=None, tile_size=None):
+    """Render a canvas, by tiles if the region is larger than tile_size."""
+    tile_size = TILE_SIZE if tile_size is None else int(tile_size)
+    reg = (0, 0) + tuple(canvas.size) if region is None else region
+    if max(reg[2:]) > tile_size:
+        n_tiles = [-(-int(k) // tile_size) for k in reg[2:]]
+        logger.info("Render the canvas using %i x %i tiles" % tuple(n_tiles))
+        return np.concatenate(list(_render_tiles(canvas, reg, tile_size)),
+                              axis=0)
+    try:
+        return canvas.render(region=region)
+    except Exception:
+        raise ValueError("Can not render the canvas. Try to decrease the "
+                         "resolution")
+
+
+def _render_tiles(canvas, region, tile_size):
+    """Render a region of a canvas by rows of tiles.
+
+    Each tile is rendered at the native pixel density of the canvas in its
+    own framebuffer (the region is offset by the canvas transform).
+
+    Yields
+    ------
+    band : array_like
+        The stitched row of tiles of shape (tile_height, width, 4).
+    """
+    x_0, y_0, width, height = [int(k) for k in region]
+    scale = canvas.pixel_scale
+    for y in range(y_0, y_0 + height, tile_size):
+        t_h = min(tile_size, y_0 + height - y)
+        tiles = []
+        for x in range(x_0, x_0 + width, tile_size):
+            t_w = min(tile_size, x_0 + width - x)
+            size = (int(round(t_w * scale)), int(round(t_h * scale)))
+            try:
+                tiles.append(canvas.render(region=(x, y, t_w, t_h),
+                                           size=size))
+            except Exception:
+                raise ValueError("Can not render the canvas. Try to "
+                                 "decrease the tile size")
+        yield np.concatenate(tiles, axis=1)
+
+
+def _save_canvas_tiles(filename, canvas, region, tile_size):
+    """Render a region of a canvas by tiles and stream them to a png file."""
+    n_tiles = [-(-int(k) // tile_size) for k in region[2:]]
+    logger.info("Render the canvas using %i x %i tiles" % tuple(n_tiles))
+    bands = _render_tiles(canvas, region, tile_size)
+    scale = canvas.pixel_scale
+    width = sum([int(round(min(tile_size, region[2] - k) * scale)) for k in
+                 range(0, int(region[2]), tile_size)])
+    height = sum([int(round(min(tile_size, region[3] - k) * scale)) for k
+                  in range(0, int(region[3]), tile_size)])
+    with _PngWriter(filename, width, height, n_channels=4) as png:
+        for band in bands:
+            png.write(band)
+    logger.info("Image of size %rpx successfully saved (%s)" % (
+        (width, height), filename))
+    return width, height
+
+
+class _PngWriter(object):
+    """Write a 8-bits png image by bands of rows.
+
+    Rows are filtered (sub filter) and compressed as soon as they are
+    written. Hence, the memory used doesn't depend on the image size.
+
+    Parameters
+    ----------
+    filename : string
+        Name of the png file.
+    width, height : int
+        Size of the image.
+    n_channels : {3, 4}
+        Number of channels (RGB or RGBA).
+    level : int | 6
+        Compression level.
+    """
 
-    # Set to the canvas it's previous size :
-    canvas._backend._physical_size = backup_size
-    canvas.size = backup_size
-    canvas.bgcolor = backup_bgcolor
+    def __init__(self, filename, width, height, n_channels=4, level=6):
+        """Init."""
+        assert n_channels in [3, 4]
+        self._shape = (int(width), n_channels)
+        self._height, self._n_rows = int(height), 0
+        self._zlib = zlib.compressobj(level)
+        self._fid = open(filename, 'wb')
+        self._fid.write(b'\x89PNG\r\n\x1a\n')
+        color_type = {3: 2, 4: 6}[n_channels]
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', self._shape[0],
+                                         self._height, 8, color_type, 0, 0,
+                                         0))
+
+    def __enter__(self):
+        """Enter."""
+        return self
+
+    def __exit__(self, *args):
+        """Exit."""
+        self.close()
+
+    def _chunk(self, tag, data):
+        """Write a chunk of data."""
+        crc = zlib.crc32(tag + data) & 0xffffffff
+        head = struct.pack('>I', len(data)) + tag
+        self._fid.write(head + data + struct.pack('>I', crc))
+
+    def write(self, rows):
+        """Write rows of shape (n_rows, width, n_channels)."""
+        rows = np.asarray(rows, dtype=np.uint8)
+        assert rows.shape[1:] == self._shape
+        n_rows, n_chan = rows.shape[0], self._shape[1]
+        rows = rows.reshape(n_rows, -1)
+        # Sub filter (difference with the previous pixel, modulo 256) :
+        raw = np.empty((n_rows, rows.shape[1] + 1), dtype=np.uint8)
+        raw[:, 0] = 1
+        raw[:, 1:n_chan + 1] = rows[:, 0:n_chan]
+        np.subtract(rows[:, n_chan:], rows[:, :-n_chan],
+                    out=raw[:, n_chan + 1:])
+        data = self._zlib.compress(raw.tobytes())
+        if data:
+            self._chunk(b'IDAT', data)
+        self._n_rows += n_rows
+
+    def close(self):
+        """Finish the png file."""
+        if self._fid.closed:
+            return
+        self._chunk(b'IDAT', self._zlib.flush())
+        self._chunk(b'IEND', b'')
+        self._fid.close()
+        if self._n_rows != self._height:
+            raise ValueError("%i rows written instead of %i" % (
+                self._n_rows, self._height))
 
 
 def write_fig_pyqt(self, filename):
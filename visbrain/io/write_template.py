@@ -1,9 +1,11 @@
 """Save templates (brain, roi, volume...) to the tmp folder."""
 import logging
 import os
+import shutil
 import numpy as np
 
 from .path import path_to_visbrain_data, path_to_tmp
+from .rw_template import write_template_dir, TEMPLATE_EXT
 from ..utils.mesh import convert_meshdata
 
 logger = logging.getLogger('visbrain')
@@ -13,7 +15,8 @@ __all__ = ['add_brain_template', 'remove_brain_template',
 
 
 def add_brain_template(name, vertices, faces, normals=None, lr_index=None,
-                       tmpfile=False):
+                       tmpfile=False, projections=None, mmap=False,
+                       levels=None):
     """Add a brain template to the default list.
 
     Parameters
@@ -33,6 +36,18 @@ def add_brain_template(name, vertices, faces, normals=None, lr_index=None,
     tmpfile : bool | False
         Specify if the saved brain template is a temporary file (in that case,
         saved in visbrain/data/tmp/templates).
+    projections : list | None
+        List of precomputed projection operators (dictionaries of arrays, see
+        BrainObj.add_projection) to save with the template.
+    mmap : bool | False
+        Save the template as a directory of uncompressed arrays that can be
+        memory-mapped, with the precomputed adjacency matrix (see
+        :func:`read_template_dir`). Otherwise, the template is saved as a
+        compressed .npz file. In both cases, a previously saved template with
+        the same name and the other layout is removed.
+    levels : list | None
+        List of lower resolution levels of the mesh (tuples (vertices,
+        faces)). Only used if mmap is True.
     """
     # Convert meshdata :
     vertices, faces, normals = convert_meshdata(vertices, faces, normals)
@@ -42,13 +57,30 @@ def add_brain_template(name, vertices, faces, normals=None, lr_index=None,
         os.mkdir(vb_path)
     # Get path to the templates/ folder :
     name = os.path.splitext(name)[0]
+    ext = TEMPLATE_EXT if mmap else '.npz'
     if tmpfile:
-        path = path_to_tmp(folder='templates', file=name + '.npz')
+        path = path_to_tmp(folder='templates', file=name + ext)
     else:
-        path = path_to_visbrain_data(folder='templates', file=name + '.npz')
+        path = path_to_visbrain_data(folder='templates', file=name + ext)
+    # Replace the other layout of the template (otherwise, the
+    # memory-mappable directory would always be loaded in priority) :
+    other = os.path.join(os.path.dirname(path), name + (
+        '.npz' if mmap else TEMPLATE_EXT))
+    if os.path.isdir(other):
+        shutil.rmtree(other)
+    elif os.path.isfile(other):
+        os.remove(other)
+    if mmap:
+        write_template_dir(path, vertices, faces, normals, lr_index,
+                           projections, levels)
+        return None
+    # Projection operators are saved as projection<i>_<key> arrays :
+    proj = {}
+    for i, op in enumerate(projections or []):
+        proj.update({'projection%i_%s' % (i, k): v for k, v in op.items()})
     # Save the template :
     np.savez_compressed(path, vertices=vertices, faces=faces, normals=normals,
-                        lr_index=lr_index)
+                        lr_index=lr_index, **proj)
     logger.info("Brain template saved (%s)." % path)
 
 
@@ -63,12 +95,17 @@ def remove_brain_template(name):
     # Get path to the templates/ folder :
     name = os.path.splitext(name)[0]
     path = path_to_visbrain_data(folder='templates', file=name + '.npz')
-    # Remove the file from templates/ folder :
+    path_mmap = path_to_visbrain_data(folder='templates',
+                                      file=name + TEMPLATE_EXT)
+    # Remove the file (or memory-mappable directory) from templates/ folder :
+    if not (os.path.isfile(path) or os.path.isdir(path_mmap)):
+        raise ValueError("No file " + path)
     if os.path.isfile(path):
         os.remove(path)
         logger.info("Brain template removed (%s)." % path)
-    else:
-        raise ValueError("No file " + path)
+    if os.path.isdir(path_mmap):
+        shutil.rmtree(path_mmap)
+        logger.info("Brain template removed (%s)." % path_mmap)
 
 
 def save_volume_template(name, vol, labels, index, hdr, tmpfile=False):
@@ -5,18 +5,89 @@ Annalisa Pascarella
 import numpy as np
 import logging
 import os
+from functools import lru_cache
 
-from ..io import is_mne_installed
+from ..io import is_mne_installed, read_stc
 
 logger = logging.getLogger('visbrain')
 
 __all__ = ['mne_plot_source_estimation']
 
 
+@lru_cache(maxsize=4)
+def _read_fwd_geometry(fwd_file, mtime, sbj, sbj_dir, hemisphere):
+    """Read the source space of a forward solution in the MNI space.
+
+    Parsing the forward solution and the head to MNI conversion are slow.
+    Hence, the geometry is cached by file, modification time, subject and
+    hemisphere. Returned arrays are read-only because they are shared
+    between calls.
+    """
+    import mne
+    from mne.source_space import head_to_mni
+    hemi_idx = {'left': [0], 'right': [1], 'both': [0, 1]}[hemisphere]
+    # Read the forward solution :
+    fwd = mne.read_forward_solution(fwd_file)
+    logger.debug('Read the forward solution')
+    # Get source space :
+    fwd_src = fwd['src']
+    # Get the MRI (surface RAS)-> head matrix
+    mri_head_t = fwd['mri_head_t']
+    # Head to MNI conversion
+    logger.info("Head to MNI conversion")
+    mesh, sources = [], []
+    for hemi in hemi_idx:
+        vert_ = fwd_src[hemi]['rr']
+        sources_ = fwd_src[hemi]['rr'][fwd_src[hemi]['vertno']]
+        m_ = head_to_mni(vert_, sbj, mri_head_t, subjects_dir=sbj_dir)
+        s_ = head_to_mni(sources_, sbj, mri_head_t, subjects_dir=sbj_dir)
+        mesh.append(m_)
+        sources.append(s_)
+    # Get active vertices :
+    # fwd_src contains the source spaces, the first 2 are the cortex
+    # (left and right hemi, the others are related to the substructures)
+    if len(hemi_idx) == 1:
+        active_vert = fwd_src[hemi_idx[0]]['vertno']
+    else:
+        active_left = fwd_src[0]['vertno']
+        active_right = fwd_src[1]['vertno'] + mesh[0].shape[0]
+        active_vert = np.r_[active_left, active_right]
+    # Concatenate vertices, faces and sources :
+    vertices = np.concatenate(mesh)
+    lr_index = np.r_[np.ones((len(mesh[0]),)), np.zeros((len(mesh[1]),))]
+    sources = np.concatenate(sources)
+    # Get faces :
+    if len(hemi_idx) == 1:
+        faces = fwd_src[hemi_idx[0]]['tris']
+    else:
+        _faces_l = fwd_src[0]['tris']
+        _faces_r = fwd_src[1]['tris'] + _faces_l.max() + 1
+        faces = np.r_[_faces_l, _faces_r].astype(int)
+    out = (vertices, faces, lr_index.astype(bool), sources, active_vert)
+    for k in out:
+        k.flags.writeable = False
+    return out
+
+
+def _read_stc_timecourse(stc_file, hemisphere):
+    """Read the time course of the lh / rh stc files of a source estimate.
+
+    Files are memory-mapped, hence time points are only read when they are
+    displayed. If both hemispheres are needed, a list of the two
+    memory-mapped blocks is returned (see BrainObj.add_timecourse).
+    """
+    stem, ext = stc_file[:-7], stc_file[-7:]
+    if ext not in ['-lh.stc', '-rh.stc']:
+        return [read_stc(stc_file, mmap=True)['data']]
+    hemi = {'left': ['-lh'], 'right': ['-rh'], 'both': ['-lh', '-rh']}
+    return [read_stc(stem + k + '.stc', mmap=True)['data'] for k in hemi[
+        hemisphere]]
+
+
 def mne_plot_source_estimation(sbj, sbj_dir, fwd_file, stc_file=None,
                                hemisphere='both', parc='aparc', active_data=0,
                                kw_brain_obj={}, kw_source_obj={},
-                               kw_activation={}, show=True):
+                               kw_activation={}, show=True, timecourse=False):
     """Plot source estimation.
 
     Parameters
@@ -39,12 +110,20 @@ def mne_plot_source_estimation(sbj, sbj_dir, fwd_file, stc_file=None,
         `active_data` is an integer, it describes the time instant in which you
         want to see the activation. Otherwise, `active_data` must be an array
         with the same same shape as the number of active vertices.
+    timecourse : bool | False
+        If True, the whole time course of the stc file is added to the brain
+        object (see `BrainObj.add_timecourse`) and `active_data` is the
+        first displayed time instant. Then, use `BrainObj.set_time` or
+        `BrainObj.play` to step or animate through time without reading the
+        forward solution again. In this mode, data are not normalized and
+        stc files are memory-mapped (see `visbrain.io.read_stc`).
     kw_brain_obj : dict | {}
         Additional inputs to pass to the `BrainObj` class.
     kw_source_obj : dict | {}
         Additional inputs to pass to the `SourceObj` class.
     kw_activation : dict | {}
-        Additional inputs to pass to the `BrainObj.add_activation` method.
+        Additional inputs to pass to the `BrainObj.add_activation` method (or
+        to the `BrainObj.add_timecourse` method if `timecourse` is True).
     show : bool | False
         If True, the window of the `Brain` module is automatically displayed.
         If False, a BrainObj and a SourceObj are returned. Finally, if 'scene'
@@ -60,36 +139,15 @@ def mne_plot_source_estimation(sbj, sbj_dir, fwd_file, stc_file=None,
     # Test that mne is installed and import :
     is_mne_installed(raise_error=True)
     import mne
-    from mne.source_space import head_to_mni
-    hemi_idx = {'left': [0], 'right': [1], 'both': [0, 1]}[hemisphere]
-    # Read the forward solution :
-    fwd = mne.read_forward_solution(fwd_file)
-    logger.debug('Read the forward solution')
-    # Get source space :
-    fwd_src = fwd['src']
-    # Get the MRI (surface RAS)-> head matrix
-    mri_head_t = fwd['mri_head_t']
-    # Head to MNI conversion
-    logger.info("Head to MNI conversion")
-    mesh, sources = [], []
-    for hemi in hemi_idx:
-        vert_ = fwd_src[hemi]['rr']
-        sources_ = fwd_src[hemi]['rr'][fwd_src[hemi]['vertno']]
-        m_ = head_to_mni(vert_, sbj, mri_head_t, subjects_dir=sbj_dir)
-        s_ = head_to_mni(sources_, sbj, mri_head_t, subjects_dir=sbj_dir)
-        mesh.append(m_)
-        sources.append(s_)
-    # Get active vertices :
-    # fwd_src contains the source spaces, the first 2 are the cortex
-    # (left and right hemi, the others are related to the substructures)
-    if len(hemi_idx) == 1:
-        active_vert = fwd_src[hemi_idx[0]]['vertno']
-    else:
-        active_left = fwd_src[0]['vertno']
-        active_right = fwd_src[1]['vertno'] + mesh[0].shape[0]
-        active_vert = np.r_[active_left, active_right]
+    # Read the source space (cached) :
+    assert os.path.isfile(fwd_file)
+    (vertices, faces, lr_index, sources,
+     active_vert) = _read_fwd_geometry(os.path.abspath(fwd_file),
+                                       os.path.getmtime(fwd_file), sbj,
+                                       sbj_dir, hemisphere)
     logger.info('%i active vertices detected ' % len(active_vert))
     # Add data to the mesh :
+    tc_data = None
     if isinstance(active_data, np.ndarray):
         if len(active_data) != len(active_vert):
             logger.error("The length of `active data` (%i) must be the same "
@@ -102,31 +160,29 @@ def mne_plot_source_estimation(sbj, sbj_dir, fwd_file, stc_file=None,
         # Get active data :
         assert os.path.isfile(stc_file)
         n_tp = active_data
-        data = mne.read_source_estimate(stc_file).data
-        active_data = np.abs(data[:, n_tp] / data[:, n_tp].max())
-        logger.info("Time instant %i used for activation" % n_tp)
+        if timecourse:
+            # Keep the (n_vertices, n_times) float32 blocks memory-mapped :
+            tc_data = _read_stc_timecourse(stc_file, hemisphere)
+            logger.info("Time course of %i time instants used for "
+                        "activation" % tc_data[0].shape[1])
+        else:
+            data = mne.read_source_estimate(stc_file).data
+            active_data = np.abs(data[:, n_tp] / data[:, n_tp].max())
+            logger.info("Time instant %i used for activation" % n_tp)
     else:
         logger.info("No active data detected.")
         active_data = active_vert = None
-    # Concatenate vertices, faces and sources :
-    vertices = np.concatenate(mesh)
-    lr_index = np.r_[np.ones((len(mesh[0]),)), np.zeros((len(mesh[1]),))]
-    sources = np.concatenate(sources)
-    # Get faces :
-    if len(hemi_idx) == 1:
-        faces = fwd_src[hemi_idx[0]]['tris']
-    else:
-        _faces_l = fwd_src[0]['tris']
-        _faces_r = fwd_src[1]['tris'] + _faces_l.max() + 1
-        faces = np.r_[_faces_l, _faces_r].astype(int)
     # Define a brain object and a source object :
     logger.info('Define a Brain and Source objects')
     from visbrain.objects import BrainObj, SourceObj, SceneObj
     b_obj = BrainObj(sbj + '_brain', vertices=vertices, faces=faces,
-                     lr_index=lr_index.astype(bool), **kw_brain_obj)
+                     lr_index=lr_index, **kw_brain_obj)
     s_obj = SourceObj(sbj + '_src', sources, visible=False, **kw_source_obj)
     # Add data to the BrainObj if needed :
-    if isinstance(active_data, np.ndarray):
+    if tc_data is not None:
+        b_obj.add_timecourse(tc_data, active_vert, time=active_data,
+                             **kw_activation)
+    elif isinstance(active_data, np.ndarray):
         logger.info("Add active data between "
                     "[%2f, %2f]" % (active_data.min(), active_data.max()))
         b_obj.add_activation(data=active_data, vertices=active_vert,
@@ -139,7 +195,7 @@ def mne_plot_source_estimation(sbj, sbj_dir, fwd_file, stc_file=None,
         # Remove all brain templates except the one of the subject :
         brain._brain_template.setEnabled(False)
         # By default, display colorbar if activation :
-        if isinstance(active_data, np.ndarray):
+        if isinstance(active_data, np.ndarray) or b_obj.n_times:
             brain.menuDispCbar.setChecked(True)
             brain._fcn_menu_disp_cbar()
         brain.show()
@@ -0,0 +1,175 @@
+"""Compositing of overlay layers (activations, parcellations) on a mesh."""
+from collections import OrderedDict
+
+import numpy as np
+
+
+class OverlayLayers(object):
+    """Manage overlay layers using running accumulators.
+
+    The color of a vertex is the weighted mean of the colors of the visible
+    layers covering it and a vertex is masked (i.e colored) if at least one
+    visible layer covers it. Instead of stacking the colors of every layer,
+    the weighted sum of colors, the sum of weights and the number of layers
+    covering each vertex are accumulated. Hence, adding, removing, toggling
+    or reweighting a layer only updates the vertices covered by this layer.
+    Each layer only keeps the colors of the vertices it covers.
+
+    Parameters
+    ----------
+    n_vertices : int
+        Number of vertices of the mesh.
+    """
+
+    def __init__(self, n_vertices):
+        """Init."""
+        self._n_vertices = int(n_vertices)
+        self._layers = OrderedDict()
+        self._count = 0
+        self.clear()
+
+    def __len__(self):
+        """Get the number of layers."""
+        return len(self._layers)
+
+    def __contains__(self, name):
+        """Get if a layer exists."""
+        return name in self._layers
+
+    def __iter__(self):
+        """Iterate over layer names."""
+        return iter(self._layers)
+
+    def clear(self):
+        """Remove all layers."""
+        self._layers.clear()
+        self._sum = np.zeros((self._n_vertices, 4), dtype=np.float64)
+        self._weight = np.zeros((self._n_vertices,), dtype=np.float64)
+        self._cover = np.zeros((self._n_vertices,), dtype=np.int32)
+
+    def _accumulate(self, layer, sign):
+        """Add (sign=1) or subtract (sign=-1) a layer to accumulators."""
+        if not layer['visible']:
+            return
+        idx, w = layer['index'], sign * layer['weight']
+        self._sum[idx, :] += w * layer['color']
+        self._weight[idx] += w
+        self._cover[idx] += sign
+
+    def add(self, color, mask, name=None, weight=1., visible=True):
+        """Add a layer.
+
+        Parameters
+        ----------
+        color : array_like
+            Array of colors of shape (n_vertices, 4).
+        mask : array_like
+            Vector of shape (n_vertices,) where non-zero values refer to the
+            vertices covered by the layer.
+        name : string | None
+            Name of the layer. If a layer with the same name already exists,
+            it is replaced. If None, a default name is used ('layer<i>').
+        weight : float | 1.
+            Weight of the layer.
+        visible : bool | True
+            Layer visibility.
+
+        Returns
+        -------
+        name : string
+            Name of the layer.
+        """
+        assert color.shape == (self._n_vertices, 4)
+        assert len(mask) == self._n_vertices
+        if name is None:
+            name = 'layer%i' % self._count
+        self._count += 1
+        if name in self._layers:
+            self.remove(name)
+        idx = np.flatnonzero(mask)
+        layer = dict(index=idx, color=np.asarray(color[idx, :], np.float32),
+                     weight=float(weight), visible=bool(visible))
+        self._layers[name] = layer
+        self._accumulate(layer, 1)
+        return name
+
+    def remove(self, name):
+        """Remove a layer.
+
+        Parameters
+        ----------
+        name : string
+            Name of the layer.
+        """
+        self._accumulate(self._layers.pop(name), -1)
+        if not len(self._layers):  # avoid rounding errors
+            self.clear()
+
+    def set_weight(self, name, weight):
+        """Set the weight of a layer.
+
+        Parameters
+        ----------
+        name : string
+            Name of the layer.
+        weight : float
+            The new weight.
+        """
+        layer = self._layers[name]
+        self._accumulate(layer, -1)
+        layer['weight'] = float(weight)
+        self._accumulate(layer, 1)
+
+    def set_visible(self, name, visible):
+        """Show or hide a layer.
+
+        Parameters
+        ----------
+        name : string
+            Name of the layer.
+        visible : bool
+            Layer visibility.
+        """
+        layer = self._layers[name]
+        self._accumulate(layer, -1)
+        layer['visible'] = bool(visible)
+        self._accumulate(layer, 1)
+
+    def move(self, name, index):
+        """Move a layer to a new position.
+
+        The color of vertices doesn't depend on the order of layers.
+
+        Parameters
+        ----------
+        name : string
+            Name of the layer.
+        index : int
+            The new position of the layer.
+        """
+        names = list(self._layers)
+        names.remove(name)
+        names.insert(index, name)
+        for k in names:
+            self._layers.move_to_end(k)
+
+    # ----------- NAMES -----------
+    @property
+    def names(self):
+        """Get the names value."""
+        return list(self._layers)
+
+    # ----------- COLOR -----------
+    @property
+    def color(self):
+        """Get the color value."""
+        color = np.zeros((self._n_vertices, 4), dtype=np.float32)
+        is_w = self._weight != 0.
+        color[is_w, :] = self._sum[is_w, :] / self._weight[is_w, np.newaxis]
+        return color
+
+    # ----------- MASK -----------
+    @property
+    def mask(self):
+        """Get the mask value."""
+        return (self._cover > 0).astype(np.float32)
@@ -2,11 +2,13 @@
 import numpy as np
 from scipy.spatial.distance import cdist
 
-from ..utils import (normalize, array2colormap, color2vb)
+from ..utils import (normalize, color2vb)
 
 import logging
 logger = logging.getLogger('visbrain')
 PROJ_STR = "%i sources visibles and not masked used for the %s"
+# Maximum memory (bytes) used by distances of a block of vertices :
+MEM_BUDGET = 64e6
 
 
 def _get_eucl_mask(v, xyz, radius, contribute, xsign):
@@ -24,6 +26,16 @@ def _get_eucl_mask(v, xyz, radius, contribute, xsign):
     return eucl, mask
 
 
+def _vertex_blocks(nv, n_sources, mem_budget=MEM_BUDGET):
+    """Split vertices into blocks with distances that fit in mem_budget.
+
+    Around 16 bytes are needed per (vertex, source) pair (euclidian distance
+    in float64 and float32, mask and hemisphere mask).
+    """
+    size = max(int(mem_budget // (16 * max(n_sources, 1))), 1)
+    return [slice(k, min(k + size, nv)) for k in range(0, nv, size)]
+
+
 def _check_projection(s_obj, v, radius, contribute, not_masked=True):
     # =============== CHECKING ===============
     assert isinstance(v, np.ndarray)
@@ -44,7 +56,92 @@ def _check_projection(s_obj, v, radius, contribute, not_masked=True):
     return xyz, data, v, xsign
 
 
-def _project_modulation(s_obj, v, radius, contribute=False):
+def _get_projection_operator(xyz, v, radius, contribute=False,
+                             mem_budget=MEM_BUDGET):
+    """Get the sparse operator of vertex-source distances under radius.
+
+    Parameters
+    ----------
+    xyz : array_like
+        The source's coordinates of shape (n_sources, 3).
+    v : array_like
+        The vertices of shape (nv, 3) or (nv, 3, 3) if index faced.
+    radius : float
+        The radius under which activity is projected on vertices.
+    contribute: bool | False
+        Specify if sources contribute on both hemisphere.
+    mem_budget : float | MEM_BUDGET
+        Maximum memory (bytes) used to compute distances. Vertices are
+        processed by blocks to stay under this budget.
+
+    Returns
+    -------
+    operator : dict
+        Dictionary containing the coordinates of the sources (xyz), the
+        projection parameters (radius, contribute), the (nv * index_faced,
+        n_sources) shape of the operator, the distances under radius
+        in COO format (rows, cols, dist) and the maximum distance of each
+        source to vertices (dmax) of shape (index_faced, n_sources).
+    """
+    v = v[:, np.newaxis, :] if v.ndim == 2 else v
+    xyz = np.asarray(xyz, dtype=float)
+    nv, index_faced = v.shape[0], v.shape[1]
+    xsign = np.sign(xyz[:, 0]).reshape(1, -1)
+    rows, cols, dist = [], [], []
+    dmax = np.zeros((index_faced, xyz.shape[0]), dtype=np.float32)
+    for k in range(index_faced):
+        for sl in _vertex_blocks(nv, xyz.shape[0], mem_budget):
+            eucl, mask = _get_eucl_mask(v[sl, k, :], xyz, radius,
+                                        contribute, xsign)
+            np.maximum(dmax[k, :], eucl.max(0), out=dmax[k, :])
+            r, c = np.nonzero(mask)
+            rows.append((r + sl.start) * index_faced + k)
+            cols.append(c)
+            dist.append(eucl[r, c])
+    if not rows:
+        rows = cols = [np.array([], dtype=int)]
+        dist = [np.array([], dtype=np.float32)]
+    return dict(xyz=xyz, radius=float(radius), contribute=bool(contribute),
+                shape=np.array([nv * index_faced, xyz.shape[0]]),
+                rows=np.concatenate(rows), cols=np.concatenate(cols),
+                dist=np.concatenate(dist), dmax=dmax)
+
+
+def _find_projection_operator(operators, xyz, n_rows, radius, contribute):
+    """Find a precomputed operator matching a projection (or None)."""
+    for op in operators:
+        is_param = (op['radius'] == radius) and (
+            op['contribute'] == contribute) and (op['shape'][0] == n_rows)
+        if is_param and (op['xyz'].shape == xyz.shape) and np.allclose(
+                op['xyz'], xyz):
+            return op
+    return None
+
+
+def _get_operator(s_obj, v, radius, contribute, operator, not_masked=True):
+    """Get the operator of selected sources as (rows, cols, dist, dmax).
+
+    If no precomputed operator is provided, distances are computed only
+    for selected sources.
+    """
+    if not_masked:  # get visible and not masked sources
+        sel = s_obj.visible_and_not_masked
+    else:           # get visible and masked sources
+        sel = np.logical_and(s_obj.mask, s_obj.visible)
+    sel = np.asarray(sel, dtype=bool)
+    if operator is None:
+        operator = _get_projection_operator(s_obj._xyz[sel, :], v, radius,
+                                            contribute)
+        return (operator['rows'], operator['cols'], operator['dist'],
+                operator['dmax'])
+    # Select columns of the precomputed operator :
+    keep = sel[operator['cols']]
+    new_cols = np.cumsum(sel) - 1
+    return (operator['rows'][keep], new_cols[operator['cols'][keep]],
+            operator['dist'][keep], operator['dmax'][:, sel])
+
+
+def _project_modulation(s_obj, v, radius, contribute=False, operator=None):
     """Project source's data onto vertices.
 
     Parameters
@@ -57,6 +154,9 @@ def _project_modulation(s_obj, v, radius, contribute=False):
         The radius under which activity is projected on vertices.
     contribute: bool | False
         Specify if sources contribute on both hemisphere.
+    operator : dict | None
+        Precomputed projection operator of all sources (see
+        _get_projection_operator). If None, distances are computed.
 
     Returns
     -------
@@ -78,23 +178,28 @@ def _project_modulation(s_obj, v, radius, contribute=False):
                     "not masked")
         return np.squeeze(np.ma.masked_array(modulation, True))
 
+    # =============== EUCLIDIAN DISTANCE ===============
+    rows, cols, dist, dmax = _get_operator(s_obj, v, radius, contribute,
+                                           operator)
+
     # For each triangle :
     for k in range(index_faced):
-        # =============== EUCLIDIAN DISTANCE ===============
-        eucl, mask = _get_eucl_mask(v[:, k, :], xyz, radius, contribute, xsign)
-        # Invert euclidian distance for modulation and mask it :
-        np.multiply(eucl, -1. / eucl.max(), out=eucl)
+        is_k = rows % index_faced == k
+        r, c, eucl = rows[is_k] // index_faced, cols[is_k], dist[is_k]
+        # Invert euclidian distance for modulation :
+        eucl = eucl.astype(np.float32)
+        np.multiply(eucl, -1. / dmax[k, :].max(), out=eucl)
         np.add(eucl, 1., out=eucl)
-        eucl = np.ma.masked_array(eucl, mask=np.invert(mask),
-                                  dtype=np.float32)
 
         # =============== MODULATION ===============
         # Modulate data by distance (only for sources under radius) :
-        modulation[:, k] = np.ma.dot(eucl, data, strict=False)
+        mod = np.bincount(r, eucl * data[c], minlength=v.shape[0])
+        count = np.bincount(r, minlength=v.shape[0])
+        modulation[:, k] = np.ma.masked_array(mod, mask=count == 0)
 
         # =============== PROPORTIONS ===============
-        np.sum(mask, axis=1, dtype=np.float32, out=prop[:, k])
-        nnz = np.nonzero(mask.sum(0))
+        prop[:, k] = count
+        nnz = np.nonzero(np.bincount(c, minlength=len(data)))
         minmax[k, :] = np.array([data[nnz].min(), data[nnz].max()])
 
     # Divide modulations by the number of contributing sources :
@@ -107,7 +212,8 @@ def _project_modulation(s_obj, v, radius, contribute=False):
     return np.squeeze(modulation)
 
 
-def _project_repartition(s_obj, v, radius, contribute=False):
+def _project_repartition(s_obj, v, radius, contribute=False,
+                         operator=None):
     """Project source's repartition onto vertices.
 
     Parameters
@@ -120,6 +226,9 @@ def _project_repartition(s_obj, v, radius, contribute=False):
         The radius under which activity is projected on vertices.
     contribute: bool | False
         Specify if sources contribute on both hemisphere.
+    operator : dict | None
+        Precomputed projection operator of all sources (see
+        _get_projection_operator). If None, distances are computed.
 
     Returns
     -------
@@ -139,14 +248,15 @@ def _project_repartition(s_obj, v, radius, contribute=False):
                     "not masked")
         return np.squeeze(np.ma.masked_array(repartition, True))
 
+    # =============== EUCLIDIAN DISTANCE ===============
+    rows = _get_operator(s_obj, v, radius, contribute, operator)[0]
+
     # For each triangle :
     for k in range(index_faced):
-        # =============== EUCLIDIAN DISTANCE ===============
-        eucl, mask = _get_eucl_mask(v[:, k, :], xyz, radius, contribute, xsign)
-
         # =============== REPARTITION ===============
         # Sum over sources dimension :
-        sm = np.sum(mask, 1, dtype=np.int)
+        r = rows[rows % index_faced == k] // index_faced
+        sm = np.bincount(r, minlength=v.shape[0]).astype(np.int)
         smmask = np.invert(sm.astype(bool))
         repartition[:, k] = np.ma.masked_array(sm, mask=smmask)
     s_obj._minmax = (repartition.min(), repartition.max())
@@ -154,7 +264,8 @@ def _project_repartition(s_obj, v, radius, contribute=False):
     return np.squeeze(repartition)
 
 
-def _get_masked_index(s_obj, v, radius, contribute=False):
+def _get_masked_index(s_obj, v, radius, contribute=False, operator=None,
+                      mem_budget=MEM_BUDGET):
     """Get the index of masked source's under radius.
 
     Parameters
@@ -167,6 +278,12 @@ def _get_masked_index(s_obj, v, radius, contribute=False):
         The radius under which activity is projected on vertices.
     contribute: bool | False
         Specify if sources contribute on both hemisphere.
+    operator : dict | None
+        Precomputed projection operator of all sources (see
+        _get_projection_operator). If None, distances are computed.
+    mem_budget : float | MEM_BUDGET
+        Maximum memory (bytes) used to compute distances. Vertices are
+        processed by blocks to stay under this budget.
 
     Returns
     -------
@@ -177,18 +294,23 @@ def _get_masked_index(s_obj, v, radius, contribute=False):
     xyz, data, v, xsign = _check_projection(s_obj, v, radius, contribute,
                                             False)
     logger.info("%i sources visibles and masked found" % len(data))
-    # Predefined masked euclidian distance :
     nv, index_faced = v.shape[0], v.shape[1]
-    fmask = np.ones((v.shape[0], index_faced, len(data)), dtype=bool)
-
-    # For each triangle :
+    if operator is not None:
+        rows = _get_operator(s_obj, v, radius, contribute, operator, False)[0]
+        idx = np.bincount(rows, minlength=nv * index_faced).astype(bool)
+        return np.squeeze(idx.reshape(nv, index_faced))
+    idx = np.zeros((nv, index_faced), dtype=bool)
+    if not len(data):
+        return np.squeeze(idx)
+
+    # For each triangle and block of vertices :
     for k in range(index_faced):
-        # =============== EUCLIDIAN DISTANCE ===============
-        _, fmask[:, k, :] = _get_eucl_mask(v[:, k, :], xyz, radius, contribute,
-                                           xsign)
-    # Find where there's sources under radius and need to be masked :
-    m = fmask.reshape(fmask.shape[0] * index_faced, fmask.shape[2])
-    idx = np.dot(m, np.ones((len(data),), dtype=bool))
+        for sl in _vertex_blocks(nv, len(data), mem_budget):
+            # =============== EUCLIDIAN DISTANCE ===============
+            _, mask = _get_eucl_mask(v[sl, k, :], xyz, radius, contribute,
+                                     xsign)
+            # Find where there's sources under radius and need to be masked :
+            idx[sl, k] = mask.any(1)
 
     return np.squeeze(idx.reshape(nv, index_faced))
 
@@ -197,7 +319,11 @@ def _project_sources_data(s_obj, b_obj, project='modulation', radius=10.,
                           contribute=False, cmap='viridis', clim=None,
                           vmin=None, under='black', vmax=None, over='red',
                           mask_color=None):
-    """Project source's data."""
+    """Project source's data.
+
+    If the brain object contains a precomputed projection operator of the
+    sources (see BrainObj.add_projection), distances are not computed.
+    """
     # _____________________ CHECKING _____________________
     assert type(s_obj).__name__ in ['SourceObj', 'CombineSources']
     assert type(b_obj).__name__ in ['BrainObj', 'RoiObj']
@@ -215,23 +341,38 @@ def _project_sources_data(s_obj, b_obj, project='modulation', radius=10.,
     mask_color = color2vb(mask_color)
     logger.info("Project the source's %s (radius=%r, "
                 "contribute=%r)" % (project, radius, contribute))
-    # Get mesh and vertices :
+    # Get mesh and vertices (of the full resolution mesh) :
     mesh = b_obj.mesh
-    vertices = mesh._vertices
+    lod = getattr(b_obj, '_lod', None)
+    vertices = mesh._vertices if lod is None else lod['vertices']
     mask = np.zeros((vertices.shape[0]), dtype=np.float32)
+    operator = _find_projection_operator(getattr(b_obj, '_projections', []),
+                                         s_obj._xyz, vertices.shape[0],
+                                         radius, contribute)
+    if operator is not None:
+        logger.info("Use the precomputed projection operator")
 
     # _____________________ GET MODULATION _____________________
-    mod = project_fcn(s_obj, vertices, radius, contribute)
+    mod = project_fcn(s_obj, vertices, radius, contribute, operator)
+    # Get where there's masked sources :
+    if s_obj.is_masked:
+        mask_idx = _get_masked_index(s_obj, vertices, radius, contribute,
+                                     operator)
+        mask[mask_idx] = 2.
+    # Full resolution -> displayed vertices (level of detail) :
+    if lod is not None:
+        data, w_sum = b_obj._to_lod(mod.data, ~np.ma.getmaskarray(mod))
+        mod = np.ma.masked_array(data, mask=w_sum == 0.)
+        masked = b_obj._to_lod(mask == 2.)[0] != 0.
+        mask = np.zeros((len(mod),), dtype=np.float32)
+        mask[masked] = 2.
     # Update mesh color informations :
     b_obj._cbar_data = mod
     b_obj._minmax = (float(mod.min()), float(mod.max()))
     if clim is None:
         clim = b_obj._minmax
         b_obj._clim = b_obj._minmax
-    # Get where there's masked sources :
     if s_obj.is_masked:
-        mask_idx = _get_masked_index(s_obj, vertices, radius, contribute)
-        mask[mask_idx] = 2.
         mesh.mask_color = mask_color
         logger.info("Set masked sources cortical activity to the "
                     "color %s" % str(list(mesh.mask_color.ravel())[0:-1]))
@@ -240,7 +381,8 @@ def _project_sources_data(s_obj, b_obj, project='modulation', radius=10.,
         mask[~mod.mask] = 1.
 
     # _____________________ MODULATION TO COLOR _____________________
+    # Data are sent once, the colormap is then applied on the GPU :
     mesh.mask = mask
-    mod_color = array2colormap(mod, cmap=cmap, clim=clim, vmin=vmin, vmax=vmax,
-                               under=under, over=over)
-    mesh.color = mod_color
+    mesh.set_scalar(mod)
+    mesh.set_colormap(cmap=cmap, clim=clim, vmin=vmin, vmax=vmax, under=under,
+                      over=over)
@@ -2,22 +2,76 @@
 import os
 import numpy as np
 import logging
+from functools import lru_cache
+from scipy import sparse
+from scipy.spatial import cKDTree
 
 from vispy import scene
 
 from .visbrain_obj import VisbrainObject
-from ._projection import _project_sources_data
+from ._overlay import OverlayLayers
+from ._projection import (_project_sources_data, _get_projection_operator,
+                          _find_projection_operator)
 from ..visuals import BrainMesh
 from ..utils import (mesh_edges, smoothing_matrix, array2colormap,
-                     rotate_turntable)
+                     rotate_turntable, mesh_isolines, mesh_decimation)
 from ..io import (download_file, is_nibabel_installed, is_pandas_installed,
                   get_data_path, get_files_in_data, add_brain_template,
                   remove_brain_template, path_to_tmp, get_files_in_folders,
-                  path_to_visbrain_data)
+                  path_to_visbrain_data, read_template_dir)
+from ..io.rw_template import TEMPLATE_EXT
 
 logger = logging.getLogger('visbrain')
 
 
+@lru_cache(maxsize=8)
+def _read_annot(file, mtime):
+    """Read a .annot file.
+
+    The modification time is only used to invalidate the cache. Returned
+    arrays are read-only because they are shared between calls.
+    """
+    import nibabel
+    # Get index and labels :
+    id_vert, ctab, names = nibabel.freesurfer.read_annot(file)
+    names = np.array(names).astype(str)
+    color, u_idx = ctab[:, 0:4], ctab[..., -1]
+    logger.info("Annot file loaded (%s)" % file)
+    # Test if variables have the same size :
+    if len(u_idx) != len(names):
+        min_len = min(len(u_idx), color.shape[0], len(names))
+        logger.warning("Length of label names (%i) and index (%i) doesn't "
+                       "match. Following label index ignored : %s" % (
+                           len(names), len(u_idx),
+                           ", ".join(u_idx[min_len::].astype(str))))
+        color = color[0:min_len, :]
+        names = names[0:min_len]
+        u_idx = u_idx[0:min_len]
+    for k in (id_vert, color, names, u_idx):
+        k.flags.writeable = False
+    return id_vert, color, names, u_idx
+
+
+def _blocks_minmax(blocks, chunk=4194304):
+    """Get the (min, max) of blocks of data, reading at most chunk values
+    at once (i.e. memory-mapped blocks are never fully loaded).
+
+    Blocks are sliced along their outer axis in memory (e.g. time for the
+    transposed memory-mapped data of stc files) so that each slice is a
+    contiguous portion of the file.
+    """
+    d_min, d_max = np.inf, -np.inf
+    for block in blocks:
+        axis = 0 if block.strides[0] >= block.strides[1] else 1
+        n_sl = max(chunk // max(block.shape[1 - axis], 1), 1)
+        for start in range(0, block.shape[axis], n_sl):
+            sl = [slice(None)] * 2
+            sl[axis] = slice(start, start + n_sl)
+            x = block[tuple(sl)]
+            d_min, d_max = min(d_min, x.min()), max(d_max, x.max())
+    return float(d_min), float(d_max)
+
+
 class BrainObj(VisbrainObject):
     """Create a brain object.
 
@@ -43,6 +97,13 @@ class BrainObj(VisbrainObject):
         hemisphere.
     hemisphere : {'left', 'both', 'right'}
         The hemisphere to plot.
+    lod : int | float | None
+        Level of detail. Use an integer for the approximate number of
+        vertices of the displayed mesh or a float between 0 and 1 for the
+        ratio of vertices to keep (e.g for thumbnails or subplots). The mesh
+        is decimated using vertex clustering (see utils.mesh_decimation).
+        Activations, parcellations and projections are still defined on the
+        full resolution mesh and then averaged over displayed vertices.
     translucent : bool | True
         Use translucent (True) or opaque (False) brain.
     transform : VisPy.visuals.transforms | None
@@ -71,17 +132,21 @@ class BrainObj(VisbrainObject):
     def __init__(self, name, vertices=None, faces=None, normals=None,
                  lr_index=None, hemisphere='both', translucent=True,
                  sulcus=False, invert_normals=False, transform=None,
-                 parent=None, verbose=None, _scale=1., **kw):
+                 parent=None, verbose=None, lod=None, _scale=1., **kw):
         """Init."""
         # Init Visbrain object base class :
         VisbrainObject.__init__(self, name, parent, transform, verbose, **kw)
         # Load brain template :
         self._scale = _scale
+        self._vertices_tree = None
+        self._projections = []
+        self._adjacency = None
+        self._isolines = {}
+        self._lod = None
+        self._timecourse, self._timer = None, None
         self.set_data(name, vertices, faces, normals, lr_index, hemisphere,
-                      invert_normals, sulcus)
+                      invert_normals, sulcus, lod)
         self.translucent = translucent
-        self._data_color = []
-        self._data_mask = []
 
     def __len__(self):
         """Get the number of vertices."""
@@ -89,7 +154,7 @@ class BrainObj(VisbrainObject):
 
     def set_data(self, name=None, vertices=None, faces=None, normals=None,
                  lr_index=None, hemisphere='both', invert_normals=False,
-                 sulcus=False):
+                 sulcus=False, lod=None):
         """Load a brain template."""
         # _______________________ DEFAULT _______________________
         b_download = self._get_downloadable_templates()
@@ -100,6 +165,8 @@ class BrainObj(VisbrainObject):
         if not isinstance(vertices, np.ndarray):  # predefined
             (vertices, faces, normals,
              lr_index) = self._load_brain_template(name)
+        else:
+            self._projections, self._adjacency = [], None
         # Sulcus :
         if sulcus is True:
             if name not in b_download:
@@ -121,27 +188,49 @@ class BrainObj(VisbrainObject):
         assert (lr_index is None) or isinstance(lr_index, np.ndarray)
         assert hemisphere in ['both', 'left', 'right']
 
+        # _______________________ LEVEL OF DETAIL _______________________
+        self._lod = None
+        if lod is not None:
+            (vertices, faces, normals, lr_index,
+             sulcus) = self._decimate(vertices, faces, normals, lr_index,
+                                      sulcus, lod)
+
         self._define_mesh(vertices, faces, normals, lr_index, hemisphere,
                           invert_normals, sulcus)
+        # Overlay layers (activations, parcellations) :
+        self._overlays = OverlayLayers(len(self.mesh))
+        for k in list(self._isolines):
+            self._remove_isolines(k)
+        self._remove_timecourse()
 
     def clean(self):
         """Clean brain object."""
         self.hemisphere = 'both'
         self.mask = 0.
         self.rotate('top')
-        self._data_color = []
-        self._data_mask = []
+        self._overlays.clear()
+        for k in list(self._isolines):
+            self._remove_isolines(k)
+        self._remove_timecourse()
         logger.info("Brain object %s cleaned." % self.name)
 
-    def save(self, tmpfile=False):
-        """Save the brain template (if not already saved)."""
+    def save(self, tmpfile=False, mmap=False):
+        """Save the brain template (if not already saved).
+
+        Parameters
+        ----------
+        tmpfile : bool | False
+            Save the template in the temporary folder.
+        mmap : bool | False
+            Save the template as a directory of memory-mappable arrays,
+            faster to load than the default compressed .npz file.
+        """
         save_as = self.name + '.npz'
-        v = self.mesh._vertices
-        f = self.mesh._faces
-        n = self.mesh._normals
-        lr = self.mesh._lr_index
+        v, f, lr = self._get_full_mesh()
+        n = self.mesh._normals if self._lod is None else self._lod['normals']
         add_brain_template(save_as, v, f, normals=n, lr_index=lr,
-                           tmpfile=tmpfile)
+                           tmpfile=tmpfile, projections=self._projections,
+                           mmap=mmap)
 
     def remove(self):
         """Remove a brain template."""
@@ -169,6 +258,87 @@ class BrainObj(VisbrainObject):
             self.mesh.set_data(vertices=vertices, faces=faces, normals=normals,
                                lr_index=lr_index, hemisphere=hemisphere)
 
+    def _get_adjacency(self):
+        """Get the adjacency matrix of the mesh (precomputed if possible)."""
+        if self._adjacency is None:
+            self._adjacency = mesh_edges(self._get_full_mesh()[1])
+        return self._adjacency
+
+    def _decimate(self, vertices, faces, normals, lr_index, sulcus, lod):
+        """Decimate the mesh and keep the full resolution one."""
+        n_full = vertices.shape[0]
+        assert isinstance(lod, (int, float)) and (lod > 0)
+        n_vertices = int(round(lod * n_full)) if isinstance(lod, float) else (
+            lod)
+        if n_vertices >= n_full:
+            return vertices, faces, normals, lr_index, sulcus
+        if lr_index is None:
+            lr_index = vertices[:, 0] <= vertices[:, 0].mean()
+        lr_index = np.asarray(lr_index, dtype=bool)
+        self._lod = dict(vertices=vertices, faces=faces, normals=normals,
+                         lr_index=lr_index)
+        v_lod, f_lod, index = mesh_decimation(vertices, faces, n_vertices,
+                                              lr_index=lr_index)
+        self._lod['index'] = index
+        # Vertices of a cluster belong to the same hemisphere :
+        lr_lod = np.zeros((len(v_lod),), dtype=bool)
+        lr_lod[index] = lr_index
+        if isinstance(sulcus, np.ndarray):
+            sulcus = np.round(self._to_lod(sulcus)[0])
+        return v_lod, f_lod, None, lr_lod, sulcus
+
+    def _get_full_mesh(self):
+        """Get vertices, faces and lr_index of the full resolution mesh."""
+        if self._lod is None:
+            return self.mesh._vertices, self.mesh._faces, self.mesh._lr_index
+        lod = self._lod
+        return lod['vertices'], lod['faces'], lod['lr_index']
+
+    def _to_lod(self, data, weights=None):
+        """Average data of the full resolution mesh over displayed vertices.
+
+        Parameters
+        ----------
+        data : array_like
+            Array of data of shape (n_full_vertices, ...).
+        weights : array_like | None
+            Weight of each vertex of the full resolution mesh.
+
+        Returns
+        -------
+        data : array_like
+            The weighted mean of data of shape (n_vertices, ...).
+        w_sum : array_like
+            Sum of the weights of shape (n_vertices,).
+        """
+        if self._lod is None:
+            w = np.ones((len(data),)) if weights is None else weights
+            return data, np.asarray(w, dtype=float)
+        index = self._lod['index']
+        n = index.max() + 1
+        w = np.ones((len(index),)) if weights is None else np.asarray(
+            weights, dtype=float)
+        w_sum = np.bincount(index, w, minlength=n)
+        x = np.asarray(data, dtype=float).reshape(len(index), -1)
+        out = np.zeros((n, x.shape[1]))
+        for k in range(x.shape[1]):
+            out[:, k] = np.bincount(index, x[:, k] * w, minlength=n)
+        is_w = w_sum != 0.
+        out[is_w, :] /= w_sum[is_w, np.newaxis]
+        return out.reshape((n,) + np.shape(data)[1:]), w_sum
+
+    def _get_vertices_tree(self):
+        """Get the KD-tree of the vertices.
+
+        The tree is built once and only rebuilt when the mesh or the
+        displayed hemisphere change.
+        """
+        v, hemi = self.mesh._vertices, self.hemisphere
+        tree = self._vertices_tree
+        if (tree is None) or (tree[0] is not v) or (tree[1] != hemi):
+            self._vertices_tree = (v, hemi, cKDTree(self.vertices))
+        return self._vertices_tree[2]
+
     def _search_in_path(self):
         """Specify where to find brain templates."""
         _vb_path_tmp = path_to_visbrain_data(folder='templates')
@@ -177,13 +347,36 @@ class BrainObj(VisbrainObject):
         return _vb_path_tmp, _data_path, _tmp_path
 
     def _load_brain_template(self, name):
-        """Load the brain template."""
-        path = self._search_in_path()
-        name = get_files_in_folders(*path, file=name + '.npz')[0]
-        arch = np.load(name)
+        """Load the brain template.
+
+        Folders are searched in priority order. Inside a folder, the
+        memory-mappable template (directory) is used in priority.
+        """
+        for folder in self._search_in_path():
+            tpl = os.path.join(folder, name + TEMPLATE_EXT)
+            if os.path.isdir(tpl):
+                tpl = read_template_dir(tpl)
+                self._projections = tpl['projections']
+                self._adjacency = tpl['adjacency']
+                return (tpl['vertices'], tpl['faces'], tpl['normals'],
+                        tpl['lr_index'])
+            file = os.path.join(folder, name + '.npz')
+            if os.path.isfile(file):
+                break
+        self._adjacency = None
+        arch = np.load(file)
         vertices, faces = arch['vertices'], arch['faces']
         normals = arch['normals']
         lr_index = arch['lr_index'] if 'lr_index' in arch.keys() else None
+        # Precomputed projection operators :
+        self._projections = []
+        keys = [k for k in arch.keys() if k.startswith('projection')]
+        for i in range(len([k for k in keys if k.endswith('_rows')])):
+            pre = 'projection%i_' % i
+            op = {k[len(pre):]: arch[k] for k in keys if k.startswith(pre)}
+            op['radius'], op['contribute'] = float(op['radius']), bool(
+                op['contribute'])
+            self._projections.append(op)
         return vertices, faces, normals, lr_index
 
     ###########################################################################
@@ -321,10 +514,38 @@ class BrainObj(VisbrainObject):
         _project_sources_data(s_obj, self, project, radius, contribute,
                               mask_color=mask_color, **kw)
 
+    def add_projection(self, s_obj, radius=10., contribute=False):
+        """Precompute the projection of a fixed set of sources.
+
+        The sparse operator of vertex-source distances under radius is kept
+        by the brain object and saved with the template (see the save
+        method). Projecting sources with the same coordinates and the same
+        (radius, contribute) parameters then skips distance computations.
+
+        Parameters
+        ----------
+        s_obj : SourceObj
+            The source object (e.g. a standard montage of sensors).
+        radius : float | 10.
+            The radius under which activity is projected on vertices.
+        contribute: bool | False
+            Specify if sources contribute on both hemisphere.
+        """
+        xyz, vertices = s_obj._xyz, self._get_full_mesh()[0]
+        op = _find_projection_operator(self._projections, xyz,
+                                       vertices.shape[0], radius, contribute)
+        if op is not None:
+            self._projections.remove(op)
+        op = _get_projection_operator(xyz, vertices, radius, contribute)
+        self._projections.append(op)
+        logger.info("Projection operator of %i sources added (radius=%r, "
+                    "contribute=%r)" % (len(xyz), radius, contribute))
+
     def add_activation(self, data=None, vertices=None, smoothing_steps=20,
                        file=None, hemisphere=None, hide_under=None,
                        n_contours=None, cmap='viridis', clim=None, vmin=None,
-                       vmax=None, under='gray', over='red'):
+                       vmax=None, under='gray', over='red', layer=None,
+                       contour_lines=False):
         """Add activation to the brain template.
 
         This method can be used for :
@@ -350,6 +571,9 @@ class BrainObj(VisbrainObject):
             Hide activations under a certain threshold.
         n_contours : int | None
             Display activations as contour.
+        contour_lines : bool | False
+            Draw contours as isolines (use it with n_contours) instead of
+            quantized activations.
         cmap : string | 'viridis'
             The colormap to use.
         clim : tuple | None
@@ -363,11 +587,22 @@ class BrainObj(VisbrainObject):
             The color to use for values under vmin.
         over : string/tuple/array_like | 'red'
             The color to use for values over vmax.
+        layer : string | None
+            Name of the overlay layer (see :meth:`set_overlay`). If None, a
+            default name is used.
+
+        Returns
+        -------
+        layer : string
+            Name of the overlay layer.
         """
         col_kw = self._update_cbar_args(cmap, clim, vmin, vmax, under, over)
         is_under = isinstance(hide_under, (int, float))
-        color = np.zeros((len(self.mesh), 4), dtype=np.float32)
-        mask = np.zeros((len(self.mesh),), dtype=float)
+        n_vertices = len(self._get_full_mesh()[0])
+        color = np.zeros((n_vertices, 4), dtype=np.float32)
+        mask = np.zeros((n_vertices,), dtype=float)
+        isolines = contour_lines and isinstance(n_contours, int)
+        iso_data = np.full((n_vertices,), np.nan)
         self._default_cblabel = "Activation"
         # ============================= METHOD =============================
         if isinstance(data, np.ndarray) and isinstance(vertices, np.ndarray):
@@ -376,7 +611,7 @@ class BrainObj(VisbrainObject):
             assert smoothing_steps is None or isinstance(smoothing_steps, int)
             # Get smoothed vertices // data :
             if isinstance(smoothing_steps, int):
-                edges = mesh_edges(self.mesh._faces)
+                edges = self._get_adjacency()
                 sm_mat = smoothing_matrix(vertices, edges, smoothing_steps)
                 sm_data = data[sm_mat.col]
                 rows = sm_mat.row
@@ -387,13 +622,15 @@ class BrainObj(VisbrainObject):
             clim = (sm_data.min(), sm_data.max()) if clim is None else clim
             assert len(clim) == 2
             col_kw['clim'] = clim
-            # Contours :
-            sm_data = self._data_to_contour(sm_data, clim, n_contours)
             _, idx = self._hemisphere_from_file(hemisphere, None)
             hemi_idx = np.where(idx)[0]
+            # Contours :
+            if isolines:
+                iso_data[hemi_idx[rows]] = sm_data
+            sm_data = self._data_to_contour(sm_data, clim, n_contours)
             # Convert into colormap :
             smooth_map = array2colormap(sm_data, **col_kw)
-            color = np.ones((len(self.mesh), 4), dtype=np.float32)
+            color = np.ones((n_vertices, 4), dtype=np.float32)
             color[hemi_idx[rows], :] = smooth_map
             # Mask :
             if is_under:
@@ -408,7 +645,7 @@ class BrainObj(VisbrainObject):
             import nibabel as nib
             # Load data using Nibabel :
             sc = nib.load(file).get_data().ravel(order="F")
-            hemisphere = 'both' if len(sc) == len(self.mesh) else hemisphere
+            hemisphere = 'both' if len(sc) == n_vertices else hemisphere
             # Hemisphere :
             hemisphere, idx = self._hemisphere_from_file(hemisphere, file)
             assert len(sc) == idx.sum()
@@ -417,6 +654,8 @@ class BrainObj(VisbrainObject):
             assert len(clim) == 2
             col_kw['clim'] = clim
             # Contour :
+            if isolines:
+                iso_data[idx] = sc
             sc = self._data_to_contour(sc, clim, n_contours)
             # Convert into colormap :
             color[idx, :] = array2colormap(sc, **col_kw)
@@ -427,18 +666,19 @@ class BrainObj(VisbrainObject):
                 mask[sub_idx] = 0.
         else:
             raise ValueError("Unknown activation type.")
-        # Build mask color :
-        col_mask = ~np.tile(mask.reshape(-1, 1).astype(bool), (1, 4))
-        # Keep a copy of each overlay color and mask :
-        self._data_color.append(np.ma.masked_array(color, mask=col_mask))
-        self._data_mask.append(mask)
-        # Set color and mask to the mesh :
-        self.mesh.color = np.ma.array(self._data_color).mean(0)
-        self.mesh.mask = np.array(self._data_mask).max(0)
+        # Add the overlay layer (isolines replace activations) :
+        if isolines:
+            mask[:] = 0.
+        layer = self._add_overlay(color, mask, layer)
+        if isolines:
+            self._add_isolines(self._to_lod(iso_data)[0], n_contours, layer,
+                               **col_kw)
+        self._update_overlays()
+        return layer
 
     def parcellize(self, file, select=None, hemisphere=None, data=None,
                    cmap='viridis', clim=None, vmin=None, under='gray',
-                   vmax=None, over='red'):
+                   vmax=None, over='red', layer=None):
         """Parcellize the brain surface using a .annot file.
 
         This method require the nibabel package to be installed.
@@ -466,6 +706,14 @@ class BrainObj(VisbrainObject):
             The color to use for values under vmin.
         over : string/tuple/array_like | 'red'
             The color to use for values over vmax.
+        layer : string | None
+            Name of the overlay layer (see :meth:`set_overlay`). If None, a
+            default name is used.
+
+        Returns
+        -------
+        layer : string
+            Name of the overlay layer.
         """
         idx, u_colors, labels, u_idx = self._load_annot_file(file)
         roi_labs = []
@@ -492,52 +740,110 @@ class BrainObj(VisbrainObject):
         # Build the select variable :
         if isinstance(select, (np.ndarray, list)):
             select = np.asarray(select)
-            if select.dtype != int:
+            if not np.issubdtype(select.dtype, np.integer):
                 logger.info('Search parcellates using labels')
-                select_str = select.copy()
-                select = []
-                bad_select = []
-                for k in select_str:
-                    label_idx = np.where(labels == k)[0]
-                    if label_idx.size:
-                        select.append(u_idx[label_idx])
-                    else:
-                        roi_labs.append('%s (ignored)' % k)
-                        bad_select.append(k)
-                logger.warning("%s ignored. Use `get_parcellates` method to "
-                               "get the list of available "
-                               "parcellates" % ', '.join(bad_select))
-                select = np.array(select).ravel()
+                # Label -> rows lookup using a sorted copy of labels :
+                l_sort = np.argsort(labels, kind='mergesort')
+                s_labels = labels[l_sort]
+                l_start = np.searchsorted(s_labels, select, side='left')
+                l_end = np.searchsorted(s_labels, select, side='right')
+                bad_select = list(select[l_start == l_end])
+                roi_labs += ['%s (ignored)' % k for k in bad_select]
+                if bad_select:
+                    logger.warning("%s ignored. Use `get_parcellates` method "
+                                   "to get the list of available "
+                                   "parcellates" % ', '.join(bad_select))
+                select = u_idx[np.concatenate([l_sort[i:j] for i, j in zip(
+                    l_start, l_end)] + [np.array([], dtype=int)])]
         if not select.size:
             raise ValueError("No parcellates found")
-        # Prepare color variables :
-        color = np.zeros((len(self.mesh), 4))
-        mask = np.zeros((len(self.mesh),))
-        # Set roi color to the mesh :
-        sub_select = np.where(h_idx)[0]  # sub-hemisphere selection
-        no_parcellates = []
-        for i, k in enumerate(select):
-            sub_idx = np.where(u_idx == k)[0][0]  # index location in u_idx
-            if sub_idx:
-                color_index = sub_select[u_idx[idx] == k]
-                if data_color is None:
-                    color[color_index, :] = u_colors[sub_idx, :]
-                else:
-                    color[color_index, :] = data_color[i, :]
-                roi_labs.append(labels[sub_idx])
-                mask[color_index] = 1.
-            else:
-                no_parcellates.append(str(k))
+        # Index -> row lookup (first row of each index) :
+        u_sort = np.argsort(u_idx, kind='mergesort')
+        rows = np.searchsorted(u_idx, select, sorter=u_sort)
+        rows = u_sort[np.clip(rows, 0, len(u_idx) - 1)]
+        is_parc = (u_idx[rows] == select) & (rows != 0)
+        no_parcellates = [str(k) for k in select[~is_parc]]
         if no_parcellates:
             logger.warning("No corresponding parcellates for index "
                            "%s" % ', '.join(np.unique(no_parcellates)))
+        roi_labs += list(labels[rows[is_parc]])
+        # Vertex -> selected parcellate (the last one if selected twice) :
+        sel_pos = np.where(is_parc)[0][::-1]
+        sel_idx, first = np.unique(select[sel_pos], return_index=True)
+        sel_pos = sel_pos[first]
+        vert_idx = u_idx[idx]
+        vert_pos = np.searchsorted(sel_idx, vert_idx)
+        is_sel = vert_pos < len(sel_idx)
+        is_sel[is_sel] = sel_idx[vert_pos[is_sel]] == vert_idx[is_sel]
+        # Set roi color to the mesh (one gather) :
+        n_vertices = len(self._get_full_mesh()[0])
+        color = np.zeros((n_vertices, 4))
+        mask = np.zeros((n_vertices,))
+        sub_select = np.where(h_idx)[0][is_sel]  # sub-hemisphere selection
+        sel_pos = sel_pos[vert_pos[is_sel]]
+        if data_color is None:
+            color[sub_select, :] = u_colors[rows[sel_pos], :]
+        else:
+            color[sub_select, :] = data_color[sel_pos, :]
+        mask[sub_select] = 1.
         logger.info("Selected parcellates : %s" % ", ".join(roi_labs))
-        # Keep an eye on data color and mask :
-        self._data_color.append(color)
-        self._data_mask.append(mask)
-        # Set color and mask to the mesh :
-        self.mesh.color = np.array(self._data_color).sum(0)
-        self.mesh.mask = np.array(self._data_mask).sum(0)
+        # Add the overlay layer :
+        layer = self._add_overlay(color, mask, layer)
+        self._update_overlays()
+        return layer
+
+    def set_overlay(self, layer, visible=None, weight=None, index=None):
+        """Update an overlay layer (activation or parcellation).
+
+        The color of a vertex is the weighted mean of the colors of the
+        visible layers covering it.
+
+        Parameters
+        ----------
+        layer : string
+            Name of the overlay layer.
+        visible : bool | None
+            Show or hide the layer.
+        weight : float | None
+            Weight of the layer.
+        index : int | None
+            New position of the layer in the list of layers.
+        """
+        if isinstance(visible, bool):
+            self._overlays.set_visible(layer, visible)
+            if layer in self._isolines:
+                self._isolines[layer].visible = visible
+        if isinstance(weight, (int, float)):
+            self._overlays.set_weight(layer, weight)
+        if isinstance(index, int):
+            self._overlays.move(layer, index)
+        self._update_overlays()
+
+    def remove_overlay(self, layer):
+        """Remove an overlay layer (activation or parcellation).
+
+        Parameters
+        ----------
+        layer : string
+            Name of the overlay layer.
+        """
+        self._overlays.remove(layer)
+        self._remove_isolines(layer)
+        self._update_overlays()
+
+    def _add_overlay(self, color, mask, layer):
+        """Add an overlay layer defined on the full resolution mesh."""
+        if self._lod is not None:
+            color, w_sum = self._to_lod(color, mask)
+            mask = (w_sum != 0.).astype(float)
+        layer = self._overlays.add(color, mask, layer)
+        self._remove_isolines(layer)
+        return layer
+
+    def _update_overlays(self):
+        """Set the color and mask of overlay layers to the mesh."""
+        self.mesh.color = self._overlays.color
+        self.mesh.mask = self._overlays.mask
 
     def get_parcellates(self, file):
         """Get the list of supported parcellates names and index.
@@ -557,13 +863,32 @@ class BrainObj(VisbrainObject):
 
     @staticmethod
     def _data_to_contour(data, clim, n_contours):
-        if isinstance(n_contours, int):
+        """Quantize data between clim using n_contours levels."""
+        if isinstance(n_contours, int) and (clim[0] <= clim[1]):
             _range = np.linspace(clim[0], clim[1], n_contours)
-            for k in range(len(_range) - 1):
-                d_idx = np.logical_and(data >= _range[k], data < _range[k + 1])
-                data[d_idx] = _range[k]
+            # Level under each value (_range[k] <= x < _range[k + 1]) :
+            lev = np.digitize(data, _range) - 1
+            d_idx = np.logical_and(lev >= 0, lev < len(_range) - 1)
+            data[d_idx] = _range[lev[d_idx]]
         return data
 
+    def _add_isolines(self, data, n_contours, layer, **col_kw):
+        """Draw isolines of data (NaN for vertices without data)."""
+        clim = col_kw['clim']
+        levels = np.linspace(clim[0], clim[1], n_contours)
+        segments, seg_levels = mesh_isolines(self.mesh._vertices,
+                                             self.mesh._faces, data, levels)
+        color = array2colormap(levels, **col_kw)[np.repeat(seg_levels, 2), :]
+        self._isolines[layer] = scene.visuals.Line(
+            pos=segments, color=color, connect='segments', width=2.,
+            parent=self._node, name='Isolines_' + layer)
+        logger.info("%i isolines segments added" % len(seg_levels))
+
+    def _remove_isolines(self, layer):
+        """Remove the isolines of a layer (if any)."""
+        if layer in self._isolines:
+            self._isolines.pop(layer).parent = None
+
     def _hemisphere_from_file(self, hemisphere, file):
         """Infer hemisphere from filename."""
         if (hemisphere is None) and isinstance(file, str):
@@ -576,37 +901,185 @@ class BrainObj(VisbrainObject):
                 hemisphere = 'both'
             logger.warning("%s hemisphere(s) inferred from "
                            "filename" % hemisphere)
-        # Get index :
+        # Get index (of the full resolution mesh) :
+        lr_index = self._get_full_mesh()[2]
         if hemisphere in ['left', 'lh']:
-            idx = self.mesh._lr_index
+            idx = lr_index
         elif hemisphere in ['right', 'rh']:
-            idx = ~self.mesh._lr_index
+            idx = ~lr_index
         else:
-            idx = np.ones((len(self.mesh),), dtype=bool)
+            idx = np.ones((len(lr_index),), dtype=bool)
         return hemisphere, idx
 
     @staticmethod
     def _load_annot_file(file):
-        """Load a .annot file."""
+        """Load a .annot file (parsed files are cached by path and mtime)."""
         assert os.path.isfile(file)
         is_nibabel_installed(raise_error=True)
-        import nibabel
-        # Get index and labels :
-        id_vert, ctab, names = nibabel.freesurfer.read_annot(file)
-        names = np.array(names).astype(str)
-        color, u_idx = ctab[:, 0:4], ctab[..., -1]
-        logger.info("Annot file loaded (%s)" % file)
-        # Test if variables have the same size :
-        if len(u_idx) != len(names):
-            min_len = min(len(u_idx), color.shape[0], len(names))
-            logger.warning("Length of label names (%i) and index (%i) doesn't "
-                           "match. Following label index ignored : %s" % (
-                               len(names), len(u_idx),
-                               ", ".join(u_idx[min_len::].astype(str))))
-            color = color[0:min_len, :]
-            names = names[0:min_len]
-            u_idx = u_idx[0:min_len]
-        return id_vert, color, names, u_idx
+        return _read_annot(os.path.abspath(file), os.path.getmtime(file))
+
+    ###########################################################################
+    ###########################################################################
+    #                             TIME COURSE
+    ###########################################################################
+    ###########################################################################
+
+    def add_timecourse(self, data, vertices, smoothing_steps=20,
+                       hemisphere=None, time=0, cmap='viridis', clim=None,
+                       vmin=None, vmax=None, under='gray', over='red'):
+        """Add time-resolved activations (e.g a source estimate).
+
+        Data are defined on a subset of vertices, as with
+        :meth:`add_activation`, but the smoothing is computed once and
+        stored as a sparse (n_vertices, n_data) operator. Then, stepping
+        through time (see :meth:`set_time` and :meth:`play`) only sends one
+        vector of scalar data to the GPU, where the colormap is applied.
+
+        Parameters
+        ----------
+        data : array_like | list
+            Array of data of shape (n_data, n_times). Float32 arrays
+            (including memory-mapped arrays, see io.read_stc) are used without
+            copy and only the displayed time instant is read. Data can also
+            be a list of arrays of shape (n_data_i, n_times) (e.g. the left
+            and right hemispheres of a source estimate) that are kept
+            separated, as if they were concatenated along the first axis.
+        vertices : array_like
+            Vector array of vertices of shape (n_data,). Must be an array of
+            integers.
+        smoothing_steps : int | 20
+            Number of smoothing steps. Use None to disable smoothing.
+        hemisphere : {None, 'both', 'left', 'right'}
+            The hemisphere of vertices.
+        time : int | 0
+            Index of the time instant to display.
+        cmap : string | 'viridis'
+            The colormap to use.
+        clim : tuple | None
+            The colorbar limits. If None, (data.min(), data.max()) over all
+            time instants will be used instead. Note that this requires to
+            read the whole data once (by blocks of rows, so that the memory
+            used is bounded), which can be slow for large memory-mapped
+            files. Provide clim to avoid it.
+        vmin : float | None
+            Minimum threshold.
+        vmax : float | None
+            Maximum threshold.
+        under : string/tuple/array_like | 'gray'
+            The color to use for values under vmin.
+        over : string/tuple/array_like | 'red'
+            The color to use for values over vmax.
+        """
+        vertices = np.asarray(vertices)
+        blocks = list(data) if isinstance(data, (list, tuple)) else [data]
+        assert all([k.ndim == 2 for k in blocks]) and (vertices.ndim == 1)
+        assert len(set([k.shape[1] for k in blocks])) == 1
+        bounds = np.cumsum([0] + [k.shape[0] for k in blocks])
+        assert bounds[-1] == len(vertices)
+        # Big-endian float32 is fine :
+        blocks = [k if k.dtype.type is np.float32 else k.astype(np.float32)
+                  for k in blocks]
+        # Smoothing (each vertex takes the value of one data vertex) :
+        _, idx = self._hemisphere_from_file(hemisphere, None)
+        hemi_idx = np.where(idx)[0]
+        if isinstance(smoothing_steps, int):
+            sm_mat = smoothing_matrix(vertices, self._get_adjacency(),
+                                      smoothing_steps)
+            rows, cols = hemi_idx[sm_mat.row], sm_mat.col
+        else:
+            rows, cols = hemi_idx[vertices], np.arange(len(vertices))
+        rows, last = np.unique(rows[::-1], return_index=True)
+        cols = cols[::-1][last]
+        # Full resolution -> displayed vertices (level of detail) :
+        if self._lod is not None:
+            rows = self._lod['index'][rows]
+        n_vertices = len(self.mesh)
+        count = np.bincount(rows, minlength=n_vertices)
+        operator = sparse.csc_matrix((1. / count[rows], (rows, cols)),
+                                     shape=(n_vertices, len(vertices)),
+                                     dtype=np.float32)
+        # One operator per block of data :
+        operator = [operator[:, bounds[k]:bounds[k + 1]].tocsr() for k in
+                    range(len(blocks))]
+        # Colormap :
+        if clim is None:
+            self._minmax = clim = _blocks_minmax(blocks)
+        else:
+            self._minmax = tuple(clim)
+        kw = self._update_cbar_args(cmap, clim, vmin, vmax, under, over)
+        self._default_cblabel = "Activation"
+        self._remove_timecourse()
+        self._timecourse = dict(data=blocks, operator=operator, time=None)
+        self.mesh.mask = (count > 0).astype(np.float32)
+        self.set_time(time)
+        self.mesh.set_colormap(**kw)
+        logger.info("Time course of %i vertices and %i time instants "
+                    "added" % (len(vertices), self.n_times))
+
+    def set_time(self, time):
+        """Display a time instant of the time course.
+
+        Parameters
+        ----------
+        time : int
+            Index of the time instant.
+        """
+        tc = self._timecourse
+        if tc is None:
+            raise ValueError("No time course. Use the add_timecourse method.")
+        time = int(time)
+        assert 0 <= time < self.n_times
+        tc['time'] = time
+        self._cbar_data = sum([op.dot(d[:, time]) for op, d in zip(
+            tc['operator'], tc['data'])])
+        self.mesh.set_scalar(self._cbar_data)
+
+    def play(self, interval=.04, step=1, loop=True, start=True):
+        """Animate the time course.
+
+        Parameters
+        ----------
+        interval : float | .04
+            Time (in seconds) between two time instants.
+        step : int | 1
+            Number of time instants between two displayed time instants.
+        loop : bool | True
+            Restart from the first time instant at the end of the time
+            course. Otherwise, the animation is stopped.
+        start : bool | True
+            Start the animation.
+
+        Returns
+        -------
+        timer : vispy.app.Timer
+            The timer of the animation (use timer.stop() to stop it).
+        """
+        from vispy import app
+        if self._timecourse is None:
+            raise ValueError("No time course. Use the add_timecourse method.")
+
+        def _next_time(event):
+            time = self.time + step
+            if not 0 <= time < self.n_times:
+                if not loop:
+                    event.source.stop()
+                    return
+                time %= self.n_times
+            self.set_time(time)
+        self._stop_timer()
+        self._timer = app.Timer(interval, connect=_next_time, start=start)
+        return self._timer
+
+    def _stop_timer(self):
+        """Stop the animation (if any)."""
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+
+    def _remove_timecourse(self):
+        """Remove the time course (if any)."""
+        self._stop_timer()
+        self._timecourse = None
 
     ###########################################################################
     ###########################################################################
@@ -616,8 +1089,9 @@ class BrainObj(VisbrainObject):
 
     def _update_cbar(self):
         if isinstance(self._cbar_data, np.ndarray):
-            color = array2colormap(self._cbar_data, **self.to_kwargs())
-            self.mesh.color = color
+            if not self.mesh.is_scalar:
+                self.mesh.set_scalar(self._cbar_data)
+            self.mesh.set_colormap(**self.to_kwargs())
         # else:
         #     logger.error("No data to update for %s" % self.name)
 
@@ -713,3 +1187,28 @@ class BrainObj(VisbrainObject):
     def scale(self, value):
         """Set scale value."""
         self._scale = value
+
+    # ----------- TIME -----------
+    @property
+    def time(self):
+        """Get the time value."""
+        tc = self._timecourse
+        return None if tc is None else tc['time']
+
+    @time.setter
+    def time(self, value):
+        """Set time value."""
+        self.set_time(value)
+
+    # ----------- N_TIMES -----------
+    @property
+    def n_times(self):
+        """Get the n_times value."""
+        tc = self._timecourse
+        return 0 if tc is None else tc['data'][0].shape[1]
+
+    # ----------- OVERLAYS -----------
+    @property
+    def overlays(self):
+        """Get the overlays value."""
+        return self._overlays.names
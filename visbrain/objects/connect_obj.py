@@ -1,12 +1,17 @@
 """Base class for objects of type connectivity."""
 import numpy as np
-from collections import Counter
+from scipy import sparse
 
 from vispy import scene
 from vispy.scene import visuals
 
 from .visbrain_obj import VisbrainObject, CombineObjects
-from ..utils import array2colormap, normalize, color2vb, wrap_properties
+from ..utils import (array2colormap, normalize, color2vb, wrap_properties,
+                     filter_edges, nodes_hierarchy, hierarchical_bundling)
+
+# Accepted types for threshold and top_k (including numpy scalars) :
+_INTEGER = (int, np.integer)
+_REAL = (int, float, np.integer, np.floating)
 
 
 class ConnectObj(VisbrainObject):
@@ -18,11 +23,15 @@ class ConnectObj(VisbrainObject):
         The name of the connectivity object.
     nodes : array_like
         Array of nodes coordinates of shape (n_nodes, 3).
-    edges : array_like | None
-        Array of ponderations for edges of shape (n_nodes, n_nodes).
+    edges : array_like | sparse matrix | tuple
+        Array of ponderations for edges of shape (n_nodes, n_nodes). Edges can
+        also be a scipy.sparse matrix of shape (n_nodes, n_nodes) or a COO
+        edge list (values, (rows, cols)). For sparse inputs, stored entries
+        are considered as edges. In any cases, only edges of the upper
+        triangle (rows < cols) are displayed.
     select : array_like | None
         Array to select edges to display. This should be an array of boolean
-        values of shape (n_nodes, n_nodes).
+        values of shape (n_nodes, n_nodes) (or a sparse boolean matrix).
     line_width : float | 3.
         Connectivity line width.
     color_by : {'strength', 'count'}
@@ -50,6 +59,19 @@ class ConnectObj(VisbrainObject):
         Higher threshold of the colormap if custom_colors is None.
     over : string | None
         Color to use for values over vmax if custom_colors is None.
+    threshold : float | None
+        Only display edges with a strength over (or equal to) threshold.
+    top_k : int | None
+        Only display the top_k strongest edges. This can be used to reduce
+        the number of displayed lines for large connectomes.
+    bundling : bool | False
+        Use hierarchical edge bundling. In that case, edges are drawn as
+        curves following a hierarchy of nodes (built using their positions).
+    bundling_beta : float | .85
+        Bundling strength between 0. (straight lines) and 1.
+    bundling_levels : int | None
+        Number of levels of the hierarchy of nodes used for edge bundling. If
+        None, this number is inferred from the number of nodes.
     transform : VisPy.visuals.transforms | None
         VisPy transformation to set to the parent node.
     parent : VisPy.parent | None
@@ -85,7 +107,9 @@ class ConnectObj(VisbrainObject):
                  color_by='strength', custom_colors=None, alpha=1.,
                  antialias=False, dynamic=None, cmap='viridis', clim=None,
                  vmin=None, vmax=None, under='gray', over='red',
-                 transform=None, parent=None, verbose=None, _z=-10., **kw):
+                 threshold=None, top_k=None, bundling=False, bundling_beta=.85,
+                 bundling_levels=None, transform=None, parent=None,
+                 verbose=None, _z=-10., **kw):
         """Init."""
         VisbrainObject.__init__(self, name, parent, transform, verbose, **kw)
         self._update_cbar_args(cmap, clim, vmin, vmax, under, over)
@@ -98,17 +122,22 @@ class ConnectObj(VisbrainObject):
         assert sh[1] >= 2
         pos = nodes if sh[1] == 3 else np.c_[nodes, np.full((len(self),), _z)]
         self._pos = pos.astype(np.float32)
-        # Edges :
-        assert edges.shape == (len(self), len(self))
-        if not np.ma.isMA(edges):
-            mask = np.zeros(edges.shape, dtype=bool)
-            edges = np.ma.masked_array(edges, mask=mask)
-        # Select :
-        if isinstance(select, np.ndarray):
-            assert select.shape == edges.shape and select.dtype == bool
-            edges.mask = np.invert(select)
-        edges.mask[np.tril_indices(len(self), 0)] = True
-        self._edges = edges
+        # Edges (stored as a (rows, cols, values) edge list) :
+        self._edges = self._edges_to_coo(edges, select)
+        # Level of details :
+        assert (threshold is None) or isinstance(threshold, _REAL)
+        assert (top_k is None) or isinstance(top_k, _INTEGER)
+        self._threshold, self._top_k = threshold, top_k
+        self._filter_edges()
+        # Edge bundling :
+        assert isinstance(bundling, bool) and (0. <= bundling_beta <= 1.)
+        if bundling_levels is None:
+            bundling_levels = int(np.clip(np.log2(max(len(self), 2)) - 1, 1,
+                                          8))
+        assert isinstance(bundling_levels, int) and bundling_levels > 0
+        self._bundling, self._bundling_beta = bundling, bundling_beta
+        self._bundling_levels = bundling_levels
+        self._hierarchy = {}
         # Colorby :
         assert color_by in ['strength', 'count']
         self._color_by = color_by
@@ -139,21 +168,99 @@ class ConnectObj(VisbrainObject):
         """Update the line."""
         self._connect.update()
 
+    def _edges_to_coo(self, edges, select=None):
+        """Get the (rows, cols, values) of edges to display.
+
+        Edges are sorted by rows, then by columns and only those of the upper
+        triangle (rows < cols) are kept.
+        """
+        n = len(self)
+        if isinstance(edges, tuple):  # (values, (rows, cols))
+            edges = sparse.coo_matrix(edges, shape=(n, n))
+        assert edges.shape == (n, n)
+        if sparse.issparse(edges):
+            edges = edges.tocoo()
+            rows, cols, values = edges.row, edges.col, edges.data
+            # Select :
+            if select is not None:
+                assert select.shape == edges.shape
+                if sparse.issparse(select):
+                    is_sel = np.asarray(select.tocsr()[rows, cols]).ravel()
+                else:
+                    is_sel = select[rows, cols]
+                keep = np.logical_and(rows < cols, is_sel.astype(bool))
+            else:
+                keep = rows < cols
+            rows, cols, values = rows[keep], cols[keep], values[keep]
+            order = np.lexsort((cols, rows))
+            rows, cols, values = rows[order], cols[order], values[order]
+        else:
+            keep = ~np.ma.getmaskarray(edges)
+            # Select :
+            if isinstance(select, np.ndarray):
+                assert select.shape == edges.shape and select.dtype == bool
+                keep = select.copy()
+            keep[np.tril_indices(n, 0)] = False
+            rows, cols = np.nonzero(keep)
+            values = np.ma.getdata(edges)[rows, cols]
+        return rows.astype(int), cols.astype(int), np.asarray(values)
+
+    def _filter_edges(self):
+        """Get the edges to display according to threshold and top_k."""
+        rows, cols, values = self._edges
+        keep = filter_edges(values, self._threshold, self._top_k)
+        self._rows, self._cols = rows[keep], cols[keep]
+        self._values = values[keep]
+
+    def _get_hierarchy(self):
+        """Get the hierarchy of nodes (cached for the current nodes)."""
+        n_levels = self._bundling_levels
+        if n_levels not in self._hierarchy:
+            self._hierarchy[n_levels] = nodes_hierarchy(self._pos, n_levels)
+        return self._hierarchy[n_levels]
+
     def _build_line(self):
         """Build the connectivity line."""
-        # Build the line position (consecutive segments):
-        nnz_x, nnz_y = np.where(~self._edges.mask)
-        indices = np.c_[nnz_x, nnz_y].flatten()
-        line_pos = self._pos[indices, :]
+        # Don't draw an empty line if every edge is filtered :
+        self._connect.visible = bool(len(self._rows))
+        if self._bundling:  # curved edges (polylines)
+            lines = hierarchical_bundling(self._pos, self._rows, self._cols,
+                                          hierarchy=self._get_hierarchy(),
+                                          beta=self._bundling_beta)
+            n_edges, self._n_points = lines.shape[0:2]
+            start = np.arange(n_edges).reshape(-1, 1) * self._n_points
+            seg = (start + np.arange(self._n_points - 1)).ravel()
+            self._connect.set_data(pos=lines.reshape(-1, 3),
+                                   connect=np.c_[seg, seg + 1])
+        else:  # straight edges (consecutive segments)
+            self._n_points = 2
+            indices = np.c_[self._rows, self._cols].flatten()
+            self._connect.set_data(pos=self._pos[indices, :],
+                                   connect='segments')
+        self._build_color()
 
+    def _build_color(self):
+        """Build the color of the connectivity line.
+
+        Only the color buffer is updated. Line positions are untouched.
+        """
         # Color either edges or nodes :
         if self._color_by == 'strength':
-            nnz_values = self._edges.compressed()
-            values = np.c_[nnz_values, nnz_values].flatten()
+            v_rows = v_cols = self._values
         elif self._color_by == 'count':
-            node_count = Counter(np.ravel([nnz_x, nnz_y]))
-            values = np.array([node_count[k] for k in indices])
-        self._minmax = (values.min(), values.max())
+            indices = np.r_[self._rows, self._cols]
+            node_count = np.bincount(indices, minlength=len(self))
+            v_rows, v_cols = node_count[self._rows], node_count[self._cols]
+        # Interpolate values along each line :
+        if self._n_points == 2:
+            values = np.c_[v_rows, v_cols].flatten()
+        else:
+            t = np.linspace(0., 1., self._n_points)
+            values = (np.outer(v_rows, 1. - t) + np.outer(v_cols, t)).ravel()
+        if values.size:
+            self._minmax = (values.min(), values.max())
+        else:  # every edge is filtered
+            self._minmax = (0., 1.)
         if self._clim is None:
             self._clim = self._minmax
 
@@ -174,8 +281,16 @@ class ConnectObj(VisbrainObject):
             color[:, 3] = normalize(values.copy(), tomin=self._dynamic[0],
                                     tomax=self._dynamic[1])
 
-        # Send data to the connectivity object :
-        self._connect.set_data(pos=line_pos, color=color)
+        # Send color to the connectivity object :
+        self._connect.set_data(color=color)
+
+    def _update_cbar(self):
+        self._build_color()
+
+    def _update_cbar_minmax(self):
+        """Reset the colorbar limits to the (min, max) of displayed values."""
+        self._clim = self._minmax
+        self._build_color()
 
     def _get_camera(self):
         """Get the most adapted camera."""
@@ -215,7 +330,7 @@ class ConnectObj(VisbrainObject):
         """Set color_by value."""
         assert value in ['strength', 'count']
         self._color_by = value
-        self._build_line()
+        self._build_color()
 
     # ----------- DYNAMIC -----------
     @property
@@ -229,7 +344,7 @@ class ConnectObj(VisbrainObject):
         """Set dynamic value."""
         assert value is None or len(value) == 2
         self._dynamic = value
-        self._build_line()
+        self._build_color()
 
     # ----------- ALPHA -----------
     @property
@@ -242,10 +357,69 @@ class ConnectObj(VisbrainObject):
     def alpha(self, value):
         """Set alpha value."""
         assert 0. <= value <= 1.
-        self._connect.color[:, -1] = value
         self._alpha = value
+        self._build_color()
         self.update()
 
+    # ----------- THRESHOLD -----------
+    @property
+    def threshold(self):
+        """Get the threshold value."""
+        return self._threshold
+
+    @threshold.setter
+    @wrap_properties
+    def threshold(self, value):
+        """Set threshold value."""
+        assert (value is None) or isinstance(value, _REAL)
+        self._threshold = value
+        self._filter_edges()
+        self._build_line()
+
+    # ----------- TOP_K -----------
+    @property
+    def top_k(self):
+        """Get the top_k value."""
+        return self._top_k
+
+    @top_k.setter
+    @wrap_properties
+    def top_k(self, value):
+        """Set top_k value."""
+        assert (value is None) or isinstance(value, _INTEGER)
+        self._top_k = value
+        self._filter_edges()
+        self._build_line()
+
+    # ----------- BUNDLING -----------
+    @property
+    def bundling(self):
+        """Get the bundling value."""
+        return self._bundling
+
+    @bundling.setter
+    @wrap_properties
+    def bundling(self, value):
+        """Set bundling value."""
+        assert isinstance(value, bool)
+        self._bundling = value
+        self._build_line()
+
+    # ----------- BUNDLING_BETA -----------
+    @property
+    def bundling_beta(self):
+        """Get the bundling_beta value."""
+        return self._bundling_beta
+
+    @bundling_beta.setter
+    @wrap_properties
+    def bundling_beta(self, value):
+        """Set bundling_beta value."""
+        assert 0. <= value <= 1.
+        self._bundling_beta = value
+        if self._bundling:
+            self._build_line()
+
 
 class CombineConnect(CombineObjects):
     """Combine connectivity objects.
@@ -6,7 +6,8 @@ import numpy as np
 from vispy import scene
 import vispy.visuals.transforms as vist
 
-from ..utils import array2colormap, wrap_properties, color2vb, FixedCam
+from ..utils import wrap_properties, color2vb, FixedCam
+from ..visuals import ScalarImage
 from .volume_obj import _Volume
 
 logger = logging.getLogger('visbrain')
@@ -16,6 +17,7 @@ class _ImageSection(object):
     """Image section.
 
     This class instantiate an image, markers and line for source location.
+    The image is colored on the GPU (see `ScalarImage`).
     """
 
     def __init__(self, name, parent=None, loc_parent=None, _im={}, _mark={},
@@ -23,8 +25,7 @@ class _ImageSection(object):
         """Init."""
         self.node = scene.Node(name='Node_', parent=parent)
         self.loc_node = scene.Node(name='LocNode_', parent=loc_parent)
-        self.image = scene.visuals.Image(name='Im_' + name, parent=self.node,
-                                         **_im)
+        self.image = ScalarImage(name='Im_' + name, parent=self.node, **_im)
         pos = np.zeros((10, 3))
         self.markers = scene.visuals.Markers(pos=pos, name='Mark_' + name,
                                              parent=self.loc_node, **_mark)
@@ -202,20 +203,31 @@ class CrossSecObj(_Volume):
         assert len(section) == 3 and all([k <= i for k, i in zip(section,
                                                                  self._sh)])
         self._section = section
-        clim = (self._vol.min(), self._vol.max()) if clim is None else clim
+        self._minmax = (self._vol.min(), self._vol.max())
+        clim = self._minmax if clim is None else clim
         _ = self._update_cbar_args(cmap, clim, vmin, vmax, under, over)  # noqa
         self._update = update
         self.sagittal = section[0]
         self.coronal = section[1]
         self.axial = section[2]
         self._update = False
+        self._update_cbar()
 
-    def _set_section(self, im_visual, image, section, pos, nb):
-        # Get colormap elements and get RgBA image :
+    def _update_cbar(self):
+        """Update the colormap of the three sections (no data transfer)."""
         kw = self.to_kwargs()
-        im_rgba = array2colormap(image, **kw)
-        # Set image and text :
-        im_visual.image.set_data(im_rgba)
+        for k in [self._im_sagit, self._im_coron, self._im_axial]:
+            k.image.set_colormap(**kw)
+        self.update()
+
+    def _update_cbar_minmax(self):
+        """Reset the colorbar limits to the (min, max) of the volume."""
+        self._clim = self._minmax
+        self._update_cbar()
+
+    def _set_section(self, im_visual, image, section, pos, nb):
+        # Set image (colored on the GPU) and text :
+        im_visual.image.set_data(image)
         txt = 'Slice %i | Position %.2f'
         text = self._txt.text.copy()
         text[nb] = txt % (section, pos)
@@ -122,6 +122,26 @@ class Picture3DObj(VisbrainObject):
         """Update image."""
         self._pic.update()
 
+    def append(self, data):
+        """Append new columns to the pictures (streaming).
+
+        Columns of each picture are used as a ring buffer with a fixed number
+        of columns (the one of the data used at the initialization). New
+        columns replace the oldest ones and only their colors are sent to the
+        GPU.
+
+        Parameters
+        ----------
+        data : array_like
+            New columns of shape (n_sources, n_rows, n_new_columns) or
+            (n_sources, n_rows) for a single column.
+        """
+        data = np.asarray(data)
+        if data.ndim == 2:
+            data = data[..., np.newaxis]
+        assert data.ndim == 3 and data.shape[0] == len(self)
+        self._pic.append(data)
+
     ###########################################################################
     ###########################################################################
     #                             PROPERTIES
@@ -1,11 +1,17 @@
 """Create a basic scene for objects."""
 import sys
+import time
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 from vispy import scene
 
 from ..io import write_fig_canvas
+from ..io.write_image import (_prepare_canvas, _restore_canvas,
+                              _save_canvas_image, _render_canvas,
+                              _get_crop_box, _crop_image, _crop_region)
 from ..utils import color2vb, set_log_level, rotate_turntable
 from ..visuals import CbarVisual
 from ..config import CONFIG, PROFILER
@@ -519,7 +525,8 @@ class SceneObj(object):
 
     def screenshot(self, saveas, print_size=None, dpi=300.,
                    unit='centimeter', factor=None, region=None, autocrop=False,
-                   bgcolor=None, transparent=False, line_width=1.):
+                   bgcolor=None, transparent=False, line_width=1.,
+                   tile_size=None, crop_box=None):
         """Take a screeshot of the scene.
 
         By default, the rendered canvas will have the size of your screen.
@@ -564,13 +571,155 @@ class SceneObj(object):
         transparent : bool | False
             Specify if the exported figure have to contains a transparent
             background.
+        tile_size : int | None
+            Large figures (e.g posters at 600 dpi) exceed the framebuffer
+            limits of the GPU. Figures larger than tile_size pixels are
+            rendered by tiles that are stitched together (4096 by default).
+        crop_box : tuple | None
+            Relative bounding box (x_start, y_start, x_end, y_end) returned
+            by a previous screenshot of the same scene with autocrop. If not
+            None, the figure is cropped using this bounding box.
+
+        Returns
+        -------
+        crop_box : tuple | None
+            The relative bounding box used to crop the figure (None if
+            autocrop is False).
         """
         kwargs = dict(print_size=print_size, dpi=dpi, factor=factor,
                       autocrop=autocrop, unit=unit, region=region,
-                      bgcolor=bgcolor, transparent=transparent)
+                      bgcolor=bgcolor, transparent=transparent,
+                      tile_size=tile_size, crop_box=crop_box)
         self._gl_uniform_transforms()
-        write_fig_canvas(saveas, self.canvas,
-                         widget=self.canvas.central_widget, **kwargs)
+        return write_fig_canvas(saveas, self.canvas,
+                                widget=self.canvas.central_widget, **kwargs)
+
+    def render_batch(self, jobs, n_jobs=4, max_pending=None, print_size=None,
+                     dpi=300., unit='centimeter', factor=None, autocrop=False,
+                     bgcolor=None, transparent=False, tile_size=None,
+                     reuse_crop=False):
+        """Render a list of figures using the canvas of the scene.
+
+        The canvas is resized once and objects of the scene stay on the GPU.
+        Between two figures, only the data of objects are updated (e.g using
+        BrainObj.set_time or BrainObj.add_activation) so that GPU buffers
+        are reused. Figures are rendered in the main thread while images are
+        encoded and written by a pool of threads.
+
+        Parameters
+        ----------
+        jobs : list
+            List of (state, camera, filename) tuples. state is either None or
+            a function (without argument) called before rendering to update
+            the objects of the scene. camera is either None, a fixed rotation
+            (e.g 'left'), a camera state (e.g {'azimuth': 90.}) applied to
+            all turntable cameras or a dictionary {(row, col): rotation or
+            camera state} to rotate specific subplots. filename is the name
+            of the image to save.
+        n_jobs : int | 4
+            Number of threads used to save images.
+        max_pending : int | None
+            Maximum number of rendered images waiting to be saved (bounds the
+            memory used when saving is slower than rendering). By default,
+            2 * n_jobs.
+        print_size, dpi, unit, factor, autocrop, bgcolor, transparent,
+        tile_size :
+            See the screenshot method.
+        reuse_crop : bool | False
+            If autocrop is True, find the bounding box only on the first
+            figure of each camera and render the next figures using the same
+            camera inside this bounding box. Only use it if the state
+            functions don't change the extent of the scene (e.g stepping
+            through a time course). Otherwise, each figure is cropped
+            independently.
+
+        Returns
+        -------
+        timings : list
+            List of dictionaries (one per job) with the filename, the time
+            spent (in seconds) to render the figure (render) and to save it
+            (encode) and the size of the image (size).
+
+        Examples
+        --------
+        >>> b_obj = BrainObj('B1')
+        >>> b_obj.add_timecourse(data, vertices)
+        >>> sc = SceneObj()
+        >>> sc.add_to_subplot(b_obj)
+        >>> jobs = [(lambda t=t: b_obj.set_time(t), 'left', 'fig_%i.png' % t)
+        >>>         for t in range(b_obj.n_times)]
+        >>> timings = sc.render_batch(jobs)
+        """
+        assert n_jobs >= 1
+        max_pending = 2 * n_jobs if max_pending is None else max_pending
+        timings, pending = [], deque()
+
+        def _save(filename, img, timing):
+            t_start = time.perf_counter()
+            timing['size'] = _save_canvas_image(filename, img)
+            timing['encode'] = time.perf_counter() - t_start
+            logger.info("%s rendered in %.1fms and saved in %.1fms" % (
+                filename, 1000. * timing['render'], 1000. * timing['encode']))
+
+        self._gl_uniform_transforms()
+        backup, _ = _prepare_canvas(self.canvas, self.canvas.central_widget,
+                                    autocrop, print_size, unit, dpi, factor,
+                                    bgcolor, transparent)
+        boxes = {}  # crop box of each camera
+        try:
+            with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+                for state, camera, filename in jobs:
+                    t_start = time.perf_counter()
+                    if callable(state):
+                        state()
+                    self._rotate_cameras(camera)
+                    key = repr(camera)
+                    if autocrop and reuse_crop and (key in boxes):
+                        region = _crop_region(self.canvas, boxes[key])
+                        img = _render_canvas(self.canvas, region, tile_size)
+                    else:
+                        img = _render_canvas(self.canvas, tile_size=tile_size)
+                        if autocrop:
+                            boxes[key] = _get_crop_box(img)
+                            img = _crop_image(img, boxes[key])
+                    timing = dict(filename=filename,
+                                  render=time.perf_counter() - t_start)
+                    timings.append(timing)
+                    pending.append(pool.submit(_save, filename, img, timing))
+                    # Wait for the oldest images (bounded memory) :
+                    while len(pending) > max_pending:
+                        pending.popleft().result()
+                for k in pending:
+                    k.result()
+        finally:
+            _restore_canvas(self.canvas, backup)
+        if timings:
+            logger.info("%i figures rendered (mean render %.1fms, mean "
+                        "encode %.1fms)" % (len(timings), 1000. * np.mean(
+                            [k['render'] for k in timings]), 1000. * np.mean(
+                            [k['encode'] for k in timings])))
+        return timings
+
+    def _rotate_cameras(self, camera):
+        """Rotate the turntable cameras of the grid.
+
+        camera is either None, a fixed rotation, a camera state or a
+        dictionary {(row, col): rotation or camera state}.
+        """
+        if camera is None:
+            return
+        if isinstance(camera, dict) and camera and all(
+                [isinstance(k, tuple) for k in camera.keys()]):
+            subs = [(self[k], v) for k, v in camera.items()]
+        else:
+            subs = [(k, camera) for k in self._grid.children]
+        for sub, cam in subs:
+            cam_obj = getattr(sub, 'camera', None)
+            if isinstance(cam_obj, scene.cameras.TurntableCamera):
+                fixed = cam if isinstance(cam, str) else None
+                state = dict(cam) if isinstance(cam, dict) else {}
+                rotate_turntable(fixed=fixed, camera_state=state,
+                                 camera=cam_obj)
 
     def preview(self):
         """Previsualize the result."""
@@ -3,13 +3,14 @@ from warnings import warn
 import logging
 import numpy as np
 from itertools import product
-from scipy.spatial.distance import cdist
+from scipy.spatial import cKDTree
 
 from vispy import scene
 from vispy.scene import visuals
 import vispy.visuals.transforms as vist
 
 from .visbrain_obj import VisbrainObject, CombineObjects
+from .brain_obj import BrainObj
 from ._projection import _project_sources_data
 from .roi_obj import RoiObj
 from ..utils import (tal2mni, color2vb, normalize, vispy_array,
@@ -20,6 +21,30 @@ logger = logging.getLogger('visbrain')
 PROJ_STR = "%i sources visibles and not masked used for the %s"
 
 
+def _closest_vertices(v, xyz):
+    """Get the closest vertex of each source.
+
+    Parameters
+    ----------
+    v : array_like | BrainObj
+        The vertices of shape (nv, 3) or (nv, 3, 3) if index faced. If v is
+        a brain object, the KD-tree of its vertices is cached.
+    xyz : array_like
+        The source's coordinates of shape (n_sources, 3).
+
+    Returns
+    -------
+    v_closest : array_like
+        The closest vertex of each source of shape (n_sources, 3).
+    """
+    if isinstance(v, BrainObj):
+        tree, v = v._get_vertices_tree(), v.vertices
+    else:
+        v = v.reshape(-1, 3)  # index faced vertices
+        tree = cKDTree(v)
+    return v[tree.query(xyz)[1], :]
+
+
 class SourceObj(VisbrainObject):
     """Create a source object.
 
@@ -473,8 +498,9 @@ class SourceObj(VisbrainObject):
             select sources that are closed to the surface (see the distance
             parameter below). Finally, use 'all' (or True), 'none' (or None,
             False) to show or hide all of the sources.
-        v : array_like | None
-            The vertices of shape (nv, 3) or (nv, 3, 3) if index faced.
+        v : array_like | BrainObj | None
+            The vertices of shape (nv, 3) or (nv, 3, 3) if index faced or a
+            brain object.
         distance : float | 5.
             Distance between the source and the surface.
         """
@@ -485,26 +511,13 @@ class SourceObj(VisbrainObject):
         xyz = self._xyz
         if select in ['inside', 'outside', 'close']:
             logger.info("Select sources %s vertices" % select)
-            if v.ndim == 2:  # index faced vertices
-                v = v[:, np.newaxis, :]
-            # Predifined inside :
-            nv, index_faced = v.shape[0], v.shape[1]
-            v = v.reshape(nv * index_faced, 3)
-            inside = np.ones((xyz.shape[0],), dtype=bool)
-
-            # Loop over ALL oh the sources :
-            for i in range(len(self)):
-                # Get the euclidian distance :
-                eucl = cdist(v, xyz[[i], :])
-                # Get the closest vertex :
-                eucl_argmin = eucl.argmin()
-                # Get distance to zero :
-                xyz_t0 = np.sqrt((xyz[[i], :] ** 2).sum())
-                v_t0 = np.sqrt((v[eucl_argmin, :] ** 2).sum())
-                if select in ['inside', 'outside']:
-                    inside[i] = xyz_t0 <= v_t0
-                elif select == 'close':
-                    inside[i] = np.abs(xyz_t0 - v_t0) > distance
+            # Get distance to zero of sources and of their closest vertex :
+            xyz_t0 = np.sqrt((xyz ** 2).sum(1))
+            v_t0 = np.sqrt((_closest_vertices(v, xyz) ** 2).sum(1))
+            if select in ['inside', 'outside']:
+                inside = xyz_t0 <= v_t0
+            elif select == 'close':
+                inside = np.abs(xyz_t0 - v_t0) > distance
             self.visible = inside if select == 'inside' else np.invert(inside)
         elif select in ['all', 'none', None, True, False]:
             cond = select in ['all', True]
@@ -522,22 +535,14 @@ class SourceObj(VisbrainObject):
 
         Parameters
         ----------
-        v : array_like
-            The vertices of shape (nv, 3) or (nv, 3, 3) if index faced.
+        v : array_like | BrainObj
+            The vertices of shape (nv, 3) or (nv, 3, 3) if index faced or a
+            brain object.
         """
-        if v.ndim == 2:  # index faced vertices
-            v = v[:, np.newaxis, :]
-        # Predifined inside :
-        nv, index_faced = v.shape[0], v.shape[1]
-        v = v.reshape(nv * index_faced, 3)
         new_pos = np.zeros_like(self._xyz)
-
-        # Loop over visible and not-masked sources :
-        for i, k in enumerate(self):
-            # Get the euclidian distance :
-            eucl = cdist(v, k)
-            # Set new coordinate using the closest vertex :
-            new_pos[i, :] = v[eucl.argmin(), :]
+        # Use visible and not-masked sources :
+        xyz = self.xyz
+        new_pos[0:len(xyz), :] = _closest_vertices(v, xyz)
         # Finally update data sources and text :
         self._sources._data['a_position'] = new_pos
         self._sources_text.pos = new_pos
@@ -2,6 +2,8 @@
 import numpy as np
 
 from visbrain.objects import BrainObj, SourceObj
+from visbrain.objects.brain_obj import _blocks_minmax
+from visbrain.utils import array2colormap
 from visbrain.objects.tests._testing_objects import _TestObjects
 from visbrain.io import read_stc, clean_tmp
 
@@ -106,10 +108,173 @@ class TestBrainObj(_TestObjects):
         data = np.arange(len(select))
         b_obj.parcellize(file_2, select=select, data=data, cmap='Spectral_r')
 
+    def test_parcellize_annot(self):
+        """Test function parcellize using a generated .annot file."""
+        import nibabel
+        n_labels, n_vert = 10, len(b_obj.mesh)
+        rnd = np.random.RandomState(0)
+        ctab = np.zeros((n_labels, 5), dtype=int)
+        ctab[1:, 0:3] = rnd.randint(1, 255, (n_labels - 1, 3))
+        ctab[:, 4] = ctab[:, 0] + ctab[:, 1] * 256 + ctab[:, 2] * 256 ** 2
+        names = ['unknown'] + ['lab%i' % k for k in range(1, n_labels)]
+        path = self.to_tmp_dir('both.test.annot')
+        lab = rnd.randint(0, n_labels, (n_vert,))
+        nibabel.freesurfer.write_annot(path, lab, ctab, names,
+                                       fill_ctab=False)
+        b_parc = BrainObj('B1')
+        # Select using indices (the unknown label is ignored) :
+        b_parc.parcellize(path, select=ctab[[0, 3, 5], 4], layer='idx')
+        mask = np.isin(lab, [3, 5])
+        np.testing.assert_array_equal(b_parc._overlays.mask, mask)
+        np.testing.assert_allclose(b_parc._overlays.color[lab == 3, 0:3],
+                                   np.tile(ctab[3, 0:3] / 255., (
+                                       (lab == 3).sum(), 1)), rtol=1e-6)
+        # Select using labels and data (a parcellate can be ignored) :
+        b_parc.remove_overlay('idx')
+        b_parc.parcellize(path, select=['lab5', 'lab3', 'bad'],
+                          data=[1., 2., 3.], cmap='Reds')
+        np.testing.assert_array_equal(b_parc._overlays.mask, mask)
+        color = b_parc._overlays.color
+        assert np.unique(color[lab == 3, :], axis=0).shape[0] == 1
+        assert not np.array_equal(color[lab == 3, :][0], color[lab == 5][0])
+        # Parsed files are cached :
+        assert b_parc._load_annot_file(path)[0] is b_parc._load_annot_file(
+            path)[0]
+
+    def test_overlays(self):
+        """Test adding, updating and removing overlay layers."""
+        b_ov = BrainObj('B1')
+        v_1, v_2 = np.arange(0, 200), np.arange(100, 300)
+        data = np.random.rand(200)
+        lay_1 = b_ov.add_activation(data=data, vertices=v_1,
+                                    smoothing_steps=None, hide_under=-1.)
+        b_ov.add_activation(data=data, vertices=v_2, smoothing_steps=None,
+                            hide_under=-1., cmap='Reds', layer='reds')
+        assert b_ov.overlays == [lay_1, 'reds']
+        b_ov.set_overlay('reds', visible=False, index=0)
+        assert b_ov.overlays == ['reds', lay_1]
+        assert b_ov._overlays.mask[v_1].all()
+        assert not b_ov._overlays.mask[v_2[-1]]
+        b_ov.set_overlay('reds', visible=True, weight=2.)
+        b_ov.remove_overlay(lay_1)
+        assert b_ov.overlays == ['reds']
+        b_ov.clean()
+        assert not len(b_ov.overlays)
+
+    def test_contours(self):
+        """Test contours (quantized data and isolines)."""
+        data = np.random.uniform(-1., 11., (1000,))
+        data_c = BrainObj._data_to_contour(data.copy(), (0., 10.), 11)
+        is_in = (data >= 0.) & (data < 10.)
+        np.testing.assert_array_equal(data_c[is_in], np.floor(data[is_in]))
+        np.testing.assert_array_equal(data_c[~is_in], data[~is_in])
+        # Isolines :
+        b_iso = BrainObj('B1')
+        data = b_iso.mesh._vertices[:, 2].astype(float)
+        b_iso.add_activation(data=data, vertices=np.arange(len(b_iso)),
+                             smoothing_steps=None, n_contours=10,
+                             contour_lines=True, layer='iso')
+        assert len(b_iso._isolines['iso'].pos)
+        b_iso.set_overlay('iso', visible=False)
+        assert not b_iso._isolines['iso'].visible
+        b_iso.remove_overlay('iso')
+        assert not b_iso._isolines
+
+    def test_lod(self):
+        """Test the level of detail (decimated mesh)."""
+        b_lod = BrainObj('B1', lod=5000)
+        n_full = len(b_lod._lod['vertices'])
+        assert abs(len(b_lod.mesh) - 5000) <= 500
+        assert b_lod._lod['index'].shape == (n_full,)
+        assert len(b_lod.mesh._lr_index) == len(b_lod.mesh)
+        # Activations are defined on the full mesh :
+        data, v_act = np.random.rand(200), np.arange(200)
+        b_lod.add_activation(data=data, vertices=v_act, smoothing_steps=None,
+                             hide_under=-1., layer='act')
+        mask = b_lod._overlays.mask
+        assert mask.shape == (len(b_lod.mesh),)
+        np.testing.assert_array_equal(np.flatnonzero(mask),
+                                      np.unique(b_lod._lod['index'][v_act]))
+        b_lod.add_activation(data=np.random.rand(n_full),
+                             vertices=np.arange(n_full), smoothing_steps=None,
+                             n_contours=5, contour_lines=True, layer='iso')
+        assert len(b_lod._isolines['iso'].pos)
+        # Projections (and masked sources) on the full mesh :
+        b_lod.project_sources(s_obj, 'modulation')
+        assert len(b_lod._cbar_data) == len(b_lod.mesh)
+        b_lod.add_projection(s_obj)
+        assert b_lod._projections[-1]['shape'][0] == n_full
+        # Ratio of vertices and no decimation :
+        b_ratio = BrainObj('B1', lod=.1)
+        assert len(b_ratio.mesh) < .2 * n_full
+        b_ratio.set_data('B1', lod=None)
+        assert (b_ratio._lod is None) and (len(b_ratio.mesh) == n_full)
+
+    def test_timecourse(self):
+        """Test time courses (stepping and animation)."""
+        b_tc = BrainObj('B1')
+        data = np.random.rand(200, 30).astype(np.float32)
+        v_tc = np.arange(200)
+        b_tc.add_timecourse(data, v_tc, smoothing_steps=None, time=3)
+        assert (b_tc.time == 3) and (b_tc.n_times == 30)
+        assert b_tc._timecourse['data'][0] is data  # no copy
+        assert b_tc._minmax == (float(data.min()), float(data.max()))
+        np.testing.assert_array_equal(b_tc._cbar_data[v_tc], data[:, 3])
+        b_tc.time = 7
+        np.testing.assert_array_equal(b_tc._cbar_data[v_tc], data[:, 7])
+        # Smoothing is the same as the one of add_activation :
+        b_tc.add_timecourse(data, v_tc, smoothing_steps=5, time=4)
+        b_act = BrainObj('B1')
+        b_act.add_activation(data[:, 4].copy(), v_tc, smoothing_steps=5,
+                             hide_under=-1., clim=(0., 1.))
+        sm_mask = b_act._overlays.mask.astype(bool)
+        assert sm_mask.sum() > 200
+        sm_color = array2colormap(b_tc._cbar_data[sm_mask], cmap='viridis',
+                                  clim=(0., 1.))
+        np.testing.assert_allclose(sm_color, b_act._overlays.color[sm_mask],
+                                   rtol=1e-5)
+        # Blocks of data (e.g. lh / rh) are kept separated :
+        cbar_data = b_tc._cbar_data.copy()
+        blocks = [data[0:120, :], data[120:, :]]
+        b_tc.add_timecourse(blocks, v_tc, smoothing_steps=5, time=4,
+                            clim=(0., 2.))
+        tc_blocks = b_tc._timecourse['data']
+        assert all([k is i for k, i in zip(tc_blocks, blocks)])
+        assert (b_tc.n_times == 30) and (b_tc._minmax == (0., 2.))
+        np.testing.assert_allclose(b_tc._cbar_data, cbar_data, rtol=1e-6)
+        for k in [blocks, [data.T.copy().T]]:
+            assert _blocks_minmax(k, chunk=100) == (float(data.min()),
+                                                    float(data.max()))
+        # Animation :
+        timer = b_tc.play(step=10, loop=False, start=False)
+        for k in [14, 24]:
+            timer.events.timeout()
+            assert b_tc.time == k
+        timer.events.timeout()
+        assert b_tc.time == 24
+        b_tc.clean()
+        assert (b_tc.time is None) and (b_tc._timer is None)
+        # Memory-mapped data and level of detail :
+        path = self.to_tmp_dir('timecourse.npy')
+        np.save(path, data)
+        data_mmap = np.load(path, mmap_mode='r')
+        b_lod = BrainObj('B1', lod=5000)
+        b_lod.add_timecourse(data_mmap, v_tc, smoothing_steps=None)
+        assert b_lod._timecourse['data'][0] is data_mmap
+        assert len(b_lod._cbar_data) == len(b_lod.mesh)
+
     def test_projection(self):
         """Test cortical projection and repartition."""
         b_obj.project_sources(s_obj, 'modulation')
         b_obj.project_sources(s_obj, 'repartition')
+        assert b_obj.mesh.is_scalar
+        # Colorbar update (GPU colormap only) :
+        b_obj._update_cbar_args('plasma', (0., 2.), 1., None, 'gray', None)
+        b_obj._update_cbar()
+        # The GPU lookup table gives the same colors as array2colormap :
+        lut = b_obj.mesh._cmap_lut.map(b_obj._cbar_data)
+        ref = array2colormap(b_obj._cbar_data, **b_obj.to_kwargs())
+        np.testing.assert_allclose(lut, ref, atol=1e-6)
 
     def test_properties(self):
         """Test BrainObj properties (setter and getter)."""
@@ -146,6 +311,25 @@ class TestBrainObj(_TestObjects):
         b_cust_tmp = BrainObj('CustomTmp', vertices=vertices, faces=faces)
         b_cust_tmp.save(tmpfile=True)
 
+    def test_precomputed_projection(self):
+        """Test saving and loading precomputed projection operators."""
+        s_proj = SourceObj('proj', xyz, data=np.random.rand(len(xyz)))
+        b_proj = BrainObj('CustomProj', vertices=vertices, faces=faces)
+        b_proj.project_sources(s_proj, radius=12.)
+        mod = b_proj._cbar_data.copy()
+        b_proj.add_projection(s_proj, radius=12.)
+        b_proj.add_projection(s_proj, radius=12.)  # replace the operator
+        assert len(b_proj._projections) == 1
+        b_proj.save(tmpfile=True)
+        # Reload the template and use the saved operator :
+        b_load = BrainObj('CustomProj')
+        assert len(b_load._projections) == 1
+        op = b_load._projections[0]
+        assert (op['radius'] == 12.) and (op['contribute'] is False)
+        b_load.project_sources(s_proj, radius=12.)
+        np.testing.assert_array_equal(b_load._cbar_data, mod)
+        np.testing.assert_array_equal(b_load._cbar_data.mask, mod.mask)
+
     def test_reload_saved_template(self):
         """Test function reload_saved_template."""
         BrainObj('Custom')
@@ -1,5 +1,6 @@
 """Test ConnectObj."""
 import numpy as np
+from scipy import sparse
 
 from visbrain.objects.connect_obj import ConnectObj, CombineConnect
 from visbrain.objects.tests._testing_objects import _TestObjects
@@ -36,6 +37,56 @@ class TestConnectObj(_TestObjects):
         ConnectObj('C1', nodes, edges, dynamic=(.1, .4))
         ConnectObj('C2', nodes, edges, custom_colors=custom_colors)
 
+    def test_sparse_definition(self):
+        """Test sparse and COO edge lists."""
+        e_dense = np.ma.filled(edges, 0.)
+        c_dense = ConnectObj('C1', nodes, e_dense, color_by='count')
+        # Scipy sparse matrix :
+        c_sp = ConnectObj('C1', nodes, sparse.csr_matrix(e_dense),
+                          color_by='count')
+        # COO edge list :
+        rows, cols = np.nonzero(e_dense)
+        coo = (e_dense[rows, cols], (rows, cols))
+        c_coo = ConnectObj('C1', nodes, coo, color_by='count')
+        for k in [c_sp, c_coo]:
+            assert np.array_equal(k._rows, c_dense._rows)
+            assert np.array_equal(k._cols, c_dense._cols)
+            np.testing.assert_array_equal(k._values, c_dense._values)
+
+    def test_level_of_details(self):
+        """Test edges filtering and edge bundling."""
+        e_dense = np.ma.filled(edges, 0.)
+        c = ConnectObj('C1', nodes, e_dense, threshold=0., top_k=10)
+        assert len(c._rows) == 10
+        assert c._values.min() >= 0.
+        # Numpy scalars :
+        c = ConnectObj('C1', nodes, e_dense, threshold=np.float32(0.),
+                       top_k=np.int64(10))
+        assert len(c._rows) == 10
+        c.threshold, c.top_k = np.float64(0.), np.int32(5)
+        assert len(c._rows) == 5
+        c = ConnectObj('C1', nodes, e_dense, top_k=30, bundling=True)
+        assert c._connect.pos.shape == (30 * c._n_points, 3)
+        assert c._connect.color.shape == (30 * c._n_points, 4)
+        c.color_by = 'count'
+        c.top_k = None
+        assert c._connect.pos.shape[0] == len(c._rows) * c._n_points
+        c.bundling = False
+        assert c._connect.pos.shape[0] == 2 * len(c._rows)
+
+    def test_no_edges(self):
+        """Test a threshold / top_k that remove every edge."""
+        e_dense = np.ma.filled(edges, 0.)
+        for bundling in [False, True]:
+            c = ConnectObj('C1', nodes, e_dense, threshold=50.,
+                           bundling=bundling)
+            assert not len(c._rows) and not c._connect.visible
+            assert c._minmax == (0., 1.)
+            c.threshold = -50.
+            assert c._connect.visible and (len(c._rows) > 0)
+            c.top_k = 0
+            assert not len(c._rows) and not c._connect.visible
+
     def test_builtin_methods(self):
         """Test function connect_builtin_methods."""
         custom_colors[None] = 'blue'
@@ -52,6 +103,10 @@ class TestConnectObj(_TestObjects):
         self.assert_and_test('color_by', 'strength')
         self.assert_and_test('dynamic', (.2, .4))
         self.assert_and_test('alpha', 0.7)
+        self.assert_and_test('threshold', .2)
+        self.assert_and_test('top_k', 5)
+        self.assert_and_test('bundling', True)
+        self.assert_and_test('bundling_beta', .5)
 
 
 class TestCombineConnect(object):
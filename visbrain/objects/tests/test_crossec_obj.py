@@ -2,6 +2,7 @@
 import numpy as np
 
 from visbrain.objects import CrossSecObj
+from visbrain.utils import array2colormap
 from visbrain.objects.tests._testing_objects import _TestObjects
 from visbrain.io import download_file, clean_tmp
 
@@ -23,6 +24,16 @@ class TestCrossSecObj(_TestObjects):
     def test_set_data(self):
         """Test method set_data."""
         cs_obj.set_data((14, 15, 50))
+        cs_obj.set_data((14, 15, 50), clim=(0., 10.), cmap='Spectral_r',
+                        vmin=2., under='gray')
+        # The GPU lookup table gives the same colors as array2colormap :
+        image = cs_obj._im_sagit.image
+        np.testing.assert_allclose(image._cmap_lut.map(image._data),
+                                   array2colormap(image._data,
+                                                  **cs_obj.to_kwargs()),
+                                   atol=1e-6)
+        cs_obj._update_cbar_minmax()
+        assert cs_obj._clim == (cs_obj._vol.min(), cs_obj._vol.max())
 
     def test_localize_source(self):
         """Test function localize_source."""
@@ -0,0 +1,72 @@
+"""Test the OverlayLayers object in _overlay.py."""
+import numpy as np
+
+from visbrain.objects._overlay import OverlayLayers
+
+
+n_vertices = 1000
+rnd = np.random.RandomState(0)
+colors = [rnd.rand(n_vertices, 4).astype(np.float32) for k in range(4)]
+masks = [rnd.rand(n_vertices) > .5 for k in range(4)]
+
+
+def _stacked(weights):
+    """Composite layers by stacking them (weighted masked mean)."""
+    col = np.ma.array([np.ma.masked_array(c, mask=~np.tile(m[:, None], 4))
+                       for c, m in zip(colors, masks)])
+    w = np.array(weights, dtype=float)[:, np.newaxis, np.newaxis]
+    color = ((col * w).sum(0) / (~col.mask * w).sum(0)).filled(0.)
+    mask = np.array([m for m, k in zip(masks, weights) if k]).max(0)
+    return color, mask
+
+
+class TestOverlayLayers(object):
+    """Test the OverlayLayers object."""
+
+    @staticmethod
+    def _check(ov, weights):
+        color, mask = _stacked(weights)
+        np.testing.assert_allclose(ov.color, color, rtol=1e-5, atol=1e-6)
+        np.testing.assert_array_equal(ov.mask, mask)
+
+    def test_add_remove(self):
+        """Test adding and removing layers."""
+        ov = OverlayLayers(n_vertices)
+        names = [ov.add(c, m) for c, m in zip(colors, masks)]
+        assert names == ['layer0', 'layer1', 'layer2', 'layer3']
+        assert len(ov) == 4 and ov.names == names
+        self._check(ov, [1., 1., 1., 1.])
+        ov.remove('layer2')
+        self._check(ov, [1., 1., 0., 1.])
+        # Replace a layer :
+        ov.add(colors[0], masks[0], name='layer1')
+        assert 'layer1' in ov and len(ov) == 3
+        # Remove all layers :
+        for k in ov.names:
+            ov.remove(k)
+        assert not ov.mask.any() and not ov.color.any()
+
+    def test_visible_weight(self):
+        """Test toggling and reweighting layers."""
+        ov = OverlayLayers(n_vertices)
+        for c, m in zip(colors, masks):
+            ov.add(c, m)
+        ov.set_visible('layer1', False)
+        self._check(ov, [1., 0., 1., 1.])
+        ov.set_weight('layer1', 3.)
+        self._check(ov, [1., 0., 1., 1.])
+        ov.set_visible('layer1', True)
+        self._check(ov, [1., 3., 1., 1.])
+        ov.set_weight('layer0', .5)
+        self._check(ov, [.5, 3., 1., 1.])
+
+    def test_move(self):
+        """Test reordering layers."""
+        ov = OverlayLayers(n_vertices)
+        for c, m in zip(colors, masks):
+            ov.add(c, m)
+        ov.move('layer3', 0)
+        assert ov.names == ['layer3', 'layer0', 'layer1', 'layer2']
+        ov.move('layer0', -1)
+        assert ov.names == ['layer3', 'layer1', 'layer0', 'layer2']
+        self._check(ov, [1., 1., 1., 1.])
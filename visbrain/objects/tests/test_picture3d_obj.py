@@ -1,5 +1,6 @@
 """Test Picture3DObj."""
 import numpy as np
+import pytest
 
 from visbrain.objects.picture3d_obj import Picture3DObj, CombinePictures
 from visbrain.objects.tests._testing_objects import _TestObjects
@@ -30,6 +31,25 @@ class TestPicture3DObj(_TestObjects):
         """Test function connect_builtin_methods."""
         assert len(p_obj) == n_sources
 
+    def test_append(self):
+        """Test streaming new columns."""
+        p = Picture3DObj('P1', pic_data, pic_xyz, select=pic_select,
+                         clim=(1., 90.))
+        color = p._pic._color.copy()
+        p.append(pic_data[..., 0:5])
+        # Same columns than the initial ones :
+        np.testing.assert_array_equal(p._pic._color, color)
+        assert p._pic._head == 5
+        # New column (wrap around) :
+        p.append(pic_data[..., 0:17])
+        assert p._pic._head == 2 and p._pic._color.shape == color.shape
+        p.append(np.full((n_sources, 10), 50.))
+        data = p._pic._data.reshape(len(pic_select), 20, 10)
+        assert np.all(data[:, 20 - 1 - 2, :] == 50.)
+        # RGBA columns are not supported :
+        with pytest.raises(ValueError):
+            p._pic.append(np.zeros((n_sources, 10, 2, 4)))
+
     def test_attributes(self):
         """Test function connect_attributes."""
         self.assert_and_test('width', 4.4)
@@ -0,0 +1,50 @@
+"""Test functions in _projection.py."""
+import tracemalloc
+
+import numpy as np
+
+from visbrain.objects import SourceObj
+from visbrain.objects._projection import (_get_masked_index,
+                                          _get_projection_operator)
+
+
+rnd = np.random.RandomState(0)
+vertices = rnd.uniform(-40, 40, (5000, 3))
+vertices_x3 = rnd.uniform(-40, 40, (500, 3, 3))
+
+
+def _masked_sources(n_sources):
+    """Get a source object with only masked sources."""
+    xyz = rnd.uniform(-40, 40, (n_sources, 3))
+    return SourceObj('S', xyz, mask=np.ones((n_sources,), dtype=bool))
+
+
+class TestProjection(object):
+    """Test functions in _projection.py."""
+
+    def test_get_masked_index(self):
+        """Test that blocks of vertices return the same index."""
+        s_obj = _masked_sources(100)
+        for v in [vertices, vertices_x3]:
+            for contribute in [True, False]:
+                idx = _get_masked_index(s_obj, v, 10., contribute)
+                for budget in [1., 1e4]:
+                    idx_b = _get_masked_index(s_obj, v, 10., contribute,
+                                              mem_budget=budget)
+                    np.testing.assert_array_equal(idx, idx_b)
+                op = _get_projection_operator(s_obj._xyz, v, 10., contribute,
+                                              mem_budget=1e4)
+                idx_op = _get_masked_index(s_obj, v, 10., contribute, op)
+                np.testing.assert_array_equal(idx, idx_op)
+
+    def test_get_masked_index_memory(self):
+        """Test that the memory used is bounded when n_sources grows."""
+        budget = 2e6
+        for n_sources in [100, 1000, 4000]:
+            s_obj = _masked_sources(n_sources)
+            tracemalloc.start()
+            _get_masked_index(s_obj, vertices, 10., mem_budget=budget)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            # A dense (n_vertices, n_sources) mask would need 20Mb :
+            assert peak < 2 * budget
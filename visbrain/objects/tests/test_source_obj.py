@@ -1,5 +1,6 @@
 """Test SourceObj."""
 import numpy as np
+from scipy.spatial.distance import cdist
 
 from visbrain.objects import SourceObj, CombineSources, BrainObj, RoiObj
 from visbrain.objects.tests._testing_objects import _TestObjects
@@ -110,9 +111,40 @@ class TestSourceObj(_TestObjects):
             s_obj.set_visible_sources(select=k, v=vertices_x3)
             s_obj.set_visible_sources(select=k, v=vertices)
 
+    def test_set_visible_sources_equivalence(self):
+        """Test that the selection matches an exhaustive search."""
+        s = SourceObj('S', s_xyz, system='mni')
+        xyz_t0 = np.sqrt((s_xyz ** 2).sum(1))
+        for v in [vertices, vertices_x3, b_obj]:
+            v_r = (v.vertices if v is b_obj else v).reshape(-1, 3)
+            closest = v_r[cdist(s_xyz, v_r).argmin(1), :]
+            v_t0 = np.sqrt((closest ** 2).sum(1))
+            s.set_visible_sources('inside', v=v)
+            np.testing.assert_array_equal(s.visible, xyz_t0 <= v_t0)
+            s.set_visible_sources('outside', v=v)
+            np.testing.assert_array_equal(s.visible, xyz_t0 > v_t0)
+            s.set_visible_sources('close', v=v, distance=2.)
+            np.testing.assert_array_equal(s.visible,
+                                          np.abs(xyz_t0 - v_t0) <= 2.)
+            s.set_visible_sources('all')
+            s.fit_to_vertices(v)
+            np.testing.assert_array_equal(s._sources._data['a_position'],
+                                          closest.astype(np.float32))
+
+    def test_vertices_tree_cache(self):
+        """Test that the KD-tree of the brain vertices is cached."""
+        b = BrainObj('B1')
+        tree = b._get_vertices_tree()
+        assert b._get_vertices_tree() is tree
+        b.hemisphere = 'left'
+        tree_left = b._get_vertices_tree()
+        assert tree_left is not tree and tree_left.n == len(b.vertices)
+        b.hemisphere = 'both'
+
     def test_fit_to_vertices(self):
         """Test function source_fit_to_vertices."""
         s_obj.fit_to_vertices(vertices_x3)
+        s_obj.fit_to_vertices(b_obj)
 
     def test_projection(self):
         """Test function source_projection."""
@@ -25,6 +25,52 @@ class TestTimeSeriesObj(_TestObjects):
         """Test function builtin_methods."""
         assert len(ts_obj) == n_sources
 
+    def test_in_place_updates(self):
+        """Test that partial updates match a full rebuild."""
+        ts = TimeSeries3DObj('TS1', ts_data, ts_xyz, select=ts_select)
+        ts.ts_amp, ts.ts_width = 3., 10.
+        ts.select = ts_select[0:2]
+        ts_full = TimeSeries3DObj('TS1', ts_data, ts_xyz, ts_amp=3.,
+                                  ts_width=10., select=ts_select[0:2])
+        np.testing.assert_almost_equal(ts._pos, ts_full._pos, 4)
+        assert np.array_equal(ts._connect, ts_full._connect)
+        # Compare with a loop over nodes :
+        pos = ts._pos.reshape(100, n_sources, 3).transpose(1, 0, 2)
+        time = np.linspace(-5., 5., 100)
+        for k in range(n_sources):
+            np.testing.assert_almost_equal(pos[k, :, 0], ts_xyz[k, 0] + time,
+                                           4)
+            assert np.all(pos[k, :, 2] == np.float32(ts_xyz[k, 2]))
+        assert np.ptp(pos[..., 1] - ts_xyz[:, [1]]) <= 3. + 1e-5
+
+    def test_append(self):
+        """Test streaming new samples."""
+        ts = TimeSeries3DObj('TS1', ts_data, ts_xyz, select=ts_select)
+        pos = ts._pos.copy()
+        ts.append(ts_data[:, 0:30])
+        assert ts._head == 30
+        # Slots of the new samples are the only modified ones :
+        pos_new = ts._pos.reshape(100, n_sources, 3)
+        np.testing.assert_array_equal(pos_new[30:, ...],
+                                      pos.reshape(100, n_sources, 3)[30:, ...])
+        np.testing.assert_almost_equal(pos_new[0:30, ...],
+                                       pos.reshape(100, n_sources, 3)[0:30],
+                                       4)
+        # Gap between the newest and the oldest samples :
+        seg = ts._connect.reshape(99, n_sources, 2)
+        assert np.all(seg[29, :, 0] == seg[29, :, 1])
+        assert np.all(seg[28, ts_select, 0] != seg[28, ts_select, 1])
+        # Wrap around (memory footprint is fixed) :
+        ts.append(ts_data[:, 0:80])
+        assert ts._head == 10 and ts._pos.shape == (100 * n_sources, 3)
+        assert ts._ts._pos_buffer.size == 100 * n_sources
+        assert ts._ts._connect_buffer.size == 2 * 99 * n_sources
+        seg = ts._connect.reshape(99, n_sources, 2)
+        assert np.all(seg[29, ts_select, 0] != seg[29, ts_select, 1])
+        assert np.all(seg[9, :, 0] == seg[9, :, 1])
+        ts.append(ts_data[:, 0])
+        assert ts._head == 11
+
     def test_attributes(self):
         """Test function attributes."""
         self.assert_and_test('width', 4.)
@@ -34,6 +80,9 @@ class TestTimeSeriesObj(_TestObjects):
         self.assert_and_test('alpha', .7)
         self.assert_and_test('translate', (1., 2., 3.))
         self.assert_and_test('line_width', 1.4)
+        self.assert_and_test('ts_amp', 2.)
+        self.assert_and_test('ts_width', 10.)
+        self.assert_and_test('select', np.array([0, 1]))
 
 
 class TestCombineTimeSeries(object):
@@ -2,11 +2,11 @@
 import numpy as np
 
 from vispy import scene
-from vispy.scene import visuals
 import vispy.visuals.transforms as vist
 
 from .visbrain_obj import VisbrainObject, CombineObjects
-from ..utils import normalize, color2vb, wrap_properties
+from ..visuals import StreamLine
+from ..utils import color2vb, wrap_properties, ring_slices
 
 
 class TimeSeries3DObj(VisbrainObject):
@@ -98,9 +98,9 @@ class TimeSeries3DObj(VisbrainObject):
         self._alpha = alpha
 
         # _______________________ LINE _______________________
-        self._ts = visuals.Line(name='TimeSeriesObjLine', parent=self._node,
-                                width=line_width, color=self._color,
-                                antialias=antialias)
+        self._ts = StreamLine(name='TimeSeriesObjLine', parent=self._node,
+                              width=line_width, color=self._color,
+                              antialias=antialias)
         self._ts.transform = tr
         self._build_line()
 
@@ -113,22 +113,114 @@ class TimeSeries3DObj(VisbrainObject):
         self._ts.update()
 
     def _build_line(self):
-        # Get the number of sources :
-        n_nodes = len(self)
-        # Build the position vector :
-        pos = np.zeros((n_nodes, self._n_pts, 3), dtype=np.float32)
+        """Build the persistent position buffer and the connections.
+
+        Vertices are ordered by time slot, then by node so that the vertices
+        of a single time slot are contiguous in the buffer. Each component is
+        then updated in place (see _update_x, _update_y and _update_connect)
+        so that changing the width, the amplitude or the selection doesn't
+        require to rebuild the full line.
+        """
+        # Time-series normalized only once between (-.5, .5) :
+        self._ylim = (float(self._data.min()), float(self._data.max()))
+        self._data_norm = self._normalize(self._data).T.copy()
+        self._head = 0
+        self._pos = np.zeros((self._n_pts * len(self), 3), dtype=np.float32)
+        self._pos_slot = self._pos.reshape(self._n_pts, len(self), 3)
+        self._pos_slot[..., 2] = self._xyz[:, 2]
+        self._update_x(False)
+        self._update_y(False)
+        self._update_connect(False)
+        self._ts.set_data(pos=self._pos, connect=self._connect)
+
+    def _normalize(self, data):
+        """Normalize time-series according to the (min, max) of the data."""
+        data = np.asarray(data, dtype=np.float32)
+        center = (self._ylim[0] + self._ylim[1]) / 2.
+        rg = self._ylim[1] - self._ylim[0]
+        return (data - center) / rg if rg else np.zeros_like(data)
+
+    def _update_x(self, send=True):
+        """Update only the x component of the position buffer."""
         time = np.linspace(-self._ts_width / 2, self._ts_width / 2,
-                           self._n_pts)
-        data = normalize(self._data, -self._ts_amp / 2, self._ts_amp / 2)
-        for k in range(n_nodes):
-            pos[k, :, 0] = self._xyz[k, 0] + time
-            pos[k, :, 1] = self._xyz[k, 1] + data[k, :]
-            pos[k, :, 2] = self._xyz[k, 2]
-        pos = pos.reshape(n_nodes * self._n_pts, 3)
-        # Build the connection vector :
-        connect = np.zeros((n_nodes, self._n_pts), dtype=bool)
-        connect[self._select, 0:-1] = True  # don't connect last point
-        self._ts.set_data(pos=pos, connect=connect.ravel())
+                           self._n_pts, dtype=np.float32)
+        np.add(time.reshape(-1, 1), self._xyz[:, 0],
+               out=self._pos_slot[..., 0])
+        if send:
+            self._ts.set_data(pos=self._pos)
+
+    def _update_y(self, send=True, slots=slice(None)):
+        """Update only the y component of the position buffer."""
+        self._pos_slot[slots, :, 1] = self._data_norm[
+            slots, :] * self._ts_amp + self._xyz[:, 1]
+        if send:
+            self._ts.set_data(pos=self._pos)
+
+    def _update_connect(self, send=True):
+        """Update only the connections (i.e. the selected time-series).
+
+        Segments of non-selected time-series are degenerated (both ends refer
+        to the same vertex) so that the index buffer keeps a fixed size.
+        """
+        n_nodes = len(self)
+        is_sel = np.zeros((n_nodes,), dtype=bool)
+        is_sel[self._select] = True
+        start = np.arange((self._n_pts - 1) * n_nodes, dtype=np.uint32)
+        start = start.reshape(self._n_pts - 1, n_nodes)
+        self._connect_slot = np.stack((start, start + n_nodes * is_sel), -1)
+        self._connect_slot = self._connect_slot.astype(np.uint32)
+        self._connect = self._connect_slot.reshape(-1, 2)
+        self._set_gap(self._head, True)
+        if send:
+            self._ts.set_data(connect=self._connect)
+
+    def _set_gap(self, head, is_gap):
+        """Break (or restore) the segment between the newest and the oldest
+        samples. Return the index of the modified slot (or None)."""
+        if not 0 < head < self._n_pts:
+            return None
+        slot = head - 1
+        is_sel = np.zeros((len(self),), dtype=np.uint32)
+        if not is_gap:
+            is_sel[self._select] = 1
+        self._connect_slot[slot, :, 1] = self._connect_slot[
+            slot, :, 0] + len(self) * is_sel
+        return slot
+
+    def append(self, data):
+        """Append new samples to the time-series (streaming).
+
+        The time-series behave like a ring buffer with a window length equal
+        to the number of time points of the data used at the initialization.
+        New samples replace the oldest ones (sweep display) and only the
+        modified part of the vertex buffer is sent to the GPU. Hence, the
+        memory footprint doesn't depend on the length of the recording.
+
+        Parameters
+        ----------
+        data : array_like
+            New samples of shape (n_sources,) or (n_sources, n_new_points).
+            New samples are normalized using the (min, max) of the initial
+            data.
+        """
+        data = np.asarray(data).reshape(len(self), -1)
+        n_new = min(data.shape[1], self._n_pts)
+        data = data[:, -n_new:]
+        n_nodes, head = len(self), self._head
+        slots = (head + np.arange(n_new)) % self._n_pts
+        # Update the ring buffer and the y component :
+        self._data_norm[slots, :] = self._normalize(data).T
+        self._update_y(False, slots)
+        # Move the gap between the newest and the oldest samples :
+        self._head = (head + n_new) % self._n_pts
+        gaps = [self._set_gap(head, False), self._set_gap(self._head, True)]
+        # Sub-range uploads :
+        for start, stop in ring_slices(head, n_new, self._n_pts):
+            self._ts.set_subdata(pos=self._pos_slot[start:stop, ...],
+                                 offset=start * n_nodes)
+        for slot in set([k for k in gaps if k is not None]):
+            self._ts.set_subdata(connect=self._connect_slot[slot, ...],
+                                 offset=2 * slot * n_nodes)
 
     def _get_camera(self):
         """Get the most adapted camera."""
@@ -154,7 +246,7 @@ class TimeSeries3DObj(VisbrainObject):
         """Set ts_width value."""
         assert isinstance(value, (int, float))
         self._ts_width = value
-        self._build_line()
+        self._update_x()
 
     # ----------- TS_AMP -----------
     @property
@@ -168,7 +260,22 @@ class TimeSeries3DObj(VisbrainObject):
         """Set ts_amp value."""
         assert isinstance(value, (int, float))
         self._ts_amp = value
-        self._build_line()
+        self._update_y()
+
+    # ----------- SELECT -----------
+    @property
+    def select(self):
+        """Get the select value."""
+        return self._select
+
+    @select.setter
+    @wrap_properties
+    def select(self, value):
+        """Set select value."""
+        value = np.arange(len(self)) if value is None else value
+        assert isinstance(value, (list, np.ndarray))
+        self._select = value
+        self._update_connect()
 
     # ----------- COLOR -----------
     @property
@@ -181,9 +288,8 @@ class TimeSeries3DObj(VisbrainObject):
     def color(self, value):
         """Set color value."""
         color = color2vb(value)
-        self._ts.set_data(color=color)
+        self._ts.color = color
         self._color = color
-        self.update()
 
     # ----------- ALPHA -----------
     @property
@@ -196,9 +302,8 @@ class TimeSeries3DObj(VisbrainObject):
     def alpha(self, value):
         """Set alpha value."""
         assert isinstance(value, (int, float)) and (0. <= value <= 1.)
-        self._ts.color[..., -1] = value
+        self._ts.alpha = value
         self._alpha = value
-        self.update()
 
     # ----------- TRANSLATE -----------
     @property
@@ -226,9 +331,8 @@ class TimeSeries3DObj(VisbrainObject):
     def line_width(self, value):
         """Set line_width value."""
         assert isinstance(value, (int, float))
-        self._ts._width = value
+        self._ts.width = value
         self._line_width = value
-        self._ts.update()
 
 
 class CombineTimeSeries(CombineObjects):
@@ -7,7 +7,7 @@ import vispy.scene.cameras as viscam
 from .ui_elements import UiElements, UiInit
 from .visuals import Visuals
 from ..utils import (safely_set_cbox, color2tuple, color2vb, mpl_cmap,
-                     toggle_enable_tab)
+                     toggle_enable_tab, minmax_decimate)
 from ..io import write_fig_canvas
 from ..pyqt_module import PyQtModule
 # get_screen_size
@@ -41,6 +41,15 @@ class Signal(PyQtModule, UiInit, UiElements, Visuals):
         Enable or disable the grid. If False, the grid is not computed and not
         accessible from the GUI. The grid requires more memory RAM. It could be
         turn to False for very large datasets.
+    lazy : bool | False
+        Lazy mode for datasets that do not fit in memory. Use it with a
+        memory-mapped array (e.g. np.memmap or np.load(file, mmap_mode='r')).
+        The grid then displays a preview of the signals (minimum and maximum
+        of successive bins of time points, computed by chunks) and only the
+        selected signal is read from the disk.
+    lazy_npts : int | 4096
+        Number of time points of the preview used by the grid and by the
+        butterfly plot in lazy mode.
     form : {'line', 'marker', 'histogram', 'tf', 'psd', 'butterfly'}
         Plotting type.
     color : array_like/string/tuple | 'black'
@@ -124,8 +133,9 @@ class Signal(PyQtModule, UiInit, UiElements, Visuals):
     """
 
     def __init__(self, data, axis=-1, time=None, sf=1., enable_grid=True,
-                 form='line', color='black', line_lw=1., line_smooth=False,
-                 marker_symbol='disc', marker_size=10., hist_nbins=10,
+                 lazy=False, lazy_npts=4096, form='line', color='black',
+                 line_lw=1., line_smooth=False, marker_symbol='disc',
+                 marker_size=10., hist_nbins=10,
                  tf_norm=0, tf_baseline=None, tf_interp='gaussian',
                  tf_cmap='viridis', tf_av_window=None, tf_av_overlap=0.,
                  tf_clim=None, psd_nperseg=256, psd_noverlap=128,
@@ -154,14 +164,20 @@ class Signal(PyQtModule, UiInit, UiElements, Visuals):
             display_grid = self._enable_grid = False
             self.actionGrid.setEnabled(False)
             toggle_enable_tab(self.QuickSettings, 'Grid', False)
-        self._data = data.astype(np.float32, copy=False)
+        if lazy:  # data are read on demand
+            self._data = data
+            preview = minmax_decimate(data, lazy_npts, axis)
+            self._grid_data = preview[0]
+        else:
+            self._data = data.astype(np.float32, copy=False)
+            self._grid_data, preview = self._data, None
         self._axis = axis
 
         # ==================== VISUALS ====================
         grid_parent = self._grid_canvas.wc.scene
         signal_parent = self._signal_canvas.wc.scene
         Visuals.__init__(self, data, time, sf, axis, grid_titles, grid_color,
-                         grid_shape, grid_parent, signal_parent)
+                         grid_shape, grid_parent, signal_parent, preview)
 
         # ==================== CAMERA ====================
         grid_rect = (0, 0, 1, 1)
@@ -268,7 +284,8 @@ class Signal(PyQtModule, UiInit, UiElements, Visuals):
         self._sig_index.setMinimum(0)
         self._sig_index.setMaximum(len(self._signal._navidx) - 1)
         # Fix amplitude limits :
-        d_min, d_max = self._data.min(), self._data.max()
+        # The preview keeps the extrema of the data in lazy mode :
+        d_min, d_max = self._grid_data.min(), self._grid_data.max()
         step = (d_max - d_min) / 100.
         n = self._data.shape[self._axis]
         self._sig_amp_min.setMinimum(d_min)
@@ -1,4 +1,5 @@
 """Test Signal module and related methods."""
+import numpy as np
 from vispy.app.canvas import MouseEvent, KeyEvent
 
 from visbrain import Signal
@@ -215,6 +216,27 @@ class TestSignal(_TestVisbrain):
         sig._fcn_display_apply()
         sig._fcn_set_filtering()
 
+    ###########################################################################
+    #                                 LAZY
+    ###########################################################################
+    def test_lazy(self):
+        """Test the lazy mode with memory-mapped data."""
+        path = self.to_tmp_dir('lazy.npy')
+        data_32 = data.astype(np.float32)
+        np.save(path, data_32)
+        data_mm = np.load(path, mmap_mode='r')
+        sig_l = Signal(data_mm, sf=sf, axis=-1, time=time, lazy=True,
+                       lazy_npts=100)
+        assert sig_l._data is data_mm
+        assert sig_l._grid_data.shape[-1] <= 100
+        assert sig_l._grid_data.min() == data_32.min()
+        assert sig_l._grid_data.max() == data_32.max()
+        # Only the selected signal is read :
+        sig_l._fcn_set_signal(force=True)
+        sig_l._sig_form.setCurrentIndex(5)  # butterfly
+        sig_l._fcn_set_signal(force=True)
+        sig_l._fcn_set_filtering()
+
     ###########################################################################
     #                              ANNOTATIONS
     ###########################################################################
@@ -60,7 +60,7 @@ class UiGrid(object):
     def _fcn_reorganize_grid(self):
         """Re-organize the grid."""
         nshape = (self._grid_nrows.value(), self._grid_ncols.value())
-        self._grid.set_data(self._data, self._axis, force_shape=nshape)
+        self._grid.set_data(self._grid_data, self._axis, force_shape=nshape)
 
     def _fcn_grid_tupdate(self):
         """Update grid titles properties."""
@@ -48,7 +48,7 @@ class UiSettings(object):
         # Grid :
         if hasattr(self, '_grid'):
             self._set_filtering_to_object(self._grid._prep)  # grid
-            self._grid.set_data(self._data)
+            self._grid.set_data(self._grid_data)
             self._grid.update()
             self.update_cameras(update='grid')
         # Signal :
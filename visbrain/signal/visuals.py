@@ -132,13 +132,17 @@ class SignalVisual(SignalAnnotations):
         quality lines and 'agg', looks better but slower.
     parent : VisPy.parent | None
         Parent of the mesh.
+    preview : tuple | None
+        Tuple (data, time) of decimated data used for the butterfly plot
+        (lazy mode).
     """
 
     def __init__(self, time, sf, sh, axis, form='line', line_rendering='gl',
-                 parent=None):
+                 parent=None, preview=None):
         """Init."""
         self.form = form
         self._time = time
+        self._preview = preview
         self._sf = sf
         self._axis = axis
         self._index = 0  # selected index of the 3-d array
@@ -222,8 +226,9 @@ class SignalVisual(SignalAnnotations):
             idx = list(self._navidx[index])
             idx.insert(self._axis, slice(None))
 
-        # Convert data to be compatible with VisPy and prepare data :
-        data_c = vispy_array(data[idx]).copy()
+        # Convert data to be compatible with VisPy and prepare data (only
+        # the selected signal is read for memory-mapped data) :
+        data_c = vispy_array(data[tuple(idx)]).copy()
         _data = self._prep._prepare_data(self._sf, data_c, self._time)
 
         # Set data :
@@ -263,15 +268,20 @@ class SignalVisual(SignalAnnotations):
                                     size=size, edge_width=0.)
                 self._mark.update()
             elif form == 'butterfly':
+                # Use decimated data in lazy mode :
+                if self._preview is None:
+                    time = self._time
+                else:
+                    data, time = self._preview
                 # Get soe shape related variables :
-                n, m = len(self._time), int(np.prod(data.shape))
+                n, m = len(time), int(np.prod(data.shape))
                 n_rep = int(m / n)
                 data = vispy_array(data)
                 # Build position :
-                pos = np.c_[np.tile(self._time.ravel(), n_rep), data.ravel()]
+                pos = np.c_[np.tile(time.ravel(), n_rep), data.ravel()]
                 # Disconnect some points :
                 connect = np.c_[np.arange(m - 1), np.arange(1, m)]
-                to_delete = np.linspace(n - 1, m - 1, n_rep)
+                to_delete = np.arange(n - 1, m - 1, n)
                 connect = np.delete(connect, to_delete, axis=0)
                 # Build color :
                 col = color2vb(color, length=m)
@@ -359,8 +369,12 @@ class Visuals(object):
     """Create visual objects for th grid and the signal."""
 
     def __init__(self, data, time, sf, axis, grid_titles, grid_color,
-                 grid_shape, grid_parent, signal_parent):
-        """Init."""
+                 grid_shape, grid_parent, signal_parent, preview=None):
+        """Init.
+
+        In lazy mode, preview is a tuple (data, index) of decimated data
+        used by the grid and the butterfly plot instead of the raw data.
+        """
         # ========================== CHECK ==========================
         # ----------- AXIS -----------
         if (np.sign(axis) == 1) and (axis > data.ndim - 1):
@@ -375,13 +389,21 @@ class Visuals(object):
                              "as the one specified by axis (" + str(axis
                                                                     ) + ")")
 
+        # ========================== PREVIEW ==========================
+        grid_data, grid_sf, sig_preview = data, sf, None
+        if preview is not None:
+            grid_data = preview[0]
+            grid_sf = sf * grid_data.shape[axis] / data.shape[axis]
+            sig_preview = (preview[0], time[preview[1]])
+
         # ========================== GRID ==========================
         if self._enable_grid:  # don't create grid for 1-D signals
-            self._grid = GridSignal(data, axis=axis, sf=sf, title=grid_titles,
-                                    color=grid_color, force_shape=grid_shape,
+            self._grid = GridSignal(grid_data, axis=axis, sf=grid_sf,
+                                    title=grid_titles, color=grid_color,
+                                    force_shape=grid_shape,
                                     parent=grid_parent)
             self._grid._txt.parent = grid_parent
 
         # ========================== SIGNAL ==========================
         self._signal = SignalVisual(time, sf, data.shape, axis,
-                                    parent=signal_parent)
+                                    parent=signal_parent, preview=sig_preview)
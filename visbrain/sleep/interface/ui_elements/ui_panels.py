@@ -92,11 +92,11 @@ class UiPanels(object):
         self._PanSpecStep.valueChanged.connect(self._fcn_spec_compat)
         self._PanSpecFstart.valueChanged.connect(self._fcn_spec_compat)
         self._PanSpecFend.valueChanged.connect(self._fcn_spec_compat)
-        self._PanSpecCon.valueChanged.connect(self._fcn_spec_compat)
-        self._PanSpecCmap.currentIndexChanged.connect(self._fcn_spec_compat)
+        self._PanSpecCon.valueChanged.connect(self._fcn_spec_cmap)
+        self._PanSpecCmap.currentIndexChanged.connect(self._fcn_spec_cmap)
         self._PanSpecChan.currentIndexChanged.connect(self._fcn_spec_compat)
         self._PanSpecMethod.currentIndexChanged.connect(self._fcn_spec_compat)
-        self._PanSpecCmapInv.clicked.connect(self._fcn_spec_compat)
+        self._PanSpecCmapInv.clicked.connect(self._fcn_spec_cmap)
         self._PanSpecNorm.currentIndexChanged.connect(self._fcn_spec_compat)
         self._PanSpecInterp.currentIndexChanged.connect(self._fcn_spec_interp)
         PROFILER("Spectrogram", level=2)
@@ -344,8 +344,11 @@ class UiPanels(object):
         self._fcn_chan_amplitude()
 
     def _fcn_update_amp_info(self):
-        """Update informations about amplitudes."""
-        self._get_data_info()
+        """Update informations about amplitudes.
+
+        Data info are only computed when the data change (i.e. on loading
+        and when the montage is modified).
+        """
         self._PanAllAmpMin.setMinimum(self['min'].min())
         self._PanAllAmpMin.setMaximum(self['max'].max())
         self._PanAllAmpMax.setMinimum(self['min'].min())
@@ -474,6 +477,18 @@ class UiPanels(object):
         # Set apply button enable :
         self._PanSpecApply.setEnabled(True)
 
+    def _fcn_spec_cmap(self):
+        """Change the colormap and contrast of the spectrogram.
+
+        The spectrogram is not re-computed. Only the colormap, applied on the
+        GPU, is updated.
+        """
+        contrast = self._PanSpecCon.value()
+        cmap = str(self._PanSpecCmap.currentText())
+        if self._PanSpecCmapInv.isChecked():
+            cmap += '_r'
+        self._spec.set_colormap(cmap, contrast)
+
     def _fcn_spec_interp(self):
         """Change the 2-D interpolation method."""
         # Interpolation :
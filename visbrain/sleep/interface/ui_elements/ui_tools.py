@@ -2,8 +2,7 @@
 
 import numpy as np
 from PyQt5 import QtWidgets
-from ....utils import (rereferencing, bipolarization, find_non_eeg,
-                       commonaverage)
+from ....utils import find_non_eeg, Montage
 
 
 class UiTools(object):
@@ -14,6 +13,9 @@ class UiTools(object):
         self._tool_pick.currentIndexChanged.connect(self._fcn_tool_pick)
         # Find non-eeg channels :
         self._noneeg = find_non_eeg(self._channels)
+        # Montage applied on the fly (the original data are never modified) :
+        self._data_raw, self._channels_raw = self._data, list(self._channels)
+        self._montage = Montage(self._channels_raw)
         # =====================================================================
         # RE-REFERENCING
         # =====================================================================
@@ -78,14 +80,17 @@ class UiTools(object):
     def _fcn_ref_apply(self):
         """Apply re-referencing."""
         # By default, ingore non-eeg channel :
-        to_ignore = self._noneeg
+        to_ignore = self._noneeg.copy()
         if self._ToolsRefIgn.isChecked():
             for num, k in enumerate(self._reChecks):
                 # Get the position of this channel :
-                idinlst = self._channels.index(str(k.text()))
+                idinlst = self._channels_raw.index(str(k.text()))
                 # Set to ignore :
                 to_ignore[idinlst] = k.isChecked()
 
+        # Montages are always built from the original channels so that
+        # switching between methods doesn't require to reload the data :
+        montage = Montage(self._channels_raw)
         # Get the current selected method :
         idx = int(self._ToolsRefMeth.currentIndex())
         # Single channel :
@@ -93,17 +98,15 @@ class UiTools(object):
             # Get selected channel :
             idchan = idx = self._ToolsRefLst.currentIndex()
             # Re-referencing :
-            self._data, self._channels, consider = rereferencing(
-                self._data, self._channels, idchan,
-                to_ignore)
+            montage = montage.rereferencing(idchan, to_ignore)
             self._chanChecks[idx].setChecked(False)
         elif idx == 1:  # Common average
-            self._data, self._channels, consider = commonaverage(
-                self._data, self._channels, to_ignore)
+            montage = montage.commonaverage(to_ignore)
         elif idx == 2:  # Bipolarization
-            self._data, self._channels, consider = bipolarization(
-                self._data, self._channels,
-                to_ignore)
+            montage = montage.bipolarization(to_ignore)
+        self._montage, consider = montage, montage.consider
+        self._data = montage.view(self._data_raw)
+        self._channels = montage.channels
 
         # ____________________ Update ____________________
         a_max = np.argmax(consider)
@@ -132,18 +135,20 @@ class UiTools(object):
             self._chanLabels[num].setText(k)
 
         # Ignore non re-referenced channels :
-        if self._ToolsRefIgnore.isChecked():
-            for num, k in enumerate(consider):
+        is_ignore = self._ToolsRefIgnore.isChecked()
+        for num, k in enumerate(consider):
+            viz = bool(k) or not is_ignore
+            if is_ignore:
                 # Remove from visible channels :
                 self._chanChecks[num].setChecked(False)
-                self._chanChecks[num].setVisible(k)
-                self._chanLabels[num].setVisible(k)
-                self._yminSpin[num].setVisible(k)
-                self._ymaxSpin[num].setVisible(k)
-                self._amplitudeTxt[num].setVisible(k)
-                # Remove from chan list :
-                self._PanSpecChan.model().item(num).setEnabled(k)
-                self._ToolDetectChan.model().item(num).setEnabled(k)
+            self._chanChecks[num].setVisible(viz)
+            self._chanLabels[num].setVisible(viz)
+            self._yminSpin[num].setVisible(viz)
+            self._ymaxSpin[num].setVisible(viz)
+            self._amplitudeTxt[num].setVisible(viz)
+            # Remove from chan list :
+            self._PanSpecChan.model().item(num).setEnabled(viz)
+            self._ToolDetectChan.model().item(num).setEnabled(viz)
         if not any([k.isChecked() for k in self._chanChecks]):
             self._chanChecks[a_max].setChecked(True)
         # Reconnect :
@@ -152,9 +157,6 @@ class UiTools(object):
         self._chan.update()
         self._fcn_chan_viz()
 
-        # Finally disable GroupBox :
-        self._ToolsRefGrp.setEnabled(False)
-
     # =====================================================================
     # DEMEAN / DETREND / FILTERING
     # =====================================================================
@@ -6,7 +6,7 @@ import vispy.scene.cameras as viscam
 from .interface import UiInit, UiElements
 from .visuals import Visuals
 from ..pyqt_module import PyQtModule
-from ..utils import (FixedCam, color2vb, MouseEventControl)
+from ..utils import FixedCam, color2vb, MouseEventControl, chunk_stats
 from ..io import ReadSleepData
 from ..config import PROFILER
 
@@ -27,10 +27,17 @@ class Sleep(PyQtModule, ReadSleepData, UiInit, Visuals, UiElements,
 
     Parameters
     ----------
-    data : string, array_like | None
+    data : string, array_like, SleepDataSource | None
         Polysomnographic data. Must either be a path to a supported file (see
-        notes) or an array of raw data of shape (n_channels, n_pts). If None,
-        a dialog window to load the file should appear.
+        notes), an array of raw data of shape (n_channels, n_pts) or a data
+        source (see :class:`visbrain.io.SleepDataSource`). Data sources are
+        read on demand and are not down-sampled which allows to browse
+        recordings that do not fit in memory (e.g. using a
+        :class:`visbrain.io.CachedSource`). The sampling frequency and the
+        channel names of a data source are not modified. However, if the
+        amplitude of the data is too low (data in volts), the data source is
+        scaled in place by 1e6. If None, a dialog window to load the file
+        should appear.
     hypno : array_like | None
         Hypnogram data. Should be a raw vector of shape (n_pts,)
     config_file : string | None
@@ -53,7 +60,8 @@ class Sleep(PyQtModule, ReadSleepData, UiInit, Visuals, UiElements,
         order into the GUI.
     preload : bool | True
         Preload data into memory. For large datasets, turn this parameter to
-        True.
+        False. BrainVision (*.vhdr) and ELAN (*.eeg) files are then
+        memory-mapped and data are read on demand.
     use_mne : bool | False
         Force to load the file using mne.io functions.
     kwargs_mne : dict | {}
@@ -166,10 +174,15 @@ class Sleep(PyQtModule, ReadSleepData, UiInit, Visuals, UiElements,
     # SUB-FONCTIONS
     ###########################################################################
     def _get_data_info(self):
-        """Get some info about data (min, max, std, mean, dist)."""
-        self._datainfo = {'min': self._data.min(1), 'max': self._data.max(1),
-                          'std': self._data.std(1), 'mean': self._data.mean(1),
-                          'dist': self._data.max(1) - self._data.min(1)}
+        """Get some info about data (min, max, std, mean, dist).
+
+        Statistics are computed in a single pass over the data, by chunks of
+        time points, so that lazy sources are read only once.
+        """
+        if hasattr(self._data, 'stats'):
+            self._datainfo = self._data.stats()
+        else:
+            self._datainfo = chunk_stats(self._data)
 
     def _set_default_state(self):
         """Set the default window state."""
@@ -12,9 +12,9 @@ from vispy import scene
 import vispy.visuals.transforms as vist
 
 from .marker import Markers
-from ...utils import (array2colormap, color2vb, PrepareData)
+from ...utils import (color2vb, PrepareData)
 from ...utils.sleep.event import _index_to_events
-from ...visuals import TopoMesh, TFmapsMesh
+from ...visuals import TopoMesh, TFmapsMesh, ScalarImage
 from ...config import PROFILER
 
 logger = logging.getLogger('visbrain')
@@ -426,10 +426,12 @@ class Spectrogram(PrepareData):
 
         # Time-frequency map
         self.tf = TFmapsMesh(parent=parent)
-        # Spectrogram
-        self.mesh = scene.visuals.Image(np.zeros((2, 2)), parent=parent,
-                                        name='Fourier transform')
+        # Spectrogram (colored on the GPU)
+        self.mesh = ScalarImage(np.zeros((2, 2)), parent=parent,
+                                name='Fourier transform')
         self.mesh.transform = vist.STTransform()
+        self._method = 'Fourier transform'
+        self._minmax = (0., 1.)
 
     def set_data(self, sf, data, time, method='Fourier transform',
                  cmap='rainbow', nfft=30., overlap=0., fstart=.5, fend=20.,
@@ -474,6 +476,7 @@ class Spectrogram(PrepareData):
         nperseg = int(round(nfft * sf))
 
         # =================== TF // SPECTRO ===================
+        self._method = method
         if method == 'Wavelet':
             self.tf.set_data(data, sf, f_min=fstart, f_max=fend, cmap=cmap,
                              contrast=contrast, n_window=nperseg,
@@ -509,11 +512,11 @@ class Spectrogram(PrepareData):
             self._fstart, self._fend = freq[0], freq[-1]
 
             # =================== COLOR ===================
-            # Get clim :
-            clim = (contrast * mesh.min(), contrast * mesh.max())
-            # Turn mesh into color array for selected frequencies:
-            self.mesh.set_data(array2colormap(mesh[sls, :], cmap=cmap,
-                                              clim=clim))
+            # Send the spectrogram for selected frequencies. The colormap is
+            # then applied on the GPU :
+            self._minmax = (mesh.min(), mesh.max())
+            self.mesh.set_data(mesh[sls, :])
+            self.set_colormap(cmap, contrast)
             self.mesh.interpolation = interp
 
             # =================== TRANSFORM ===================
@@ -533,9 +536,27 @@ class Spectrogram(PrepareData):
         self.mesh.visible = 0 if method == 'Wavelet' else 1
         self.tf.visible = 1 if method == 'Wavelet' else 0
 
+    def set_colormap(self, cmap='rainbow', contrast=.5):
+        """Update the colormap without re-computing the spectrogram.
+
+        Parameters
+        ----------
+        cmap : string | 'rainbow'
+            The matplotlib colormap to use.
+        contrast : float | .5
+            Contrast of the colormap.
+        """
+        if self._method == 'Wavelet':
+            minmax = self.tf._minmax
+            clim = (contrast * minmax[0], contrast * minmax[1])
+            self.tf.set_colormap(cmap=cmap, clim=clim)
+        else:
+            clim = (contrast * self._minmax[0], contrast * self._minmax[1])
+            self.mesh.set_colormap(cmap=cmap, clim=clim)
+
     def clean(self):
         """Clean indicators."""
-        pos = np.zeros((3, 4), dtype=np.float32)
+        pos = np.zeros((2, 2), dtype=np.float32)
         self.mesh.set_data(pos)
         self.mesh.parent = None
         self.mesh = None
@@ -1,5 +1,6 @@
 from .cameras import *
 from .color import *
+from .connectivity import *
 from .filtering import *
 from .gui import *
 from .guitools import *
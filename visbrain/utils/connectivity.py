@@ -0,0 +1,185 @@
+"""Connectivity utility functions (edge filtering and edge bundling)."""
+import logging
+
+import numpy as np
+
+
+__all__ = ('filter_edges', 'nodes_hierarchy', 'hierarchical_bundling')
+
+
+logger = logging.getLogger('visbrain')
+
+
+def filter_edges(values, threshold=None, top_k=None):
+    """Get the edges to keep according to their strength.
+
+    Parameters
+    ----------
+    values : array_like
+        Strength of each edge of shape (n_edges,).
+    threshold : float | None
+        Only keep edges with a strength over (or equal to) threshold.
+    top_k : int | None
+        Only keep the top_k strongest edges (no edge is kept if top_k is
+        lower or equal to 0).
+
+    Returns
+    -------
+    keep : array_like
+        Boolean array of shape (n_edges,) where True refer to edges to keep.
+    """
+    values = np.asarray(values)
+    keep = np.ones((len(values),), dtype=bool)
+    if isinstance(threshold, (int, float, np.integer, np.floating)):
+        keep = values >= threshold
+    if isinstance(top_k, (int, np.integer)) and (top_k < keep.sum()):
+        idx = np.where(keep)[0]
+        # argpartition : O(n_edges) instead of a full sort
+        keep = np.zeros((len(values),), dtype=bool)
+        if top_k > 0:
+            strongest = np.argpartition(values[idx], -top_k)[-top_k:]
+            keep[idx[strongest]] = True
+    logger.debug("%i edges kept over %i" % (keep.sum(), len(keep)))
+    return keep
+
+
+def nodes_hierarchy(nodes, n_levels):
+    """Build a hierarchy of nodes by recursive median splits.
+
+    At each level, each cluster is split into two along its widest axis. The
+    level l contains at most 2 ** l clusters. Clusters are nested (each
+    cluster of level l belong to a single cluster of level l - 1).
+
+    Parameters
+    ----------
+    nodes : array_like
+        Nodes coordinates of shape (n_nodes, 3).
+    n_levels : int
+        Number of levels (excluding the root level).
+
+    Returns
+    -------
+    labels : array_like
+        Cluster index of each node at each level of shape
+        (n_levels + 1, n_nodes). The first level is the root.
+    centroids : list
+        List of length n_levels + 1 containing the centroids of clusters for
+        each level. Centroids of level l have a shape of (2 ** l, 3).
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    n_nodes, n_dims = nodes.shape
+    labels = np.zeros((n_levels + 1, n_nodes), dtype=int)
+    centroids = [nodes.mean(0, keepdims=True)]
+    for lev in range(1, n_levels + 1):
+        parent = labels[lev - 1, :]
+        n_parents = 2 ** (lev - 1)
+        # Widest axis of each parent cluster :
+        mins = np.full((n_parents, n_dims), np.inf)
+        maxs = np.full((n_parents, n_dims), -np.inf)
+        np.minimum.at(mins, parent, nodes)
+        np.maximum.at(maxs, parent, nodes)
+        axis = np.nan_to_num(maxs - mins).argmax(1)
+        # Rank of each node inside its parent cluster along the widest axis :
+        v = nodes[np.arange(n_nodes), axis[parent]]
+        order = np.lexsort((v, parent))
+        counts = np.bincount(parent, minlength=n_parents)
+        start = np.r_[0, np.cumsum(counts)[:-1]]
+        rank = np.empty((n_nodes,), dtype=int)
+        rank[order] = np.arange(n_nodes) - start[parent[order]]
+        # Split at the median :
+        labels[lev, :] = 2 * parent + (rank >= counts[parent] // 2)
+        # Centroids :
+        n_clusters = 2 ** lev
+        count = np.bincount(labels[lev, :], minlength=n_clusters)
+        cent = np.c_[tuple(np.bincount(labels[lev, :], nodes[:, k], n_clusters)
+                           for k in range(n_dims))]
+        centroids.append(cent / np.maximum(count, 1).reshape(-1, 1))
+    return labels, centroids
+
+
+def _bspline_basis(n_ctrl, n_points, degree=3):
+    """Basis matrix of a clamped uniform B-spline.
+
+    Returns an array of shape (n_points, n_ctrl) such that the curve is
+    obtained with np.dot(basis, control_points).
+    """
+    degree = min(degree, n_ctrl - 1)
+    n_inner = n_ctrl - degree + 1
+    knots = np.r_[[0.] * degree, np.linspace(0., 1., n_inner), [1.] * degree]
+    t = np.linspace(0., 1., n_points)
+    # Degree 0 (the last point belong to the last non-empty interval) :
+    basis = np.zeros((n_points, len(knots) - 1))
+    for k in range(len(knots) - 1):
+        basis[:, k] = (knots[k] <= t) & (t < knots[k + 1])
+    basis[-1, n_ctrl - 1] = 1.
+    # Cox - de Boor recursion :
+    for d in range(1, degree + 1):
+        new = np.zeros((n_points, len(knots) - d - 1))
+        for k in range(len(knots) - d - 1):
+            den_l = knots[k + d] - knots[k]
+            den_r = knots[k + d + 1] - knots[k + 1]
+            if den_l > 0.:
+                new[:, k] += (t - knots[k]) / den_l * basis[:, k]
+            if den_r > 0.:
+                new[:, k] += (knots[k + d + 1] - t) / den_r * basis[:, k + 1]
+        basis = new
+    return basis
+
+
+def hierarchical_bundling(nodes, rows, cols, hierarchy=None, n_levels=4,
+                          beta=.85, n_points=20):
+    """Hierarchical edge bundling.
+
+    Each edge is drawn as a B-spline which control points are the centroids
+    of the clusters found along the path of the hierarchy linking both nodes
+    (Holten, 2006). Edges are processed by groups sharing the same depth of
+    their lowest common ancestor, hence the computation is vectorized.
+
+    Parameters
+    ----------
+    nodes : array_like
+        Nodes coordinates of shape (n_nodes, 3).
+    rows, cols : array_like
+        Index of the first and second node of each edge (n_edges,).
+    hierarchy : tuple | None
+        The (labels, centroids) hierarchy returned by `nodes_hierarchy`. Use
+        it to avoid re-computing the hierarchy for a fixed node layout.
+    n_levels : int | 4
+        Number of levels of the hierarchy (ignored if hierarchy is given).
+    beta : float | .85
+        Bundling strength between 0 (straight lines) and 1.
+    n_points : int | 20
+        Number of points per edge.
+
+    Returns
+    -------
+    lines : array_like
+        Polylines of shape (n_edges, n_points, 3).
+    """
+    assert 0. <= beta <= 1.
+    nodes = np.asarray(nodes, dtype=float)
+    rows, cols = np.asarray(rows, dtype=int), np.asarray(cols, dtype=int)
+    if hierarchy is None:
+        hierarchy = nodes_hierarchy(nodes, n_levels)
+    labels, centroids = hierarchy
+    n_levels = labels.shape[0] - 1
+    lines = np.zeros((len(rows), n_points, nodes.shape[1]), dtype=np.float32)
+    # Depth of the lowest common ancestor :
+    lca = (labels[:, rows] == labels[:, cols]).sum(0) - 1
+    for a in np.unique(lca):
+        e_idx = np.where(lca == a)[0]
+        r, c = rows[e_idx], cols[e_idx]
+        # Path : node, ancestors up to the LCA, ancestors down to node
+        up = [centroids[k][labels[k, r]] for k in range(n_levels, a, -1)]
+        down = [centroids[k][labels[k, c]] for k in range(a + 1, n_levels + 1)]
+        top = [centroids[a][labels[a, r]]]
+        ctrl = np.stack([nodes[r]] + up + top + down + [nodes[c]], axis=1)
+        # Straightening :
+        n_ctrl = ctrl.shape[1]
+        t = np.linspace(0., 1., n_ctrl).reshape(1, -1, 1)
+        straight = ctrl[:, [0], :] + t * (ctrl[:, [-1], :] - ctrl[:, [0], :])
+        ctrl = beta * ctrl + (1. - beta) * straight
+        # Smooth curves :
+        basis = _bspline_basis(n_ctrl, n_points)
+        lines[e_idx, ...] = np.einsum('pc,ecd->epd', basis, ctrl)
+    return lines
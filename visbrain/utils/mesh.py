@@ -11,7 +11,8 @@ from .sigproc import smooth_3d
 
 
 __all__ = ('vispy_array', 'convert_meshdata', 'volume_to_mesh',
-           'smoothing_matrix', 'mesh_edges', 'laplacian_smoothing')
+           'smoothing_matrix', 'mesh_edges', 'laplacian_smoothing',
+           'mesh_isolines', 'mesh_decimation')
 
 
 logger = logging.getLogger('visbrain')
@@ -85,9 +86,9 @@ def convert_meshdata(vertices=None, faces=None, normals=None, meshdata=None,
             logger.debug('Indexed faces normals converted // extracted')
     assert vertices.ndim == 2
 
-    # Invert normals :
-    norm_coef = -1. if invert_normals else 1.
-    normals *= norm_coef
+    # Invert normals (not inplace for read-only arrays) :
+    if invert_normals:
+        normals = -normals
 
     # Apply transformation :
     if transform is not None:
@@ -266,3 +267,160 @@ def laplacian_smoothing(vertices, faces, n_neighbors=-1):
         # Take the mean of selected vertices :
         new_vertices[k, :] = vertices[to_smooth, :].mean(0).reshape(1, -1)
     return new_vertices
+
+
+def mesh_isolines(vertices, faces, data, levels):
+    """Extract isolines of data defined on the vertices of a mesh.
+
+    Isolines are computed on all faces at once : each face crossed by a level
+    contributes with one segment joining the two points (linearly
+    interpolated) where the level crosses the edges of the face.
+
+    Parameters
+    ----------
+    vertices : array_like
+        Array of vertices of shape (n_vertices, 3).
+    faces : array_like
+        Array of faces of shape (n_faces, 3).
+    data : array_like
+        Vector of data of shape (n_vertices,). Faces with at least one NaN
+        value are ignored.
+    levels : array_like
+        Vector of increasing levels.
+
+    Returns
+    -------
+    segments : array_like
+        Array of shape (2 * n_segments, 3) where each pair of rows is a
+        segment (to be drawn with connect='segments').
+    seg_levels : array_like
+        Index of the level of each segment of shape (n_segments,).
+    """
+    levels = np.asarray(levels, dtype=float).ravel()
+    f_data = np.asarray(data, dtype=float)[faces]
+    is_finite = np.isfinite(f_data).all(1)
+    faces, f_data = faces[is_finite, :], f_data[is_finite, :]
+    # Levels crossing each face (f_min < level <= f_max) :
+    l_start = np.searchsorted(levels, f_data.min(1), side='right')
+    n_cross = np.searchsorted(levels, f_data.max(1), side='right') - l_start
+    f_idx = np.repeat(np.arange(len(faces)), n_cross)
+    offset = np.arange(len(f_idx)) - np.repeat(np.cumsum(n_cross) - n_cross,
+                                               n_cross)
+    seg_levels = l_start[f_idx] + offset
+    lev = levels[seg_levels].reshape(-1, 1)
+    f_data, faces = f_data[f_idx, :], faces[f_idx, :]
+    # The lonely vertex is on one side of the level, the two others on the
+    # other side :
+    above = f_data >= lev
+    is_one = (above.sum(1) == 1).reshape(-1, 1)
+    lonely = np.argmax(above == is_one, axis=1)
+    rows = np.arange(len(f_idx))
+    segments = np.zeros((len(f_idx), 2, 3), dtype=np.float32)
+    v_l, d_l = vertices[faces[rows, lonely], :], f_data[rows, lonely]
+    for k in [1, 2]:
+        other = (lonely + k) % 3
+        v_o, d_o = vertices[faces[rows, other], :], f_data[rows, other]
+        t = ((lev.ravel() - d_l) / (d_o - d_l)).reshape(-1, 1)
+        segments[:, k - 1, :] = v_l + t * (v_o - v_l)
+    return segments.reshape(-1, 3), seg_levels
+
+
+def _cluster_vertices(vertices, size, lr_index=None):
+    """Cluster vertices using a regular grid of cubic cells."""
+    cell = np.floor((vertices - vertices.min(0)) / size).astype(np.int64)
+    n_cells = cell.max(0) + 1
+    key = (cell[:, 0] * n_cells[1] + cell[:, 1]) * n_cells[2] + cell[:, 2]
+    if lr_index is not None:  # vertices of each hemisphere are not merged
+        key = 2 * key + lr_index
+    return np.unique(key, return_inverse=True)[1].ravel()
+
+
+def mesh_decimation(vertices, faces, n_vertices=None, voxel_size=None,
+                    lr_index=None):
+    """Decimate a mesh using vertex clustering.
+
+    Vertices are grouped using a regular grid of cubic cells and each group
+    is replaced by its mean position. Faces are then re-indexed and
+    degenerated or duplicated faces are removed. Everything is vectorized,
+    hence large surfaces (~300k vertices) are decimated in a few hundreds of
+    milliseconds.
+
+    Parameters
+    ----------
+    vertices : array_like
+        Array of vertices of shape (n_vertices, 3).
+    faces : array_like
+        Array of faces of shape (n_faces, 3).
+    n_vertices : int | None
+        Approximate number of vertices of the decimated mesh. The size of
+        cells is found using a bisection.
+    voxel_size : float | None
+        Size of cells. Use either n_vertices or voxel_size.
+    lr_index : array_like | None
+        Left / Right boolean index of shape (n_vertices,). If provided,
+        vertices of different hemispheres are never merged.
+
+    Returns
+    -------
+    new_vertices : array_like
+        Array of decimated vertices of shape (n_new_vertices, 3).
+    new_faces : array_like
+        Array of decimated faces of shape (n_new_faces, 3).
+    index : array_like
+        Index of the decimated vertex of each vertex of the full mesh, of
+        shape (n_vertices,). Data defined on the full mesh can be mapped to
+        the decimated mesh using this index (e.g np.bincount).
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces)
+    assert vertices.ndim == 2 and vertices.shape[1] == 3
+    assert faces.ndim == 2 and faces.shape[1] == 3
+    assert (n_vertices is None) != (voxel_size is None)
+    if lr_index is not None:
+        lr_index = np.asarray(lr_index, dtype=bool).astype(np.int64)
+    # _____________________ CLUSTERING _____________________
+    if voxel_size is not None:
+        index = _cluster_vertices(vertices, float(voxel_size), lr_index)
+    else:
+        # Initial guess : a surface of area A is covered by ~A/s^2 cells :
+        v_f = vertices[faces, :]
+        area = .5 * np.linalg.norm(np.cross(v_f[:, 1, :] - v_f[:, 0, :],
+                                            v_f[:, 2, :] - v_f[:, 0, :]),
+                                   axis=1).sum()
+        s = np.sqrt(area / max(int(n_vertices), 1))
+        low, high = np.log(s / 8.), np.log(s * 8.)
+        best = None
+        for _ in range(16):
+            size = .5 * (low + high)
+            index = _cluster_vertices(vertices, np.exp(size), lr_index)
+            n = index.max() + 1
+            err = abs(n - n_vertices)
+            if (best is None) or (err < best[0]):
+                best = (err, index)
+            if n == n_vertices:
+                break
+            elif n > n_vertices:
+                low = size
+            else:
+                high = size
+        index = best[1]
+    n_new = index.max() + 1
+    # _____________________ VERTICES _____________________
+    counts = np.bincount(index, minlength=n_new).astype(np.float64)
+    new_vertices = np.zeros((n_new, 3), dtype=np.float32)
+    for k in range(3):
+        new_vertices[:, k] = np.bincount(index, vertices[:, k],
+                                         minlength=n_new) / counts
+    # _____________________ FACES _____________________
+    new_faces = index[faces]
+    is_valid = (new_faces[:, 0] != new_faces[:, 1]) & (
+        new_faces[:, 1] != new_faces[:, 2]) & (
+        new_faces[:, 0] != new_faces[:, 2])
+    new_faces = new_faces[is_valid, :]
+    # Faces sharing the same vertices (the orientation is kept) :
+    _, first = np.unique(np.sort(new_faces, axis=1), axis=0,
+                         return_index=True)
+    new_faces = new_faces[np.sort(first), :].astype(np.uint32)
+    logger.info("Mesh decimated from %i to %i vertices" % (
+        len(vertices), n_new))
+    return new_vertices, new_faces, index
@@ -5,7 +5,7 @@ import numpy as np
 from vispy.util import profiler
 
 
-__all__ = ('Profiler', 'get_dsf', 'set_if_not_none')
+__all__ = ('Profiler', 'get_dsf', 'set_if_not_none', 'ring_slices')
 
 
 class Profiler(object):
@@ -90,3 +90,27 @@ def set_if_not_none(to_set, value, cond=True):
         The value if not None else to_set
     """
     return value if (value is not None) and cond else to_set
+
+
+def ring_slices(start, n_items, size):
+    """Get the contiguous slices written inside a ring buffer.
+
+    Parameters
+    ----------
+    start : int
+        Index of the first item written.
+    n_items : int
+        Number of items written (at most size).
+    size : int
+        Size of the ring buffer.
+
+    Returns
+    -------
+    slices : list
+        List of one or two (start, stop) tuples.
+    """
+    n_items = min(n_items, size)
+    stop = start + n_items
+    if stop <= size:
+        return [(start, stop)]
+    return [(start, size), (0, stop - size)]
@@ -4,13 +4,15 @@ import logging
 
 import numpy as np
 from itertools import product
+from scipy import sparse
 from scipy.stats import zscore
 
 from .sigproc import smoothing
 from ..io.path import get_data_path, get_files_in_data
 
 __all__ = ('find_non_eeg', 'rereferencing', 'bipolarization', 'commonaverage',
-           'tal2mni', 'mni2tal', 'load_predefined_roi', 'generate_eeg')
+           'Montage', 'MontageData', 'chunk_stats', 'tal2mni', 'mni2tal',
+           'load_predefined_roi', 'generate_eeg')
 
 logger = logging.getLogger('visbrain')
 
@@ -46,6 +48,97 @@ def find_non_eeg(channels, pattern=['eog', 'emg', 'ecg', 'abd']):
 ###############################################################################
 ###############################################################################
 
+def _ignore_mask(nchan, to_ignore):
+    """Get a boolean mask of channels to ignore (from a mask or indices)."""
+    ignore = np.zeros((nchan,), dtype=bool)
+    if isinstance(to_ignore, (tuple, list, np.ndarray)):
+        ignore[np.asarray(to_ignore)] = True
+    return ignore
+
+
+def _linear_combination(nchan, rows, cols, values):
+    """Get the sparse matrix identity + sum_k values_k * e_{rows_k, cols_k}.
+
+    Returns a scipy.sparse.csr_matrix of shape (nchan, nchan).
+    """
+    diag = np.arange(nchan)
+    rows, cols = np.r_[diag, rows].astype(int), np.r_[diag, cols].astype(int)
+    values = np.r_[np.ones((nchan,)), values]
+    weights = sparse.csr_matrix((values, (rows, cols)), shape=(nchan, nchan))
+    weights.eliminate_zeros()
+    return weights
+
+
+def _rereferencing_weights(chans, reference, to_ignore=None):
+    """Get the montage matrix of a single channel re-referencing.
+
+    See rereferencing for the description of inputs.
+    """
+    nchan = len(chans)
+    name = chans[reference]
+    consider = ~_ignore_mask(nchan, to_ignore)
+    # The reference is removed from every channels that are not ignored
+    # (including the reference itself) :
+    rows = np.where(consider)[0]
+    consider[reference] = False
+    weights = _linear_combination(nchan, rows, np.full_like(rows, reference),
+                                  -np.ones((len(rows),)))
+    # Build channel names :
+    chan = [k + '-' + name if consider[num]
+            else k for num, k in enumerate(chans)]
+    return weights, chan, consider
+
+
+def _bipolarization_weights(chans, to_ignore=None, sep='.'):
+    """Get the montage matrix of a bipolarization.
+
+    See bipolarization for the description of inputs.
+    """
+    nchan = len(chans)
+    ignore = _ignore_mask(nchan, to_ignore)
+    # Remove spaces and separation :
+    names = [k.strip().replace(' ', '').split(sep)[0] for k in chans]
+    # Index of each name (the first one if duplicated) :
+    index = {k: num for num, k in reversed(list(enumerate(names)))}
+
+    # Find the previous contact of each channel (e.g 'm2' -> 'm1') :
+    chan, ref = list(names), np.full((nchan,), -1, dtype=int)
+    for num in reversed(range(nchan)):
+        number = findall(r'\d+', chans[num])
+        if not number or ignore[num]:
+            continue
+        chan_to_find = chans[num].split(number[0])[0] + str(
+            int(number[0]) - 1)
+        ind = index.get(chan_to_find, -1)
+        # Contacts already bipolarized have been renamed :
+        if (ind < 0) or ((ind > num) and (ref[ind] >= 0)):
+            continue
+        ref[num] = ind
+        chan[num] = names[num] + '-' + chan_to_find
+    consider = ref >= 0
+    rows = np.where(consider)[0]
+    weights = _linear_combination(nchan, rows, ref[rows],
+                                  -np.ones((len(rows),)))
+    return weights, chan, consider
+
+
+def _commonaverage_weights(chans, to_ignore=None):
+    """Get the montage matrix of a common average re-referencing.
+
+    See commonaverage for the description of inputs.
+    """
+    nchan = len(chans)
+    consider = ~_ignore_mask(nchan, to_ignore)
+    idx = np.where(consider)[0]
+    n_c = len(idx)
+    weights = _linear_combination(nchan, np.repeat(idx, n_c),
+                                  np.tile(idx, n_c),
+                                  np.full((n_c ** 2,), -1. / max(n_c, 1)))
+    # Update channel name :
+    chan = [k + '-m' if consider[num] else k for num, k in enumerate(chans)]
+    return weights, chan, consider
+
+
 def rereferencing(data, chans, reference, to_ignore=None):
     """Re-reference data.
 
@@ -63,35 +156,15 @@ def rereferencing(data, chans, reference, to_ignore=None):
     Returns
     -------
     datar : array_like
-        The re-referenced data.
+        The re-referenced data (data is not modified).
     channelsr : list
         List of re-referenced channel names.
     consider : list
         List of boolean values of channels that have to be considered
         during the ploting processus.
     """
-    # Get shapes :
-    nchan, npts = data.shape
-    # Get data to use as the reference :
-    ref = data[[reference], :]
-    name = chans[reference]
-    # Build ignore vector :
-    consider = np.ones((nchan,), dtype=bool)
-    consider[reference] = False
-    # Find if some channels have to be ignored :
-    if to_ignore is None:
-        sl = slice(nchan)
-    elif isinstance(to_ignore, (tuple, list, np.ndarray)):
-        to_ignore = np.asarray(to_ignore)
-        sl = np.arange(nchan)[~to_ignore]
-        consider[to_ignore] = False
-    # Re-reference data :
-    data[sl, :] -= ref
-    # Build channel names :
-    chan = [k + '-' + name if consider[num]
-            else k for num, k in enumerate(chans)]
-
-    return data, chan, consider
+    montage = Montage(chans).rereferencing(reference, to_ignore)
+    return montage.apply(data), montage.channels, montage.consider
 
 
 def bipolarization(data, chans, to_ignore=None, sep='.'):
@@ -113,59 +186,15 @@ def bipolarization(data, chans, to_ignore=None, sep='.'):
     Returns
     -------
     datar : array_like
-        The re-referenced data.
+        The re-referenced data (data is not modified).
     channelsr : list
         List of re-referenced channel names.
     consider : list
         List of boolean values of channels that have to be considered
         during the ploting processus.
     """
-    # Variables :
-    nchan, npts = data.shape
-    consider = np.ones((nchan,), dtype=bool)
-
-    # Preprocess channel names by separating channel names / number:
-    chnames, chnums = [], []
-    for num, k in enumerate(chans):
-        # Remove spaces and separation :
-        chans[num] = k.strip().replace(' ', '').split(sep)[0]
-        # Get only the name / number :
-        if findall(r'\d+', k):
-            number = findall(r'\d+', k)[0]
-            chnums.append(number)
-            chnames.append(k.split(number)[0])
-        else:
-            chnums.append('')
-            chnames.append(k)
-
-    # Find if some channels have to be ignored :
-    if to_ignore is None:
-        sl = range(nchan)
-    elif isinstance(to_ignore, (tuple, list, np.ndarray)):
-        to_ignore = np.asarray(to_ignore)
-        sl = np.arange(nchan)[~to_ignore]
-        consider[to_ignore] = False
-
-    # Bipolarize :
-    for num in reversed(range(nchan)):
-        # If there's a number :
-        if chnums[num] and (num in sl):
-            # Get the name of the channel to find :
-            chan_to_find = chnames[num] + str(int(chnums[num]) - 1)
-            # Search if exist in channel list :
-            if chan_to_find in chans:
-                # Get the index :
-                ind = chans.index(chan_to_find)
-                # Substract to data :
-                data[num, :] -= data[ind, :]
-                # Update channel name :
-                chans[num] = chans[num] + '-' + chan_to_find
-            else:
-                consider[num] = False
-        else:
-            consider[num] = False
-
-    return data, chans, consider
+    montage = Montage(chans).bipolarization(to_ignore, sep)
+    return montage.apply(data), montage.channels, montage.consider
 
 
 def commonaverage(data, chans, to_ignore=None):
@@ -183,27 +212,326 @@ def commonaverage(data, chans, to_ignore=None):
     Returns
     -------
     datar : array_like
-        The re-referenced data.
+        The re-referenced data (data is not modified).
     channelsr : list
         List of re-referenced channel names.
     consider : list
         List of boolean values of channels that have to be considered
         during the ploting processus.
     """
-    # Variables :
-    nchan, npts = data.shape
-    consider = np.ones((nchan,), dtype=bool)
-    # Find if some channels have to be ignored :
-    if to_ignore is not None:
-        consider[to_ignore] = False
-    # Get the mean across  EEG channels :
-    eegmean = data[consider].mean(0, keepdims=True)
-    # Remove the mean on EEG channels :
-    data[consider, :] -= eegmean
-    # Update channel name :
-    for k in range(len(chans)):
-        chans[k] = chans[k] + '-m' if consider[k] else chans[k]
-    return data, chans, consider
+    montage = Montage(chans).commonaverage(to_ignore)
+    return montage.apply(data), montage.channels, montage.consider
+
+
+class Montage(object):
+    """Montage expressed as a sparse linear combination of channels.
+
+    The montage is a sparse matrix of shape (n_out, n_in) and is only applied
+    to the portions of data that are requested (e.g. the visible window or
+    a single channel for detections). Hence, the original data are never
+    modified and montages can be switched or stacked without copying the
+    whole recording.
+
+    Parameters
+    ----------
+    channels : list
+        List of channel names.
+    weights : array_like | None
+        Matrix of shape (n_channels, n_in). If None, the identity is used.
+    consider : array_like | None
+        Boolean values of channels that have to be considered during the
+        ploting processus.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from visbrain.utils import Montage
+    >>> data = np.random.rand(3, 1000)
+    >>> montage = Montage(['Cz', 'Pz', 'Fz']).commonaverage()
+    >>> # Get the re-referenced data between samples 100 and 200 :
+    >>> data_r = montage.apply(data, sl=slice(100, 200))
+    """
+
+    def __init__(self, channels, weights=None, consider=None):
+        """Init."""
+        self._channels = list(channels)
+        nchan = len(self._channels)
+        if weights is None:
+            weights = sparse.identity(nchan, format='csr')
+        self._weights = sparse.csr_matrix(weights)
+        if self._weights.shape[0] != nchan:
+            raise ValueError("weights should have %i rows" % nchan)
+        if consider is None:
+            consider = np.ones((nchan,), dtype=bool)
+        self._consider = np.asarray(consider, dtype=bool)
+
+    def __len__(self):
+        """Get the number of channels."""
+        return len(self._channels)
+
+    def _stack(self, weights, channels, consider):
+        """Stack a montage on top of this one."""
+        return Montage(channels, weights.dot(self._weights),
+                       consider & self._consider)
+
+    def rereferencing(self, reference, to_ignore=None):
+        """Re-reference channels (see rereferencing).
+
+        Returns
+        -------
+        montage : Montage
+            A new montage (the current one is not modified).
+        """
+        return self._stack(*_rereferencing_weights(self._channels, reference,
+                                                   to_ignore))
+
+    def bipolarization(self, to_ignore=None, sep='.'):
+        """Bipolarize channels (see bipolarization).
+
+        Returns
+        -------
+        montage : Montage
+            A new montage (the current one is not modified).
+        """
+        return self._stack(*_bipolarization_weights(self._channels, to_ignore,
+                                                    sep))
+
+    def commonaverage(self, to_ignore=None):
+        """Re-reference channels using common average (see commonaverage).
+
+        Returns
+        -------
+        montage : Montage
+            A new montage (the current one is not modified).
+        """
+        return self._stack(*_commonaverage_weights(self._channels, to_ignore))
+
+    def apply(self, data, rows=slice(None), sl=slice(None)):
+        """Apply the montage to a portion of data.
+
+        Only input channels that are needed to compute the selected output
+        channels are read.
+
+        Parameters
+        ----------
+        data : array_like
+            Data of shape (n_in, n_pts). Can also be a memory-mapped array.
+        rows : int | slice | array_like
+            Output channels to compute (integer, slice, indices or boolean
+            mask).
+        sl : slice | array_like
+            Time selection (slice or indices).
+
+        Returns
+        -------
+        data_m : array_like
+            Data of shape (n_rows, n_sl). If rows is an integer, data_m is a
+            vector.
+        """
+        idx = np.arange(len(self))[rows]
+        weights = self._weights[np.atleast_1d(idx), :]
+        inputs = np.unique(weights.indices)
+        if isinstance(sl, slice):
+            x = data[inputs, sl]
+        else:
+            x = data[np.ix_(inputs, np.asarray(sl).ravel())]
+        dtype = x.dtype if np.issubdtype(x.dtype, np.floating) else float
+        data_m = np.asarray(weights[:, inputs].dot(x), dtype=dtype)
+        return data_m[0, :] if np.isscalar(idx) or not idx.ndim else data_m
+
+    def view(self, data):
+        """Get a lazy view of data with the montage applied.
+
+        Parameters
+        ----------
+        data : array_like
+            Data of shape (n_in, n_pts).
+
+        Returns
+        -------
+        view : MontageData
+            Lazy view that can be indexed like a NumPy array.
+        """
+        return MontageData(data, self)
+
+    # ----------- CHANNELS -----------
+    @property
+    def channels(self):
+        """Get the channels value."""
+        return self._channels
+
+    # ----------- WEIGHTS -----------
+    @property
+    def weights(self):
+        """Get the weights value."""
+        return self._weights
+
+    # ----------- CONSIDER -----------
+    @property
+    def consider(self):
+        """Get the consider value."""
+        return self._consider
+
+    # ----------- IS_IDENTITY -----------
+    @property
+    def is_identity(self):
+        """Get the is_identity value."""
+        w = self._weights
+        return (w.shape[0] == w.shape[1] == w.nnz) and (abs(
+            w - sparse.identity(w.shape[0])).sum() == 0.)
+
+
+def chunk_stats(data, chunk=100000):
+    """Get the statistics of each channel in a single pass over the data.
+
+    Data are loaded by chunks of time points and the (min, max, mean, std)
+    are updated for each chunk (the mean and the variance are merged using
+    the pairwise algorithm of Chan et al.). Hence, the data are read only
+    once and the memory used is bounded by the size of a chunk.
+
+    Parameters
+    ----------
+    data : array_like
+        Data of shape (n_channels, n_points). Can be any object that can be
+        indexed using data[:, start:stop] (e.g. memmap, data sources or
+        MontageData).
+    chunk : int | 100000
+        Number of time points that are loaded at once.
+
+    Returns
+    -------
+    stats : dict
+        Dictionary with the 'min', 'max', 'mean', 'std' and 'dist' (i.e.
+        max - min) of each channel. Statistics are float32 vectors of shape
+        (n_channels,), unless data are float64.
+    """
+    n_chan, n_pts = data.shape
+    d_min, d_max = np.full((n_chan,), np.inf), np.full((n_chan,), -np.inf)
+    mean, m2, n = np.zeros((n_chan,)), np.zeros((n_chan,)), 0
+    dtype = np.float32
+    for start in range(0, n_pts, chunk):
+        x = np.asarray(data[:, start:start + chunk])
+        dtype = np.result_type(x.dtype, np.float32)
+        x = x.astype(float)
+        n_x = x.shape[1]
+        mean_x = x.mean(1)
+        delta = mean_x - mean
+        m2 += ((x - mean_x[:, np.newaxis]) ** 2).sum(1)
+        m2 += delta ** 2 * n * n_x / (n + n_x)
+        mean += delta * n_x / (n + n_x)
+        n += n_x
+        np.minimum(d_min, x.min(1), out=d_min)
+        np.maximum(d_max, x.max(1), out=d_max)
+    std = np.sqrt(m2 / n) if n else np.full((n_chan,), np.nan)
+    stats = {'min': d_min, 'max': d_max, 'mean': mean, 'std': std,
+             'dist': d_max - d_min}
+    return {k: i.astype(dtype) for k, i in stats.items()}
+
+
+class MontageData(object):
+    """Lazy view of data with a montage applied.
+
+    Indexing the view (e.g. view[:, sl] or view[k, :]) only computes the
+    selected portion of the montage data.
+
+    Parameters
+    ----------
+    data : array_like
+        Original data of shape (n_in, n_pts).
+    montage : Montage
+        The montage to apply.
+    """
+
+    def __init__(self, data, montage):
+        """Init."""
+        if data.shape[0] != montage.weights.shape[1]:
+            raise ValueError("data should have %i channels" % (
+                montage.weights.shape[1]))
+        self._raw = data
+        self._montage = montage
+        self._identity = montage.is_identity
+
+    def __len__(self):
+        """Get the number of channels."""
+        return len(self._montage)
+
+    def __getitem__(self, key):
+        """Get a portion of the montage data."""
+        rows, sl = key if isinstance(key, tuple) else (key, slice(None))
+        sl = slice(None) if sl is Ellipsis else sl
+        if self._identity:
+            if isinstance(sl, slice) or np.isscalar(rows):
+                return self._raw[rows, sl]
+            return self._raw[np.ix_(np.arange(len(self))[rows], sl)]
+        return self._montage.apply(self._raw, rows, sl)
+
+    def stats(self, chunk=100000):
+        """Get the statistics of each channel of the montage data.
+
+        The montage is applied to all channels at once, one chunk of time
+        points at a time, so that the data are read only once (see
+        :func:`chunk_stats`).
+
+        Parameters
+        ----------
+        chunk : int | 100000
+            Number of time points that are loaded at once.
+
+        Returns
+        -------
+        stats : dict
+            Dictionary with the 'min', 'max', 'mean', 'std' and 'dist' of each
+            channel.
+        """
+        if self._identity and hasattr(self._raw, 'stats'):
+            return self._raw.stats()
+        return chunk_stats(self, chunk)
+
+    def _reduce(self, key, axis):
+        """Get a statistic along the time axis."""
+        if axis not in [1, -1]:
+            raise ValueError("Only the time axis (1) is supported.")
+        return self.stats()[key]
+
+    def min(self, axis=1):
+        """Minimum of each channel."""
+        return self._reduce('min', axis)
+
+    def max(self, axis=1):
+        """Maximum of each channel."""
+        return self._reduce('max', axis)
+
+    def mean(self, axis=1):
+        """Mean of each channel."""
+        return self._reduce('mean', axis)
+
+    def std(self, axis=1):
+        """Standard deviation of each channel."""
+        return self._reduce('std', axis)
+
+    # ----------- SHAPE -----------
+    @property
+    def shape(self):
+        """Get the shape value."""
+        return (len(self), self._raw.shape[1])
+
+    # ----------- NDIM -----------
+    @property
+    def ndim(self):
+        """Get the ndim value."""
+        return 2
+
+    # ----------- MONTAGE -----------
+    @property
+    def montage(self):
+        """Get the montage value."""
+        return self._montage
+
+    # ----------- RAW -----------
+    @property
+    def raw(self):
+        """Get the raw value."""
+        return self._raw
 
 
 ###############################################################################
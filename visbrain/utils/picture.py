@@ -3,11 +3,37 @@ import numpy as np
 from scipy.misc import imresize
 
 
-__all__ = ('piccrop', 'picresize')
+__all__ = ('picbbox', 'piccrop', 'picresize')
 
 
-def piccrop(im, margin=10):
-    """Automatic picture cropping.
+def _pack_rgb(im):
+    """Pack the RGB channels of uint8 pixels into uint32 values.
+
+    Comparing packed pixels is much faster than comparing each channel.
+    Images that can't be packed are returned with a (N, M, 3) or (N, M)
+    shape.
+    """
+    if im.ndim == 2:
+        return im
+    if (im.dtype != np.uint8) or (im.shape[2] not in [3, 4]):
+        return im[..., 0:3]
+    if (im.shape[2] == 4) and im.flags.c_contiguous:
+        # Alpha mask that doesn't depend on the byte order :
+        mask = np.frombuffer(bytes(bytearray([255, 255, 255, 0])),
+                             dtype=np.uint32)[0]
+        return im.view(np.uint32)[..., 0] & mask
+    rgb = im[..., 0].astype(np.uint32)
+    rgb |= im[..., 1].astype(np.uint32) << 8
+    rgb |= im[..., 2].astype(np.uint32) << 16
+    return rgb
+
+
+def picbbox(im, margin=10, chunk=4194304):
+    """Get the bounding box of the non-background part of a picture.
+
+    The background is made of the rows and columns where each pixel is equal
+    to its neighbours. Rows and columns are inspected using vectorized
+    reductions over blocks of rows.
 
     Parameters
     ----------
@@ -16,45 +42,67 @@ def piccrop(im, margin=10):
     margin : int | 10
         Number of pixels before and after to condider for cropping
         security.
+    chunk : int | 4194304
+        Number of pixels inspected at once (bounds the memory used).
 
     Returns
     -------
-    imas : array_like
-        The cropped figure.
+    box : tuple
+        Tuple of two slices (rows, columns) such that im[box] is the cropped
+        picture.
     """
     # ================= Size checking =================
     if im.ndim < 2:
         raise ValueError("im must have at least two dimensions.")
-    elif im.ndim == 3:
-        imas = im[..., 0:3].mean(axis=2)
-    else:
-        imas = im
-
-    # ================= Derivative =================
-    imdiff_x = np.diff(imas, axis=1)
-    imdiff_y = np.diff(imas, axis=0)
+    n_rows, n_cols = im.shape[0:2]
+
+    # ================= Non-constant rows / columns =================
+    diff_x = np.zeros((max(n_cols - 1, 0),), dtype=bool)
+    diff_y = np.zeros((max(n_rows - 1, 0),), dtype=bool)
+    step = max(1, chunk // max(n_cols, 1))
+    for start in range(0, n_rows, step):
+        blk = _pack_rgb(im[start:start + step + 1, ...])
+        d_x, d_y = blk[:, 1:, ...] != blk[:, :-1, ...], blk[1:] != blk[:-1]
+        if blk.ndim == 3:
+            d_x, d_y = d_x.any(2), d_y.any(2)
+        diff_x |= d_x.any(0)
+        diff_y[start:start + len(blk) - 1] = d_y.any(1)
 
     # ================= Cropping start / finish =================
-    # x-axis :
-    idx_x = np.where(imdiff_x != 0)[1]
-    if idx_x.size:
-        ncols = imas.shape[1]
-        x_min = max(0, idx_x.min() - margin + 1)
-        x_max = min(min(ncols, idx_x.max() + margin + 1), ncols)
-        sl_x = slice(x_min, x_max)
-    else:
-        sl_x = slice(None)
-    # y-axis :
-    idx_y = np.where(imdiff_y)[0]
-    if idx_y.size:
-        y_min = max(0, idx_y.min() - margin + 1)
-        nrows = imas.shape[0]
-        y_max = min(min(imas.shape[0], idx_y.max() + margin + 1), nrows)
-        sl_y = slice(y_min, y_max)
-    else:
-        sl_y = slice(None)
-
-    return im[sl_y, sl_x, ...]
+    box = []
+    for diff, n in [(diff_y, n_rows), (diff_x, n_cols)]:
+        idx = np.flatnonzero(diff)
+        if idx.size:
+            box.append(slice(max(0, idx[0] - margin + 1),
+                             min(n, idx[-1] + margin + 1)))
+        else:
+            box.append(slice(0, n))
+    return tuple(box)
+
+
+def piccrop(im, margin=10, box=None):
+    """Automatic picture cropping.
+
+    Parameters
+    ----------
+    im : array_like
+        The array of image data. Could be a (N, M) or (N, M, 3/4).
+    margin : int | 10
+        Number of pixels before and after to condider for cropping
+        security.
+    box : tuple | None
+        Bounding box to use, as returned by picbbox (e.g to crop several
+        pictures of the same scene). If None, the bounding box of the picture
+        is computed.
+
+    Returns
+    -------
+    imas : array_like
+        The cropped figure.
+    """
+    if box is None:
+        box = picbbox(im, margin=margin)
+    return im[box[0], box[1], ...]
 
 
 def picresize(im, axis=0, extend=False):
@@ -6,7 +6,8 @@ from scipy.signal import fftconvolve
 
 
 __all__ = ('normalize', 'derivative', 'tkeo', 'zerocrossing', 'power_of_ten',
-           'averaging', 'normalization', 'smoothing', 'smooth_3d')
+           'averaging', 'normalization', 'smoothing', 'smooth_3d',
+           'minmax_decimate')
 
 logger = logging.getLogger('visbrain')
 
@@ -352,3 +353,61 @@ def smooth_3d(vol, smooth_factor=3):
         return fftconvolve(vol, smooth, mode='same')
     else:
         return vol
+
+
+def minmax_decimate(data, n_pts, axis=-1, mem_budget=64e6):
+    """Decimate data by keeping the minimum and maximum of each bin.
+
+    Data are read by chunks of time points which allows to decimate
+    memory-mapped arrays (e.g np.memmap or np.load(..., mmap_mode='r')) with
+    a bounded memory. The extrema of each bin are interleaved so that a line
+    joining decimated points keeps the envelope of the signal.
+
+    Parameters
+    ----------
+    data : array_like
+        Array of data.
+    n_pts : int
+        Maximum number of time points of the decimated data.
+    axis : int | -1
+        Location of the time axis.
+    mem_budget : float | 64e6
+        Maximum memory (bytes) used to decimate a chunk of data.
+
+    Returns
+    -------
+    dec : array_like
+        The float32 decimated data. The time axis has a length of at most
+        n_pts (or the original length if shorter).
+    index : array_like
+        Index of the first time point of the bin of each decimated point.
+    """
+    assert isinstance(n_pts, int) and (n_pts >= 2)
+    axis = data.ndim - 1 if axis == -1 else axis
+    n = data.shape[axis]
+    if n <= n_pts:
+        return np.asarray(data, dtype=np.float32), np.arange(n)
+    bin_size = int(np.ceil(n / (n_pts // 2)))
+    n_bins = int(np.ceil(n / bin_size))
+    # Number of bins per chunk (data are copied once to be reshaped) :
+    n_sig = int(np.prod(data.shape)) // n
+    nb_chunk = int(mem_budget // (2 * data.itemsize * n_sig * bin_size))
+    nb_chunk = max(nb_chunk, 1)
+    sh = list(data.shape)
+    del sh[axis]
+    dec = np.zeros(sh + [2 * n_bins], dtype=np.float32)
+    sl = [slice(None)] * data.ndim
+    for b_start in range(0, n_bins, nb_chunk):
+        b_end = min(b_start + nb_chunk, n_bins)
+        sl[axis] = slice(b_start * bin_size, min(b_end * bin_size, n))
+        chunk = np.moveaxis(data[tuple(sl)], axis, -1)
+        # Pad the last bin with its last value :
+        n_pad = (b_end - b_start) * bin_size - chunk.shape[-1]
+        if n_pad:
+            chunk = np.concatenate((chunk, np.repeat(chunk[..., [-1]], n_pad,
+                                                     -1)), -1)
+        chunk = chunk.reshape(sh + [b_end - b_start, bin_size])
+        dec[..., 2 * b_start:2 * b_end:2] = chunk.min(-1)
+        dec[..., 2 * b_start + 1:2 * b_end:2] = chunk.max(-1)
+    index = np.repeat(np.arange(n_bins) * bin_size, 2)
+    return np.moveaxis(dec, -1, axis), index
@@ -9,16 +9,22 @@ Perform:
 - Slow wave detection
 - KCs detection
 - Peak detection
+- Features of detected events
 """
 import numpy as np
 from scipy.signal import hilbert, detrend, welch
+from scipy.fftpack import next_fast_len
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
 
 from ..filtering import filt, morlet, morlet_power
 from ..sigproc import derivative, tkeo, smoothing, normalization
-from .event import (_events_distance_fill, _index_to_events, _events_to_index)
+from .event import (_events_to_index, _index_to_events, _mask_to_events,
+                    _events_to_mask, _events_merge, _events_intersect,
+                    _events_extend, _events_duration, _events_duration_filter,
+                    _events_ptp, _events_mean)
 
 __all__ = ('kcdetect', 'spindlesdetect', 'remdetect', 'slowwavedetect',
-           'mtdetect', 'peakdetect')
+           'mtdetect', 'peakdetect', 'events_features')
 
 ###########################################################################
 # K-COMPLEX DETECTION
@@ -92,8 +98,8 @@ def kcdetect(data, sf, proba_thr, amp_thr, hypno, nrem_only, tmin, tmax,
     freqs = np.array([0.1, 4., 8., 12., 16., 30.])
     delta_npow = morlet_power(data, freqs, sf, norm=True)[0]
     delta_nfpow = smoothing(delta_npow, smoothing_s * sf)
-    idx_no_delta = np.where(delta_nfpow < delta_thr)[0]
-    idx_loc_delta = np.where(delta_npow > np.median(delta_npow))[0]
+    is_no_delta = delta_nfpow < delta_thr
+    is_loc_delta = delta_npow > np.median(delta_npow)
 
     # MAIN DETECTION
     # Bandpass filtering
@@ -105,47 +111,32 @@ def kcdetect(data, sf, proba_thr, amp_thr, hypno, nrem_only, tmin, tmax,
     soft_thr = 0.8 * hard_thr
 
     with np.errstate(divide='ignore', invalid='ignore'):
-        idx_hard = np.where(sig_tkeo > hard_thr)[0]
-        idx_soft = np.where(sig_tkeo > soft_thr)[0]
+        ev_hard = _mask_to_events(sig_tkeo > hard_thr)
+        ev_soft = _mask_to_events(sig_tkeo > soft_thr)
 
-    # Find threshold-crossing indices of soft threshold
-    idx_zc_soft = _events_to_index(idx_soft).flatten()
-
-    if idx_hard.size > 0:
-        # Initialize K-complexes index vector
-        idx_kc = np.array([], dtype=int)
+    if ev_hard.size > 0:
         # Fill gap between events separated by less than min_distance_ms
-        idx_hard = _events_distance_fill(idx_hard, min_distance_ms, sf)
-        # Get where K-complex start / end :
-        idx_start, idx_stop = _events_to_index(idx_hard).T
-
+        ev_hard = _events_merge(ev_hard, min_distance_ms, sf)
         # Find true beginning / end using soft threshold
-        for s in idx_start:
-            d = s - idx_zc_soft
-            soft_beg = d[d > 0].min()
-            soft_end = np.abs(d[d < 0]).min()
-            idx_kc = np.append(idx_kc, np.arange(s - soft_beg, s + soft_end))
+        ev_kc = _events_extend(ev_hard, ev_soft)
 
         # Check if spindles are present in range_spin_sec
         idx_spin = spindlesdetect(data, sf, spindles_thresh, hypno, False)[0]
-        idx_start, idx_stop = _events_to_index(idx_kc).T
-        spin_bool = np.array([], dtype=np.bool)
-
-        for idx, val in enumerate(idx_start):
-            step = 0.5 * range_spin_sec * sf
-            is_spin = np.in1d(np.arange(val - step, val + step, 1),
-                              idx_spin, assume_unique=True)
-            spin_bool = np.append(spin_bool, any(is_spin))
-
-        kc_spin = np.where(spin_bool)[0]
-        idx_kc_spin = _index_to_events(np.c_[idx_start, idx_stop][kc_spin])
+        ev_spin = _events_to_index(idx_spin)
+        step = int(0.5 * range_spin_sec * sf)
+        # Last spindle starting before the end of the window of each KC :
+        i_spin = np.searchsorted(ev_spin[:, 0], ev_kc[:, 0] + step - 1,
+                                 side='right') - 1
+        spin_bool = np.logical_and(i_spin >= 0, ev_spin[i_spin, 1] >= (
+            ev_kc[:, 0] - step)) if len(ev_spin) else np.zeros(
+            (len(ev_kc),), dtype=bool)
 
         # Compute probability
         proba = np.zeros(shape=data.shape)
-        proba[idx_kc] += 0.1
-        proba[idx_no_delta] += 0.1
-        proba[idx_loc_delta] += 0.1
-        proba[idx_kc_spin] += 0.1
+        proba[_events_to_mask(ev_kc, length)] += 0.1
+        proba[is_no_delta] += 0.1
+        proba[is_loc_delta] += 0.1
+        proba[_events_to_mask(ev_kc[spin_bool], length)] += 0.1
 
         if hyploaded:
             proba[hypno == -1] += -0.1
@@ -159,33 +150,23 @@ def kcdetect(data, sf, proba_thr, amp_thr, hypno, nrem_only, tmin, tmax,
         proba = proba / 0.5 if hyploaded else proba / 0.4
         proba = smoothing(proba, sf)
         # Keep only proba >= proba_thr (user defined threshold)
-        idx_kc = np.intersect1d(idx_kc, np.where(proba >= proba_thr)[0], True)
+        ev_kc = _events_intersect(ev_kc, proba >= proba_thr)
 
-        if idx_kc.size > 0:
+        if ev_kc.size > 0:
             # MORPHOLOGICAL CRITERIA
-            idx_start, idx_stop = _events_to_index(idx_kc).T
-            duration_ms = (idx_stop - idx_start) * (1000 / sf)
-
             # Remove events with bad duration
-            good_dur = np.where(np.logical_and(duration_ms > tmin,
-                                               duration_ms < tmax))[0]
-            idx_kc = _index_to_events(np.c_[idx_start, idx_stop][good_dur])
+            ev_kc = _events_duration_filter(ev_kc, sf, tmin, tmax)
 
             # Remove events with bad amplitude
-            idx_start, idx_stop = _events_to_index(idx_kc).T
-            amp = np.zeros(shape=idx_start.size)
-            for i, (start, stop) in enumerate(zip(idx_start, idx_stop)):
-                amp[i] = np.ptp(data[start:stop])
-            good_amp = np.where(np.logical_and(amp > kc_min_amp,
-                                               amp < kc_max_amp))[0]
-            idx_kc = _index_to_events(np.c_[idx_start, idx_stop][good_amp])
+            amp = _events_ptp(data, ev_kc)
+            good_amp = np.logical_and(amp > kc_min_amp, amp < kc_max_amp)
+            ev_kc = ev_kc[good_amp, :]
 
             # Compute number, duration, density
-            idx_start, idx_stop = _events_to_index(idx_kc).T
-            number = idx_start.size
-            duration_ms = (idx_stop - idx_start) * (1000 / sf)
+            number = len(ev_kc)
+            duration_ms = _events_duration(ev_kc, sf)
             density = number / (length / sf / 60.)
-            return idx_kc, number, density, duration_ms
+            return _index_to_events(ev_kc), number, density, duration_ms
 
         else:
             return np.array([], dtype=int), 0., 0., np.array([], dtype=int)
@@ -260,8 +241,8 @@ def spindlesdetect(data, sf, threshold, hypno, nrem_only, fmin=12., fmax=14.,
     freqs = np.array([0.5, 4., 8., fmin, fmax])
     sigma_npow = morlet_power(data, freqs, sf, norm=True)[-1]
     sigma_nfpow = smoothing(sigma_npow, sf * (tmin / 1000))
-    # Vector of sigma power supra-threshold values
-    idx_sigma = np.where(sigma_nfpow > sigma_thr)[0]
+    # Sigma power supra-threshold values
+    is_sigma = sigma_nfpow > sigma_thr
 
     # Get complex decomposition of filtered data :
     if method == 'hilbert':
@@ -290,65 +271,42 @@ def spindlesdetect(data, sf, threshold, hypno, nrem_only, fmin=12., fmax=14.,
     soft_thr = 0.5 * hard_thr
 
     with np.errstate(divide='ignore', invalid='ignore'):
-        idx_hard = np.where(amplitude > hard_thr)[0]
-        idx_soft = np.where(amplitude > soft_thr)[0]
-
-    # Find threshold-crossing indices of soft threshold
-    idx_zc_soft = _events_to_index(idx_soft).flatten()
-
-    if idx_hard.size > 0:
-        # Initialize spindles vector
-        idx_spindles = np.array([], dtype=int)
+        is_hard = amplitude > hard_thr
+        ev_soft = _mask_to_events(amplitude > soft_thr)
 
+    if is_hard.any():
         # Keep only period with high relative sigma power
-        idx_hard = np.intersect1d(idx_hard, idx_sigma, True)
+        ev_hard = _mask_to_events(np.logical_and(is_hard, is_sigma))
 
         # Fill gap between events separated by less than min_distance_ms
-        idx_hard = _events_distance_fill(idx_hard, min_distance_ms, sf)
-
-        # Get where spindles start / end :
-        idx_start, idx_stop = _events_to_index(idx_hard).T
+        ev_hard = _events_merge(ev_hard, min_distance_ms, sf)
 
         # Find true beginning / end using soft threshold
-        for s in idx_start:
-            d = s - idx_zc_soft
-            # Find distance to nearest soft threshold crossing before start
-            soft_beg = d[d > 0].min()
-            # Find distance to nearest soft threshold crossing after end
-            soft_end = np.abs(d[d < 0]).min()
-            idx_spindles = np.append(idx_spindles, np.arange(
-                                     s - soft_beg, s + soft_end))
+        ev_spindles = _events_extend(ev_hard, ev_soft)
 
         # Fill gap between events separated by less than min_distance_ms
-        idx_spindles = _events_distance_fill(idx_spindles, min_distance_ms, sf)
-
-        # Get duration
-        idx_start, idx_stop = _events_to_index(idx_spindles).T
-        duration_ms = (idx_stop - idx_start) * (1000 / sf)
+        ev_spindles = _events_merge(ev_spindles, min_distance_ms, sf)
 
         # Remove events with bad duration
-        good_dur = np.where(np.logical_and(duration_ms > tmin,
-                                           duration_ms < tmax))[0]
-
-        idx_spindles = _index_to_events(np.c_[idx_start, idx_stop][good_dur])
+        ev_spindles = _events_duration_filter(ev_spindles, sf, tmin, tmax)
+        idx_spindles = _index_to_events(ev_spindles)
 
         if idx_spindles.size:
             # Compute number, duration, density
-            idx_start, idx_stop = _events_to_index(idx_spindles).T
+            idx_start, idx_stop = ev_spindles.T
             number = idx_start.size
-            duration_ms = (idx_stop - idx_start) * (1000 / sf)
+            duration_ms = _events_duration(ev_spindles, sf)
             density = number / (length / sf / 60.)
 
-            # Compute mean power of each spindles
-            pwrs = np.zeros(shape=number)
-            for i, (start, stop) in enumerate(zip(idx_start, idx_stop)):
-                ind_pwr = morlet_power(data[start:stop], [fmin, fmax], sf,
-                                       norm=False)[0]
-                pwrs[i] = np.mean(ind_pwr)
+            # Compute mean power of each spindles (the power is computed
+            # once on the whole signal and then averaged inside events)
+            pwrs = events_features(data, sf, ev_spindles, fmin=fmin,
+                                   fmax=fmax, freq=False)['power']
             # Normalize by dividing by the mean
             normalization(pwrs, norm=2)
 
             if return_full:
+                idx_sigma = np.where(is_sigma)[0]
                 return (idx_spindles, number, density, duration_ms, pwrs,
                         idx_start, idx_stop, hard_thr, soft_thr, idx_sigma,
                         fmin, fmax, sigma_nfpow, amplitude, sigma_thr)
@@ -358,6 +316,7 @@ def spindlesdetect(data, sf, threshold, hypno, nrem_only, fmin=12., fmax=14.,
         else:
             empty = np.array([], dtype=int)
             if return_full:
+                idx_sigma = np.where(is_sigma)[0]
                 return (empty, 0., 0., empty, np.array([]), empty, empty,
                         hard_thr, soft_thr, idx_sigma, fmin, fmax, sigma_nfpow,
                         amplitude, sigma_thr)
@@ -366,6 +325,7 @@ def spindlesdetect(data, sf, threshold, hypno, nrem_only, fmin=12., fmax=14.,
 
     else:
         if return_full:
+            idx_sigma = np.where(is_sigma)[0]
             return np.array([], dtype=int), 0., 0., np.array([], dtype=int), \
                 np.array([]), np.array([], dtype=int), \
                 np.array([], dtype=int), hard_thr, soft_thr, idx_sigma, fmin, \
@@ -428,8 +388,8 @@ def remdetect(data, sf, hypno, rem_only, threshold, tmin=300, tmax=800,
     freqs = np.array([0.5, 4., 8., 12, 40])
     beta_npow = morlet_power(data, freqs, sf, norm=True)[-1]
     beta_nfpow = smoothing(beta_npow, sf * (tmin / 1000))
-    # Vector of beta power supra-threshold values
-    idx_beta = np.where(beta_nfpow < np.percentile(beta_nfpow, 60))[0]
+    # Beta power infra-threshold values
+    is_beta = beta_nfpow < np.percentile(beta_nfpow, 60)
 
     # Compute smoothed derivative
     sm_sig = smoothing(data, sf * (smoothing_ms / 1000))
@@ -448,55 +408,31 @@ def remdetect(data, sf, hypno, rem_only, threshold, tmin=300, tmax=800,
     soft_thr = 0.5 * hard_thr
 
     with np.errstate(divide='ignore', invalid='ignore'):
-        idx_hard = np.where(deriv > hard_thr)[0]
-        idx_soft = np.where(deriv > soft_thr)[0]
-
-    # Find threshold-crossing indices of soft threshold
-    idx_zc_soft = _events_to_index(idx_soft).flatten()
-
-    if idx_hard.size > 0:
-        # Initialize rem vector
-        idx_rem = np.array([], dtype=int)
+        is_hard = deriv > hard_thr
+        ev_soft = _mask_to_events(deriv > soft_thr)
 
+    if is_hard.any():
         # Keep only period with low relative beta power (i.e. remove artefact)
-        idx_hard = np.intersect1d(idx_hard, idx_beta, True)
+        ev_hard = _mask_to_events(np.logical_and(is_hard, is_beta))
 
         # Fill gap between events separated by less than min_distance_ms
-        idx_hard = _events_distance_fill(idx_hard, min_distance_ms, sf)
-
-        # Get where spindles start / end :
-        idx_start, idx_stop = _events_to_index(idx_hard).T
+        ev_hard = _events_merge(ev_hard, min_distance_ms, sf)
 
         # Find true beginning / end using soft threshold
-        for s in idx_start:
-            d = s - idx_zc_soft
-            # Find distance to nearest soft threshold crossing before start
-            soft_beg = d[d > 0].min()
-            # Find distance to nearest soft threshold crossing after end
-            soft_end = np.abs(d[d < 0]).min()
-            idx_rem = np.append(idx_rem, np.arange(
-                s - soft_beg, s + soft_end))
+        ev_rem = _events_extend(ev_hard, ev_soft)
 
         # Fill gap between events separated by less than min_distance_ms
-        idx_rem = _events_distance_fill(idx_rem, min_distance_ms, sf)
-
-        # Get duration
-        idx_start, idx_stop = _events_to_index(idx_rem).T
-        duration_ms = (idx_stop - idx_start) * (1000 / sf)
+        ev_rem = _events_merge(ev_rem, min_distance_ms, sf)
 
         # Remove events with bad duration
-        good_dur = np.where(np.logical_and(duration_ms > tmin,
-                                           duration_ms < tmax))[0]
-
-        idx_rem = _index_to_events(np.c_[idx_start, idx_stop][good_dur])
+        ev_rem = _events_duration_filter(ev_rem, sf, tmin, tmax)
 
         # Compute number, duration, density
-        idx_start, idx_stop = _events_to_index(idx_rem).T
-        number = idx_start.size
-        duration_ms = (idx_stop - idx_start) * (1000 / sf)
+        number = len(ev_rem)
+        duration_ms = _events_duration(ev_rem, sf)
         density = number / (length / sf / 60.)
 
-        return idx_rem, number, density, duration_ms
+        return _index_to_events(ev_rem), number, density, duration_ms
 
     else:
         return np.array([], dtype=int), 0., 0., np.array([], dtype=int)
@@ -554,30 +490,22 @@ def slowwavedetect(data, sf, threshold, min_amp=70., max_amp=400., tmin=1000.,
     delta_nfpow = smoothing(delta_nfpow, smoothing_s * sf)
 
     # Normalized power criteria
-    idx_sw = np.where(delta_nfpow > threshold)[0]
-
-    if idx_sw.size:
-        # Get where slow waves start / end :
-        idx_start, idx_stop = _events_to_index(idx_sw).T
-        duration_ms = (idx_stop - idx_start) * (1000 / sf)
+    ev_sw = _mask_to_events(delta_nfpow > threshold)
 
+    if ev_sw.size:
         # Check amplitude and duration
-        amp = np.zeros(shape=idx_start.shape)
-        for idx, (start, stop) in enumerate(zip(idx_start, idx_stop)):
-            amp[idx] = np.ptp(data[start:stop])
-        good_amp = np.where(np.logical_and(amp > min_amp, amp < max_amp))[0]
-        good_dur = np.where(duration_ms > tmin)[0]
-        good_event = np.intersect1d(good_amp, good_dur, True)
-        idx_sw = _index_to_events(np.c_[idx_start, idx_stop][good_event])
-
-        if idx_sw.size:
+        amp = _events_ptp(data, ev_sw)
+        good_amp = np.logical_and(amp > min_amp, amp < max_amp)
+        good_dur = _events_duration(ev_sw, sf) > tmin
+        ev_sw = ev_sw[np.logical_and(good_amp, good_dur), :]
+
+        if ev_sw.size:
             # Export info
-            idx_start, idx_stop = _events_to_index(idx_sw).T
-            number = idx_start.size
-            duration_ms = (idx_stop - idx_start) * (1000 / sf)
+            number = len(ev_sw)
+            duration_ms = _events_duration(ev_sw, sf)
             density = number / (len(data) / sf / 60.)
 
-            return idx_sw, number, density, duration_ms
+            return _index_to_events(ev_sw), number, density, duration_ms
 
         else:
             return np.array([], dtype=int), 0., 0., np.array([], dtype=int)
@@ -647,7 +575,7 @@ def mtdetect(data, sf, threshold, hypno, rem_only, fmin=0., fmax=50.,
     amplitude = smoothing(amplitude, sf * (tmin / 1000))
     # Morlet power in delta band
     delta_nfpow = morlet_power(data, [0.5, 4], sf, norm=False)
-    idx_high_delta = np.where(delta_nfpow > np.percentile(delta_nfpow, 75))[0]
+    is_high_delta = delta_nfpow > np.percentile(delta_nfpow, 75)
 
     if rem_only and 4 in hypno:
         idx_zero = np.where(hypno < 4)[0]
@@ -660,41 +588,31 @@ def mtdetect(data, sf, threshold, hypno, rem_only, fmin=0., fmax=50.,
     hard_thr = np.nanmean(amplitude) + threshold * np.nanstd(amplitude)
 
     with np.errstate(divide='ignore', invalid='ignore'):
-        idx_hard = np.where(amplitude > hard_thr)[0]
+        is_hard = amplitude > hard_thr
 
-    if idx_hard.size:
+    if is_hard.any():
         # Keep only MT in period with low relative delta power
-        idx_hard = np.setdiff1d(idx_hard, idx_high_delta, True)
+        is_hard = np.logical_and(is_hard, ~is_high_delta.ravel())
 
         # Fill gap between events separated by less than min_distance_ms
-        idx_hard = _events_distance_fill(idx_hard, min_distance_ms, sf)
+        ev_mt = _events_merge(_mask_to_events(is_hard), min_distance_ms, sf)
 
         # MORPHOLOGICAL CRITERIA
-        idx_start, idx_stop = _events_to_index(idx_hard).T
-        duration_ms = (idx_stop - idx_start) * (1000 / sf)
-
         # Remove events with bad duration
-        good_dur = np.where(np.logical_and(duration_ms > tmin,
-                                           duration_ms < tmax))[0]
-        idx_mt = _index_to_events(np.c_[idx_start, idx_stop][good_dur])
+        ev_mt = _events_duration_filter(ev_mt, sf, tmin, tmax)
 
         # Remove events with bad amplitude
-        idx_start, idx_stop = _events_to_index(idx_mt).T
-        amp = np.zeros(shape=idx_start.size)
-        for i, (start, stop) in enumerate(zip(idx_start, idx_stop)):
-            amp[i] = np.ptp(data[start:stop])
-        good_amp = np.where(np.logical_and(amp > min_amp,
-                                           amp < max_amp))[0]
-        idx_mt = _index_to_events(np.c_[idx_start, idx_stop][good_amp])
+        amp = _events_ptp(data, ev_mt)
+        good_amp = np.logical_and(amp > min_amp, amp < max_amp)
+        ev_mt = ev_mt[good_amp, :]
 
         # Compute number, duration, density
-        if idx_mt.size:
-            idx_start, idx_stop = _events_to_index(idx_mt).T
-            number = idx_start.size
-            duration_ms = (idx_stop - idx_start) * (1000 / sf)
+        if ev_mt.size:
+            number = len(ev_mt)
+            duration_ms = _events_duration(ev_mt, sf)
             density = number / (length / sf / 60.)
 
-            return idx_mt, number, density, duration_ms
+            return _index_to_events(ev_mt), number, density, duration_ms
 
         else:
             return np.array([], dtype=int), 0., 0., np.array([], dtype=int)
@@ -708,6 +626,104 @@ def mtdetect(data, sf, threshold, hypno, rem_only, fmin=0., fmax=50.,
 ###########################################################################
 
 
+def _sliding_extrema(y, lookahead):
+    """Get the (min, max) of the windows y[..., k:k + lookahead].
+
+    Windows are truncated at the end of the signal.
+
+    Parameters
+    ----------
+    y : array_like
+        Floating point data of shape (..., n_pts).
+    lookahead : int
+        Length of the windows.
+
+    Returns
+    -------
+    wmin, wmax : array_like
+        Minimum and maximum of each window of shape (..., n_pts).
+    """
+    # maximum_filter1d use centered windows. Padding at the end with neutral
+    # values and shifting the output gives forward windows :
+    half = lookahead // 2
+    pad = [(0, 0)] * (y.ndim - 1) + [(0, half)]
+    out = []
+    for fcn, cval in zip([minimum_filter1d, maximum_filter1d],
+                         [np.inf, -np.inf]):
+        yp = np.pad(y, pad, mode='constant', constant_values=cval)
+        out.append(fcn(yp, lookahead, axis=-1, mode='constant',
+                       cval=cval)[..., half:])
+    return out
+
+
+def _peak_search(values, wmin, wmax, index, length, lookahead, delta):
+    """Alternated search of maxima / minima peaks.
+
+    This function reproduces the sequential algorithm of peakdetect where
+    (mx, mn) are the running extrema since the last detected peak. The search
+    of the next peak is vectorized over chunks of candidates (running extrema
+    are obtained with accumulated ufuncs) and the chunk size grows until a
+    peak is found. Hence, the number of python iterations scales with the
+    number of peaks and not with the number of samples.
+
+    Parameters
+    ----------
+    values, wmin, wmax : array_like
+        Value of each candidate and the (min, max) of the lookahead window
+        starting at the candidate, each of shape (n_candidates,).
+    index : array_like
+        Sample index of each candidate.
+    length : int
+        Number of samples of the signal.
+    lookahead : int
+        Distance to look ahead from a peak candidate.
+    delta : float
+        Minimum difference between a peak and the following points.
+
+    Returns
+    -------
+    peaks : list
+        Sample index of each peak.
+    is_max : list
+        Boolean values indicating if each peak is a maximum.
+    """
+    peaks, is_max = [], []
+    n_cand, p, chunk = len(values), 0, max(2 * lookahead, 16)
+    mx, mn = -np.inf, np.inf
+    look_max, look_min = True, True
+    while p < n_cand:
+        sl = slice(p, min(p + chunk, n_cand))
+        val = values[sl]
+        hit = np.zeros((len(val),), dtype=bool)
+        if look_max:
+            cmx = np.maximum(np.maximum.accumulate(val), mx)
+            hit_max = (val < cmx - delta) & (wmax[sl] < cmx)
+            hit |= hit_max
+        if look_min:
+            cmn = np.minimum(np.minimum.accumulate(val), mn)
+            hit_min = (val > cmn + delta) & (wmin[sl] > cmn)
+            hit |= hit_min
+        k = hit.argmax()
+        if not hit[k]:
+            # No peak in this chunk. Carry running extrema and look further :
+            mx = cmx[-1] if look_max else mx
+            mn = cmn[-1] if look_min else mn
+            p, chunk = sl.stop, 2 * chunk
+            continue
+        # When both are found, the maximum takes the priority :
+        found_max = look_max and hit_max[k]
+        peaks.append(index[p + k])
+        is_max.append(found_max)
+        # end is within lookahead no more peaks can be found :
+        if index[p + k] + lookahead >= length:
+            break
+        # Find the other kind of peak now :
+        look_max, look_min = not found_max, found_max
+        mx, mn = -np.inf, np.inf
+        p, chunk = p + k + 1, max(2 * lookahead, 16)
+    return peaks, is_max
+
+
 def peakdetect(sf, y_axis, x_axis=None, lookahead=200, delta=1., get='max',
                threshold='auto'):
     """Perform a peak detection.
@@ -727,7 +743,8 @@ def peakdetect(sf, y_axis, x_axis=None, lookahead=200, delta=1., get='max',
     sf : float
         The sampling frequency.
     y_axis : array_like
-        Row vector containing the data.
+        Row vector containing the data. Multi-channel data can also be used
+        using an array of shape (n_channels, n_pts).
     x_axis : array_like
         Row vector for the time axis. If omitted an index of the y_axis is
         used.
@@ -742,8 +759,6 @@ def peakdetect(sf, y_axis, x_axis=None, lookahead=200, delta=1., get='max',
         to hinder the function from picking up false peaks towards to end
         of the signal. To work well delta should be set to
         delta >= RMSnoise * 5.
-        When omitted delta function causes a 20% decrease in speed.
-        When used Correctly it can double the speed of the function
     get : string | 'max'
         Get either minimum values ('min'), maximum ('max') or min and max
         ('minmax').
@@ -760,19 +775,21 @@ def peakdetect(sf, y_axis, x_axis=None, lookahead=200, delta=1., get='max',
         Number of peaks.
     density : float
         Density of peaks.
+
+    For multi-channel data, index is a list containing the indices of each
+    channel and number / density are arrays of shape (n_channels,).
     """
     # ============== CHECK DATA ==============
+    y_axis = np.asarray(y_axis)
     if x_axis is None:
-        x_axis = range(len(y_axis))
+        x_axis = range(y_axis.shape[-1])
     # Check length :
-    if len(y_axis) != len(x_axis):
+    if y_axis.shape[-1] != len(x_axis):
         raise ValueError("Input vectors y_axis and x_axis must have same "
                          "length")
-    # Needs to be a numpy array
-    y_axis, x_axis = np.asarray(y_axis), np.asarray(x_axis)
-
-    # store data length for later use
-    length = len(y_axis)
+    if y_axis.ndim not in [1, 2]:
+        raise ValueError("y_axis must be a vector or an array of shape "
+                         "(n_channels, n_pts)")
 
     # Lookahead  & delta checking :
     if lookahead < 1:
@@ -785,74 +802,60 @@ def peakdetect(sf, y_axis, x_axis=None, lookahead=200, delta=1., get='max',
         raise ValueError("The get parameter must either be 'min', 'max' or"
                          " 'minmax'")
 
-    # ============== PRE-ALLOCATION ==============
-    max_peaks, min_peaks = [], []
-    dump = []   # Used to pop the first hit which almost always is false
+    # ============== MULTI-CHANNEL ==============
+    if y_axis.ndim == 2:
+        # Sliding extrema are computed for all channels at once :
+        y_float = _as_float(y_axis)
+        wmin, wmax = _sliding_extrema(y_float, lookahead)
+        out = [_peakdetect(sf, y_float[k, :], wmin[k, :], wmax[k, :],
+                           lookahead, delta, get, threshold)
+               for k in range(y_axis.shape[0])]
+        index, number, density = zip(*out) if out else ([], [], [])
+        return list(index), np.array(number), np.array(density)
+    else:
+        y_float = _as_float(y_axis)
+        wmin, wmax = _sliding_extrema(y_float, lookahead)
+        return _peakdetect(sf, y_float, wmin, wmax, lookahead, delta, get,
+                           threshold)
+
 
-    # maxima and minima candidates are temporarily stored in
-    # mx and mn respectively
-    mn, mx = np.Inf, -np.Inf
+def _as_float(y):
+    """Convert data to floating point (required by infinite padding)."""
+    return y if np.issubdtype(y.dtype, np.floating) else y.astype(float)
+
+
+def _peakdetect(sf, y_axis, wmin, wmax, lookahead, delta, get, threshold):
+    """Peak detection on a single channel (see peakdetect)."""
+    # store data length for later use
+    length = len(y_axis)
 
     # ============== THRESHOLD ==============
     if threshold is not None:
-        if threshold is 'auto':
+        if isinstance(threshold, str) and threshold == 'auto':
             threshold = np.std(y_axis)
         # Detrend / demean y-axis :
         y_axisp = detrend(y_axis)
         y_axisp -= y_axisp.mean()
         # Find values above threshold :
-        above = np.abs(y_axisp) >= threshold
-        zp = zip(np.arange(length)[above], x_axis[above], y_axis[above])
+        cand = np.where(np.abs(y_axisp) >= threshold)[0]
     else:
-        zp = zip(np.arange(length)[:-lookahead], x_axis[:-lookahead],
-                 y_axis[:-lookahead])
+        # Only detect peak if there is 'lookahead' amount of points after it
+        cand = np.arange(max(length - lookahead, 0))
 
     # ============== FIND MIN / MAX PEAKS ==============
-    # Only detect peak if there is 'lookahead' amount of points after it
-    for index, x, y in zp:
-        if y > mx:
-            mx = y
-        if y < mn:
-            mn = y
-
-        # ==== Look for max ====
-        if y < mx - delta and mx != np.Inf:
-            # Maxima peak candidate found
-            # look ahead in signal to ensure that this is a peak and not jitter
-            if y_axis[index:index + lookahead].max() < mx:
-                max_peaks.append(index)
-                dump.append(True)
-                # set algorithm to only find minima now
-                mx = np.Inf
-                mn = np.Inf
-                if index + lookahead >= length:
-                    # end is within lookahead no more peaks can be found
-                    break
-                continue
-
-        # ==== Look for max ====
-        if y > mn + delta and mn != -np.Inf:
-            # Minima peak candidate found
-            # look ahead in signal to ensure that this is a peak and not jitter
-            if y_axis[index:index + lookahead].min() > mn:
-                min_peaks.append(index)
-                dump.append(False)
-                # set algorithm to only find maxima now
-                mn = -np.Inf
-                mx = -np.Inf
-                if index + lookahead >= length:
-                    # end is within lookahead no more peaks can be found
-                    break
+    peaks, is_max = _peak_search(y_axis[cand], wmin[cand], wmax[cand], cand,
+                                 length, lookahead, delta)
+    max_peaks = [k for k, i in zip(peaks, is_max) if i]
+    min_peaks = [k for k, i in zip(peaks, is_max) if not i]
 
     if min_peaks and max_peaks:
         # ============== CLEAN ==============
         # Remove the false hit on the first value of the y_axis
         if threshold is None:
-            if dump[0]:
+            if is_max[0]:
                 max_peaks.pop(0)
             else:
                 min_peaks.pop(0)
-            del dump
 
         # ============== MIN / MAX / MINMAX ==============
         if get == 'max':
@@ -867,3 +870,71 @@ def peakdetect(sf, y_axis, x_axis=None, lookahead=200, delta=1., get='max',
         return index, number, density
     else:
         return np.array([]), 0., 0.
+
+
+###########################################################################
+# FEATURES OF DETECTED EVENTS
+###########################################################################
+
+
+def events_features(data, sf, events, hypno=None, fmin=None, fmax=None,
+                    freq=True):
+    """Compute features of detected events.
+
+    Features are computed for all events at once : signal-level quantities
+    (band power, instantaneous frequency) are computed only once on the
+    whole signal and then reduced inside each event.
+
+    Parameters
+    ----------
+    data : array_like
+        Signal of shape (n_pts,).
+    sf : float
+        Sampling frequency.
+    events : array_like
+        Either an array of shape (n_events, 2) of (start, stop) indices or
+        a vector of indices (as returned by detection functions).
+    hypno : array_like | None
+        Hypnogram vector, same length as data. If None, stages are set to -1.
+    fmin : float | None
+        Lower frequency of the band used for the power and the peak frequency.
+    fmax : float | None
+        Higher frequency of the band used for the power and the peak
+        frequency.
+    freq : bool | True
+        Compute the peak frequency of each event.
+
+    Returns
+    -------
+    features : dict
+        Dictionary of arrays of shape (n_events,) with keys 'start', 'stop',
+        'duration_ms', 'amplitude', 'frequency', 'power' and 'stage'. This
+        dictionary can directly be used to build a pandas.DataFrame.
+    """
+    data = np.asarray(data, dtype=float).ravel()
+    events = np.asarray(events, dtype=int)
+    if events.ndim == 1:
+        events = _events_to_index(events)
+    nan = np.full((len(events),), np.nan)
+    is_band = (fmin is not None) and (fmax is not None)
+    # Peak frequency (mean instantaneous frequency) :
+    frequency = nan
+    if freq and len(events):
+        x = filt(sf, [fmin, fmax], data) if is_band else data
+        phase = np.unwrap(np.angle(hilbert(x, next_fast_len(len(x)))[
+            0:len(x)]))
+        inst_freq = np.r_[np.diff(phase), 0.] * sf / (2. * np.pi)
+        frequency = _events_mean(inst_freq, events)
+    # Mean power :
+    power = nan
+    if is_band and len(events):
+        power = _events_mean(morlet_power(data, [fmin, fmax], sf,
+                                          norm=False)[0], events)
+    # Sleep stage at the beginning of each event :
+    stage = np.full((len(events),), -1, dtype=int)
+    if hypno is not None:
+        stage = np.asarray(hypno)[events[:, 0]].astype(int)
+    return {'start': events[:, 0], 'stop': events[:, 1],
+            'duration_ms': _events_duration(events, sf),
+            'amplitude': _events_ptp(data, events), 'frequency': frequency,
+            'power': power, 'stage': stage}
@@ -1,8 +1,19 @@
-"""Goup of functions for index / event managment."""
+"""Goup of functions for index / event managment.
+
+Events are represented as an array of shape (n_events, 2) where each row
+contains the (start, stop) indices of an event (the stop index is included).
+Event arrays returned by functions of this module are sorted and disjoint,
+which allows to manipulate them without expanding events into dense arrays
+of indices.
+"""
 
 import numpy as np
 
-__all__ = ('_events_distance_fill', '_events_to_index', '_index_to_events')
+__all__ = ('_events_distance_fill', '_events_to_index', '_index_to_events',
+           '_mask_to_events', '_events_to_mask', '_events_union',
+           '_events_merge', '_events_intersect', '_events_extend',
+           '_events_duration', '_events_duration_filter', '_events_reduce',
+           '_events_ptp', '_events_mean')
 
 
 def _events_distance_fill(index, min_distance_ms, sf):
@@ -23,21 +34,10 @@ def _events_distance_fill(index, min_distance_ms, sf):
     f_index : array_like
         Filled (corrected) Indices of supra-threshold events
     """
-    # Convert min_distance_ms
-    min_distance = min_distance_ms / 1000. * sf
-    idx_diff = np.diff(index)
-    condition = idx_diff > 1
-    idx_distance = np.where(condition)[0]
-    distance = idx_diff[condition]
-    bad = idx_distance[np.where(distance < min_distance)[0]]
-    # Fill gap between events separated with less than min_distance_ms
-    if len(bad) > 0:
-        fill = np.hstack([np.arange(index[j] + 1, index[j + 1])
-                          for i, j in enumerate(bad)])
-        f_index = np.sort(np.append(index, fill))
-        return f_index
-    else:
+    if not len(index):
         return index
+    events = _events_merge(_events_to_index(index), min_distance_ms, sf)
+    return _index_to_events(events)
 
 
 def _events_to_index(x):
@@ -54,10 +54,13 @@ def _events_to_index(x):
         An array of shape (n_events, 2) where the dimension 2 refer to the
         indices where each event start and finish.
     """
+    x = np.asarray(x)
+    if not x.size:
+        return np.zeros((0, 2), dtype=int)
     # Split indices where it stopped :
-    sp = np.split(x, np.where(np.diff(x) != 1)[0] + 1)
+    sp = np.where(np.diff(x) != 1)[0]
     # Return (start, end) :
-    return np.array([[k[0], k[-1]] for k in sp]).astype(int)
+    return np.c_[x[np.r_[0, sp + 1]], x[np.r_[sp, -1]]].astype(int)
 
 
 def _index_to_events(x):
@@ -73,7 +76,281 @@ def _index_to_events(x):
     index : array_like
         Continuous array of indicies.
     """
-    index = np.array([])
-    for k in range(x.shape[0]):
-        index = np.append(index, np.arange(x[k, 0], x[k, 1] + 1))
-    return index.astype(int)
+    x = np.asarray(x, dtype=int).reshape(-1, 2)
+    length = x[:, 1] - x[:, 0] + 1
+    # Offset of each event inside the continuous array :
+    offset = np.r_[0, np.cumsum(length)[:-1]]
+    return np.repeat(x[:, 0] - offset, length) + np.arange(length.sum())
+
+
+###############################################################################
+###############################################################################
+#                             INTERVAL ENGINE
+###############################################################################
+###############################################################################
+
+
+def _mask_to_events(mask):
+    """Get events from a boolean mask.
+
+    Parameters
+    ----------
+    mask : array_like
+        Boolean array of shape (n_pts,).
+
+    Returns
+    -------
+    events : array_like
+        Array of (start, stop) indices of shape (n_events, 2).
+    """
+    d = np.diff(np.r_[0, np.asarray(mask, dtype=np.int8), 0])
+    return np.c_[np.where(d == 1)[0], np.where(d == -1)[0] - 1]
+
+
+def _events_to_mask(events, n_pts):
+    """Get the boolean mask of events.
+
+    Parameters
+    ----------
+    events : array_like
+        Array of (start, stop) indices of shape (n_events, 2).
+    n_pts : int
+        Length of the mask.
+
+    Returns
+    -------
+    mask : array_like
+        Boolean array of shape (n_pts,).
+    """
+    events = np.asarray(events, dtype=int).reshape(-1, 2)
+    edges = np.zeros((n_pts + 1,), dtype=int)
+    np.add.at(edges, events[:, 0], 1)
+    np.add.at(edges, events[:, 1] + 1, -1)
+    return np.cumsum(edges[:-1]) > 0
+
+
+def _events_union(events):
+    """Sort events and merge those that are overlapping or contiguous.
+
+    Parameters
+    ----------
+    events : array_like
+        Array of (start, stop) indices of shape (n_events, 2).
+
+    Returns
+    -------
+    events : array_like
+        Sorted and disjoint events.
+    """
+    events = np.asarray(events, dtype=int).reshape(-1, 2)
+    if not events.size:
+        return events
+    events = events[np.argsort(events[:, 0], kind='mergesort'), :]
+    stop = np.maximum.accumulate(events[:, 1])
+    is_new = np.r_[True, events[1:, 0] > stop[:-1] + 1]
+    is_last = np.r_[is_new[1:], True]
+    return np.c_[events[is_new, 0], stop[is_last]]
+
+
+def _events_merge(events, min_distance_ms, sf):
+    """Merge events separated with less than a minimum distance.
+
+    Parameters
+    ----------
+    events : array_like
+        Sorted and disjoint events of shape (n_events, 2).
+    min_distance_ms : float
+        Minimum distance (ms) between two events to consider them as two
+        distinct events.
+    sf : float
+        Sampling frequency of the data (Hz)
+
+    Returns
+    -------
+    events : array_like
+        Merged events.
+    """
+    events = np.asarray(events, dtype=int).reshape(-1, 2)
+    if len(events) < 2:
+        return events
+    min_distance = min_distance_ms / 1000. * sf
+    is_distinct = (events[1:, 0] - events[:-1, 1]) >= min_distance
+    return np.c_[events[np.r_[True, is_distinct], 0],
+                 events[np.r_[is_distinct, True], 1]]
+
+
+def _events_intersect(events, other):
+    """Intersection between events and either other events or a mask.
+
+    Parameters
+    ----------
+    events : array_like
+        Sorted and disjoint events of shape (n_events, 2).
+    other : array_like
+        Either sorted and disjoint events of shape (n_other, 2) or a boolean
+        mask of shape (n_pts,) (e.g. sleep stages or power criteria).
+
+    Returns
+    -------
+    events : array_like
+        Events of the intersection.
+    """
+    events = np.asarray(events, dtype=int).reshape(-1, 2)
+    other = np.asarray(other)
+    if other.dtype == bool:
+        other = _mask_to_events(other)
+    other = other.astype(int).reshape(-1, 2)
+    # Sweep over the (half-open) boundaries. Because both inputs are
+    # disjoint, the intersection is where the two sets are "opened" :
+    pos = np.r_[events[:, 0], events[:, 1] + 1, other[:, 0], other[:, 1] + 1]
+    delta = np.r_[np.ones(len(events)), -np.ones(len(events)),
+                  np.ones(len(other)), -np.ones(len(other))].astype(int)
+    order = np.lexsort((delta, pos))  # close before open at same position
+    pos, count = pos[order], np.cumsum(delta[order])
+    is_open = np.where(count == 2)[0]
+    return np.c_[pos[is_open], pos[is_open + 1] - 1]
+
+
+def _events_extend(events, soft):
+    """Extend events up to the nearest soft threshold crossings.
+
+    The new start (resp. stop) of each event is the nearest soft event
+    boundary strictly before (resp. after) the start of the event.
+
+    Parameters
+    ----------
+    events : array_like
+        Sorted and disjoint events of shape (n_events, 2) (e.g.
+        supra-threshold periods using an hard threshold).
+    soft : array_like
+        Sorted and disjoint events of shape (n_soft, 2) (e.g.
+        supra-threshold periods using a soft threshold).
+
+    Returns
+    -------
+    events : array_like
+        Sorted and disjoint extended events.
+    """
+    events = np.asarray(events, dtype=int).reshape(-1, 2)
+    crossings = np.asarray(soft, dtype=int).ravel()
+    start = events[:, 0]
+    i_beg = np.searchsorted(crossings, start, side='left') - 1
+    i_end = np.searchsorted(crossings, start, side='right')
+    # Ignore events without soft crossings before / after :
+    is_valid = np.logical_and(i_beg >= 0, i_end < len(crossings))
+    ext = np.c_[crossings[i_beg[is_valid]], crossings[i_end[is_valid]] - 1]
+    return _events_union(ext)
+
+
+def _events_duration(events, sf):
+    """Get the duration (ms) of events.
+
+    Parameters
+    ----------
+    events : array_like
+        Events of shape (n_events, 2).
+    sf : float
+        Sampling frequency of the data (Hz)
+
+    Returns
+    -------
+    duration_ms : array_like
+        Duration of each event (ms).
+    """
+    events = np.asarray(events).reshape(-1, 2)
+    return (events[:, 1] - events[:, 0]) * (1000 / sf)
+
+
+def _events_duration_filter(events, sf, tmin=None, tmax=None):
+    """Keep events with a duration between tmin and tmax.
+
+    Parameters
+    ----------
+    events : array_like
+        Events of shape (n_events, 2).
+    sf : float
+        Sampling frequency of the data (Hz)
+    tmin : float | None
+        Events must last longer than tmin (ms).
+    tmax : float | None
+        Events must last shorter than tmax (ms).
+
+    Returns
+    -------
+    events : array_like
+        Events with a good duration.
+    """
+    events = np.asarray(events).reshape(-1, 2)
+    duration_ms = _events_duration(events, sf)
+    is_good = np.ones((len(events),), dtype=bool)
+    if tmin is not None:
+        is_good &= duration_ms > tmin
+    if tmax is not None:
+        is_good &= duration_ms < tmax
+    return events[is_good, :]
+
+
+def _events_reduce(ufunc, x, events):
+    """Reduce a signal over each event.
+
+    Parameters
+    ----------
+    ufunc : numpy.ufunc
+        The ufunc to use for the reduction (e.g np.maximum).
+    x : array_like
+        Signal of shape (n_pts,).
+    events : array_like
+        Sorted and disjoint events of shape (n_events, 2).
+
+    Returns
+    -------
+    red : array_like
+        The reduced signal of shape (n_events,).
+    """
+    events = np.asarray(events, dtype=int).reshape(-1, 2)
+    if not events.size:
+        return np.array([], dtype=np.asarray(x).dtype)
+    # Interleaved (start, stop + 1) boundaries. Only even slices are events :
+    bounds = np.c_[events[:, 0], events[:, 1] + 1].ravel()
+    if bounds[-1] == len(x):
+        bounds = bounds[:-1]
+    return ufunc.reduceat(x, bounds)[::2]
+
+
+def _events_ptp(x, events):
+    """Get the peak-to-peak amplitude of each event.
+
+    Parameters
+    ----------
+    x : array_like
+        Signal of shape (n_pts,).
+    events : array_like
+        Sorted and disjoint events of shape (n_events, 2).
+
+    Returns
+    -------
+    amp : array_like
+        Peak-to-peak amplitude of each event.
+    """
+    return _events_reduce(np.maximum, x, events) - _events_reduce(
+        np.minimum, x, events)
+
+
+def _events_mean(x, events):
+    """Get the mean of a signal over each event.
+
+    Parameters
+    ----------
+    x : array_like
+        Signal of shape (n_pts,).
+    events : array_like
+        Sorted and disjoint events of shape (n_events, 2).
+
+    Returns
+    -------
+    mean : array_like
+        The mean of the signal inside each event.
+    """
+    events = np.asarray(events, dtype=int).reshape(-1, 2)
+    length = events[:, 1] - events[:, 0] + 1
+    return _events_reduce(np.add, np.asarray(x, dtype=float), events) / length
@@ -1,11 +1,19 @@
 """Test functions in detections.py."""
+import logging
+from time import perf_counter
+
 import numpy as np
+import pytest
+from scipy.signal import detrend
 
 from visbrain.utils.sleep.detection import (kcdetect, spindlesdetect,
                                             remdetect, slowwavedetect,
-                                            mtdetect, peakdetect)
+                                            mtdetect, peakdetect,
+                                            events_features)
 from visbrain.utils import generate_eeg
 
+logger = logging.getLogger('visbrain')
+
 """If tests continue to failed, one idea could be to save in a npz file the
 signal to test.
 """
@@ -22,6 +30,57 @@ art = np.full((n_per_seg,), -1)
 hypno = np.hstack((wake, n1, n2, n3, rem, art))
 
 
+def _peakdetect_loop(y_axis, lookahead=200, delta=1., threshold='auto'):
+    """Sample by sample peak detection used as a reference.
+
+    Return the (min_peaks, max_peaks) before cleaning.
+    """
+    length = len(y_axis)
+    max_peaks, min_peaks = [], []
+    mn, mx = np.inf, -np.inf
+    if threshold is not None:
+        if threshold == 'auto':
+            threshold = np.std(y_axis)
+        y_axisp = detrend(y_axis)
+        y_axisp -= y_axisp.mean()
+        above = np.abs(y_axisp) >= threshold
+        zp = zip(np.arange(length)[above], y_axis[above])
+    else:
+        zp = zip(np.arange(length)[:-lookahead], y_axis[:-lookahead])
+    for index, y in zp:
+        if y > mx:
+            mx = y
+        if y < mn:
+            mn = y
+        if y < mx - delta and mx != np.inf:
+            if y_axis[index:index + lookahead].max() < mx:
+                max_peaks.append(index)
+                mx, mn = np.inf, np.inf
+                if index + lookahead >= length:
+                    break
+                continue
+        if y > mn + delta and mn != -np.inf:
+            if y_axis[index:index + lookahead].min() > mn:
+                min_peaks.append(index)
+                mn, mx = -np.inf, -np.inf
+                if index + lookahead >= length:
+                    break
+    return min_peaks, max_peaks
+
+
+def _peakdetect_ref(y_axis, get, **kwargs):
+    """Get the expected output of peakdetect using the reference loop."""
+    min_peaks, max_peaks = _peakdetect_loop(y_axis, **kwargs)
+    if not (min_peaks and max_peaks):
+        return np.array([])
+    if kwargs.get('threshold', 'auto') is None:
+        first_max = max_peaks[0] < min_peaks[0]
+        (max_peaks if first_max else min_peaks).pop(0)
+    if get == 'minmax':
+        return np.vstack((min_peaks, max_peaks))
+    return np.array(min_peaks if get == 'min' else max_peaks)
+
+
 class TestDetections(object):
     """Test functions in detection.py."""
 
@@ -45,6 +104,20 @@ class TestDetections(object):
         """Test function mtdetect."""
         mtdetect(signal, sf, .1, hypno, True)
 
+    def test_events_features(self):
+        """Test function events_features."""
+        events = np.array([[100, 200], [1000, 1300], [5000, 5050]])
+        feat = events_features(signal, sf, events, hypno, fmin=12., fmax=14.)
+        assert all([len(k) == 3 for k in feat.values()])
+        np.testing.assert_array_equal(feat['stage'], [0, 0, 2])
+        np.testing.assert_array_almost_equal(feat['amplitude'], [np.ptp(
+            signal[k:i + 1]) for k, i in events])
+        assert np.all((feat['frequency'] > 10.) & (feat['frequency'] < 16.))
+        # From indices :
+        index = spindlesdetect(signal, sf, .1, hypno, True)[0]
+        feat = events_features(signal, sf, index)
+        assert np.isnan(feat['power']).all() and (feat['stage'] == -1).all()
+
     def test_peakdetect(self):
         """Test function peakdetect."""
         # Get a dataset example :
@@ -52,3 +125,63 @@ class TestDetections(object):
         peakdetect(sf, data, get='min')
         peakdetect(sf, data, get='max')
         peakdetect(sf, data, get='minmax', threshold=.6)
+
+    def test_peakdetect_equivalence(self):
+        """Test that peakdetect is equivalent to the sample by sample loop."""
+        rnd = np.random.RandomState(0)
+        time = np.arange(3000) / 100.
+        noisy = np.sin(2 * np.pi * time) + .3 * rnd.randn(len(time))
+        y_axis = [signal, noisy, rnd.randn(3000), np.cumsum(rnd.randn(3000))]
+        for y in y_axis:
+            for kw in [dict(lookahead=10, delta=.5, threshold=None),
+                       dict(lookahead=25, delta=0., threshold=None),
+                       dict(lookahead=10, delta=.2, threshold='auto'),
+                       dict(lookahead=3, delta=.1, threshold=.5)]:
+                for get in ['min', 'max']:
+                    ref = _peakdetect_ref(y, get, **kw)
+                    index, number, _ = peakdetect(sf, y, get=get, **kw)
+                    np.testing.assert_array_equal(index, ref)
+                    assert number == len(ref)
+        # Minmax (same number of min and max) :
+        kw = dict(lookahead=20, delta=.5, threshold='auto')
+        ref = _peakdetect_ref(np.cos(2 * np.pi * time), 'minmax', **kw)
+        index = peakdetect(sf, np.cos(2 * np.pi * time), get='minmax', **kw)
+        np.testing.assert_array_equal(index[0], ref)
+        # Integer data :
+        y_int = (10 * noisy).astype(int)
+        kw = dict(lookahead=10, delta=5, threshold=None)
+        np.testing.assert_array_equal(peakdetect(sf, y_int, **kw)[0],
+                                      _peakdetect_ref(y_int, 'max', **kw))
+
+    def test_peakdetect_multichannel(self):
+        """Test function peakdetect on multi-channel data."""
+        rnd = np.random.RandomState(1)
+        data = np.cumsum(rnd.randn(4, 2000), axis=1)
+        kw = dict(lookahead=15, delta=1., threshold=None, get='min')
+        index, number, density = peakdetect(sf, data, **kw)
+        assert len(index) == 4 and number.shape == density.shape == (4,)
+        for k in range(4):
+            np.testing.assert_array_equal(index[k],
+                                          peakdetect(sf, data[k, :], **kw)[0])
+
+    @pytest.mark.slow
+    def test_peakdetect_benchmark(self):
+        """Benchmark peakdetect against the sample by sample loop.
+
+        Both timings are logged (no assertion on timings, only on the
+        equivalence of the outputs).
+        """
+        rnd = np.random.RandomState(2)
+        sf_b = 256.
+        time = np.arange(int(10 * 60 * sf_b)) / sf_b  # 10 minutes
+        y = np.sin(2 * np.pi * time) + .2 * rnd.randn(len(time))
+        kw = dict(lookahead=64, delta=.5, threshold=None)
+        t_start = perf_counter()
+        ref = _peakdetect_ref(y, 'max', **kw)
+        t_ref = perf_counter() - t_start
+        t_start = perf_counter()
+        index = peakdetect(sf_b, y, get='max', **kw)[0]
+        t_vec = perf_counter() - t_start
+        logger.info("peakdetect on %i samples : %.3fs (sample by sample "
+                    "loop : %.3fs)" % (len(y), t_vec, t_ref))
+        np.testing.assert_array_equal(index, ref)
@@ -2,7 +2,12 @@
 import numpy as np
 
 from visbrain.utils.sleep.event import (_events_distance_fill,
-                                        _events_to_index, _index_to_events)
+                                        _events_to_index, _index_to_events,
+                                        _mask_to_events, _events_to_mask,
+                                        _events_union, _events_merge,
+                                        _events_intersect, _events_extend,
+                                        _events_duration_filter,
+                                        _events_ptp, _events_mean)
 
 
 class TestEvent(object):
@@ -20,15 +25,86 @@ class TestEvent(object):
         idx_stop = np.array([50, 75, 200])
         return data, idx_sup_thr, idx_start, idx_stop
 
+    @staticmethod
+    def _get_mask(n_pts=1000, random_state=0):
+        rnd = np.random.RandomState(random_state)
+        return np.repeat(rnd.rand(int(n_pts / 10)) > .5, 10)
+
     def test_events_distance_fill(self):
         """Test function events_distance_fill."""
-        _events_distance_fill(self._get_index(), 200., 100.)
+        filled = _events_distance_fill(self._get_index(), 50., 100.)
+        np.testing.assert_array_equal(filled, np.arange(20))
+        filled = _events_distance_fill(self._get_index(), 40., 100.)
+        assert np.array_equal(filled, np.r_[np.arange(11), np.arange(14, 20)])
 
     def test_event_to_index(self):
         """Test function event_to_index."""
-        _events_to_index(self._get_index())
+        ev = _events_to_index(self._get_index())
+        np.testing.assert_array_equal(ev, [[0, 4], [7, 10], [14, 19]])
+        assert _events_to_index(np.array([])).shape == (0, 2)
 
     def test_index_to_event(self):
         """Test function index_to_event."""
         idx = _events_to_index(self._get_index())
-        _index_to_events(idx)
+        np.testing.assert_array_equal(_index_to_events(idx),
+                                      self._get_index())
+
+    def test_mask_to_events(self):
+        """Test functions mask_to_events and events_to_mask."""
+        mask = self._get_mask()
+        ev = _mask_to_events(mask)
+        np.testing.assert_array_equal(ev, _events_to_index(np.where(mask)[0]))
+        np.testing.assert_array_equal(_events_to_mask(ev, len(mask)), mask)
+
+    def test_events_union(self):
+        """Test function events_union."""
+        ev = np.array([[10, 20], [0, 5], [15, 30], [31, 33], [40, 41]])
+        np.testing.assert_array_equal(_events_union(ev),
+                                      [[0, 5], [10, 33], [40, 41]])
+
+    def test_events_merge(self):
+        """Test function events_merge."""
+        idx = self._get_index()
+        for dist in [10., 30., 50.]:
+            ev = _events_merge(_events_to_index(idx), dist, 100.)
+            idx_f = _events_distance_fill(idx, dist, 100.)
+            np.testing.assert_array_equal(ev, _events_to_index(idx_f))
+
+    def test_events_intersect(self):
+        """Test function events_intersect."""
+        m_1, m_2 = self._get_mask(), self._get_mask(random_state=1)
+        m_2[::7] = False
+        ev = _events_intersect(_mask_to_events(m_1), m_2)
+        np.testing.assert_array_equal(_events_to_mask(ev, len(m_1)),
+                                      m_1 & m_2)
+        ev_2 = _events_intersect(_mask_to_events(m_1), _mask_to_events(m_2))
+        np.testing.assert_array_equal(ev, ev_2)
+
+    def test_events_extend(self):
+        """Test function events_extend."""
+        soft = np.array([[5, 20], [30, 60], [70, 75]])
+        hard = np.array([[10, 12], [15, 16], [40, 50], [72, 72]])
+        np.testing.assert_array_equal(_events_extend(hard, soft),
+                                      [[5, 19], [30, 59], [70, 74]])
+        # Hard event without soft crossing after it :
+        assert _events_extend(np.array([[80, 81]]), soft).shape == (0, 2)
+
+    def test_events_duration_filter(self):
+        """Test function events_duration_filter."""
+        ev = _events_to_index(self._get_index())
+        np.testing.assert_array_equal(
+            _events_duration_filter(ev, 100., 35., 45.), [[0, 4]])
+        np.testing.assert_array_equal(
+            _events_duration_filter(ev, 100., tmin=35.), [[0, 4], [14, 19]])
+
+    def test_events_reduce(self):
+        """Test functions events_ptp and events_mean."""
+        x = np.random.rand(1000)
+        mask = self._get_mask()
+        mask[-5:] = True  # last event ends with the signal
+        ev = _mask_to_events(mask)
+        ptp = [np.ptp(x[k:i + 1]) for k, i in ev]
+        mean = [np.mean(x[k:i + 1]) for k, i in ev]
+        np.testing.assert_array_almost_equal(_events_ptp(x, ev), ptp)
+        np.testing.assert_array_almost_equal(_events_mean(x, ev), mean)
+        assert _events_ptp(x, np.zeros((0, 2))).shape == (0,)
@@ -0,0 +1,59 @@
+"""Test functions in connectivity.py."""
+import numpy as np
+
+from visbrain.utils.connectivity import (filter_edges, nodes_hierarchy,
+                                         hierarchical_bundling)
+
+
+nodes = np.random.uniform(-20., 20., (50, 3))
+rows, cols = np.triu_indices(50, 1)
+values = np.random.rand(len(rows))
+
+
+class TestConnectivity(object):
+    """Test functions in connectivity.py."""
+
+    def test_filter_edges(self):
+        """Test function filter_edges."""
+        assert filter_edges(values).all()
+        keep = filter_edges(values, threshold=.5)
+        assert np.array_equal(keep, values >= .5)
+        keep = filter_edges(values, top_k=10)
+        assert keep.sum() == 10
+        assert values[keep].min() >= values[~keep].max()
+        keep_np = filter_edges(values, threshold=np.float32(.5),
+                               top_k=np.int64(10))
+        assert np.array_equal(keep_np, filter_edges(values, .5, 10))
+        keep = filter_edges(values, threshold=.5, top_k=10 ** 6)
+        assert np.array_equal(keep, values >= .5)
+        # No edge kept :
+        assert not filter_edges(np.arange(6.), top_k=0).any()
+        assert not filter_edges(values, top_k=-1).any()
+        assert not filter_edges(values, threshold=2.).any()
+
+    def test_nodes_hierarchy(self):
+        """Test function nodes_hierarchy."""
+        labels, centroids = nodes_hierarchy(nodes, 3)
+        assert labels.shape == (4, 50) and len(centroids) == 4
+        assert (labels[0, :] == 0).all()
+        # Clusters are nested and balanced :
+        for lev in range(1, 4):
+            assert np.array_equal(labels[lev, :] // 2, labels[lev - 1, :])
+            assert centroids[lev].shape == (2 ** lev, 3)
+        counts = np.bincount(labels[-1, :])
+        assert counts.max() - counts.min() <= 1
+
+    def test_hierarchical_bundling(self):
+        """Test function hierarchical_bundling."""
+        lines = hierarchical_bundling(nodes, rows, cols, n_points=15)
+        assert lines.shape == (len(rows), 15, 3)
+        np.testing.assert_almost_equal(lines[:, 0, :], nodes[rows], 4)
+        np.testing.assert_almost_equal(lines[:, -1, :], nodes[cols], 4)
+        # beta=0. gives straight lines :
+        lines = hierarchical_bundling(nodes, rows, cols, beta=0.)
+        u = nodes[cols] - nodes[rows]
+        u /= np.linalg.norm(u, axis=1, keepdims=True)
+        v = lines - nodes[rows][:, np.newaxis, :]
+        ortho = v - (v * u[:, np.newaxis, :]).sum(2, keepdims=True) * u[
+            :, np.newaxis, :]
+        np.testing.assert_almost_equal(ortho, 0., 3)
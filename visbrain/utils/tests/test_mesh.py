@@ -3,7 +3,8 @@ import numpy as np
 
 from visbrain.utils.mesh import (convert_meshdata, vispy_array, volume_to_mesh,
                                  mesh_edges, smoothing_matrix,
-                                 laplacian_smoothing)
+                                 laplacian_smoothing, mesh_isolines,
+                                 mesh_decimation)
 
 
 class TestMesh(object):
@@ -72,3 +73,59 @@ class TestMesh(object):
         self._creation()
         laplacian_smoothing(self.vertices, self.faces)
         laplacian_smoothing(self.vertices, self.faces, n_neighbors=3)
+
+    def test_mesh_isolines(self):
+        """Test function mesh_isolines."""
+        # Regular grid where data = x + .3 * y :
+        x, y = np.meshgrid(np.linspace(0., 1., 30), np.linspace(0., 1., 30))
+        vertices = np.c_[x.ravel(), y.ravel(), np.zeros((900,))]
+        idx = np.arange(900).reshape(30, 30)
+        faces = np.r_[np.c_[idx[:-1, :-1].ravel(), idx[1:, :-1].ravel(),
+                            idx[:-1, 1:].ravel()],
+                      np.c_[idx[1:, 1:].ravel(), idx[1:, :-1].ravel(),
+                            idx[:-1, 1:].ravel()]]
+        data = vertices[:, 0] + .3 * vertices[:, 1]
+        levels = np.array([.25, .5, .75])
+        segments, seg_levels = mesh_isolines(vertices, faces, data, levels)
+        assert segments.shape == (2 * len(seg_levels), 3)
+        # Points are on the level :
+        d_seg = segments[:, 0] + .3 * segments[:, 1]
+        np.testing.assert_allclose(d_seg, np.repeat(levels[seg_levels], 2),
+                                   atol=1e-6)
+        # Length of isolines :
+        seg = segments.reshape(-1, 2, 3)
+        length = np.linalg.norm(seg[:, 0, :] - seg[:, 1, :], axis=1)
+        np.testing.assert_allclose(length[seg_levels == 1].sum(),
+                                   np.sqrt(1. + .3 ** 2), rtol=1e-5)
+        # Faces with NaN are ignored :
+        data[data < .4] = np.nan
+        seg_levels = mesh_isolines(vertices, faces, data, levels)[1]
+        assert not np.any(seg_levels == 0)
+
+    def test_mesh_decimation(self):
+        """Test function mesh_decimation."""
+        # Regular grid of 40x40 vertices (two hemispheres) :
+        x, y = np.meshgrid(np.linspace(0., 1., 40), np.linspace(0., 1., 40))
+        vertices = np.c_[x.ravel(), y.ravel(), np.zeros((1600,))]
+        idx = np.arange(1600).reshape(40, 40)
+        faces = np.r_[np.c_[idx[:-1, :-1].ravel(), idx[1:, :-1].ravel(),
+                            idx[:-1, 1:].ravel()],
+                      np.c_[idx[1:, 1:].ravel(), idx[1:, :-1].ravel(),
+                            idx[:-1, 1:].ravel()]]
+        lr_index = vertices[:, 0] < .5
+        # Fixed voxel size :
+        v, f, index = mesh_decimation(vertices, faces, voxel_size=.1)
+        assert len(v) == index.max() + 1 < len(vertices)
+        assert index.shape == (1600,) and f.max() < len(v)
+        assert np.all(np.diff(np.sort(f, axis=1), axis=1))  # no degenerated
+        assert len(np.unique(np.sort(f, axis=1), axis=0)) == len(f)
+        # Decimated vertices are the mean of clustered vertices :
+        np.testing.assert_allclose(v[index[0], :],
+                                   vertices[index == index[0], :].mean(0),
+                                   atol=1e-6)
+        # Target number of vertices and hemispheres :
+        v, f, index = mesh_decimation(vertices, faces, n_vertices=200,
+                                      lr_index=lr_index)
+        assert abs(len(v) - 200) <= 20
+        for k in range(len(v)):
+            assert len(np.unique(lr_index[index == k])) == 1
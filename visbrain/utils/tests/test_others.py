@@ -1,5 +1,5 @@
 """Test functions in others.py."""
-from visbrain.utils.others import (get_dsf, set_if_not_none)
+from visbrain.utils.others import (get_dsf, set_if_not_none, ring_slices)
 from visbrain.io.path import get_data_path
 
 
@@ -18,6 +18,12 @@ class TestOthers(object):
         assert set_if_not_none(a, 10., False) == 5.
         assert set_if_not_none(a, 10.) == 10.
 
+    def test_ring_slices(self):
+        """Test function ring_slices."""
+        assert ring_slices(2, 3, 10) == [(2, 5)]
+        assert ring_slices(8, 3, 10) == [(8, 10), (0, 1)]
+        assert ring_slices(8, 20, 10) == [(8, 10), (0, 8)]
+
     def test_get_data_path(self):
         """Test function get_data_path."""
         assert isinstance(get_data_path(), str)
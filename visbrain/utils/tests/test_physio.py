@@ -3,7 +3,7 @@ import numpy as np
 
 from visbrain.utils.physio import (find_non_eeg, rereferencing, bipolarization,
                                    commonaverage, tal2mni, mni2tal,
-                                   generate_eeg)
+                                   generate_eeg, Montage, chunk_stats)
 
 
 class TestPhysio(object):
@@ -48,6 +48,71 @@ class TestPhysio(object):
         data_r, chan_r, consider = commonaverage(data, channels, ignore)
         assert chan_r == ['Cz-m', 'Pz-m', 'Fz-m', 'EOG']
 
+    def test_montage(self):
+        """Test the Montage object."""
+        data, channels, ignore = self._generate_eeg_dataset('eeg')
+        data_ori = data.copy()
+        montage = Montage(channels)
+        assert montage.is_identity
+        # Single reference (explicitly computed) :
+        m_ref = montage.rereferencing(1, ignore)
+        data_r = data.copy()
+        data_r[0:3, :] -= data[[1], :]
+        np.testing.assert_array_almost_equal(m_ref.apply(data), data_r)
+        # Common average :
+        m_car = montage.commonaverage(ignore)
+        data_r = data.copy()
+        data_r[0:3, :] -= data[0:3, :].mean(0, keepdims=True)
+        np.testing.assert_array_almost_equal(m_car.apply(data), data_r)
+        assert m_car.channels == ['Cz-m', 'Pz-m', 'Fz-m', 'EOG']
+        # Stacked montages :
+        m_stack = m_car.rereferencing(0)
+        m_second = Montage(m_car.channels).rereferencing(0)
+        np.testing.assert_array_almost_equal(
+            m_stack.apply(data), m_second.apply(m_car.apply(data)))
+        assert m_stack.channels == m_second.channels
+        # Data are never modified :
+        rereferencing(data, channels, 1, ignore)
+        bipolarization(data, channels, ignore)
+        commonaverage(data, channels, ignore)
+        np.testing.assert_array_equal(data, data_ori)
+
+    def test_montage_data(self):
+        """Test the lazy MontageData view."""
+        data, channels, ignore = self._generate_eeg_dataset('intra')
+        montage = Montage(channels).bipolarization(ignore)
+        full, view = montage.apply(data), montage.view(data)
+        sl, idx = slice(10, 20), np.array([2, 8, 50])
+        mask = np.array([True, False, True, False])
+        np.testing.assert_array_almost_equal(view[:, sl], full[:, sl])
+        np.testing.assert_array_almost_equal(view[2, :], full[2, :])
+        np.testing.assert_array_almost_equal(view[1, idx], full[1, idx])
+        np.testing.assert_array_almost_equal(view[mask, sl], full[mask, sl])
+        np.testing.assert_array_almost_equal(view[3, ...], full[3, :])
+        np.testing.assert_array_almost_equal(view.std(1), full.std(1))
+        stats = view.stats(chunk=7)
+        for k in ['min', 'max', 'mean', 'std']:
+            np.testing.assert_array_almost_equal(stats[k], getattr(full, k)(1))
+        np.testing.assert_array_almost_equal(stats['dist'], np.ptp(full, 1))
+        assert view.shape == full.shape
+        # Identity montage :
+        view = Montage(channels).view(data)
+        np.testing.assert_array_equal(view[mask, sl], data[mask, sl])
+        np.testing.assert_array_equal(view.min(1), data.min(1))
+
+    def test_chunk_stats(self):
+        """Test function chunk_stats."""
+        rnd = np.random.RandomState(0)
+        data = 1e3 * rnd.rand(5, 1000) + 1e4
+        # Single pass statistics (with a last incomplete chunk) :
+        stats = chunk_stats(data, chunk=300)
+        for k in ['min', 'max', 'mean', 'std']:
+            np.testing.assert_allclose(stats[k], getattr(data, k)(1),
+                                       rtol=1e-5)
+        np.testing.assert_allclose(stats['dist'], np.ptp(data, 1), rtol=1e-5)
+        stats = chunk_stats(data.astype(np.float32), chunk=300)
+        assert all([k.dtype == np.float32 for k in stats.values()])
+
     def test_tal2mni(self):
         """Test function tal2mni."""
         xyz = self._generate_coordinates()
@@ -1,7 +1,7 @@
 """Test functions in physio.py."""
 import numpy as np
 
-from visbrain.utils.picture import (piccrop, picresize)
+from visbrain.utils.picture import (picbbox, piccrop, picresize)
 
 
 class TestPicture(object):
@@ -23,6 +23,27 @@ class TestPicture(object):
                                 [0., 1., 0.]])
         assert np.array_equal(piccrop(pic, margin=0), destination)
 
+    def test_picbbox(self):
+        """Test function picbbox."""
+        pic = np.full((40, 50, 4), 255, dtype=np.uint8)
+        pic[10:20, 5:30, 0] = 0
+        pic[25, 12, 0:3] = (0, 0, 255)
+        pic[..., 3] = np.random.RandomState(0).randint(0, 256, (40, 50))
+        box = picbbox(pic, margin=0)
+        assert box == (slice(10, 26), slice(5, 30))
+        assert picbbox(pic, margin=3) == (slice(7, 29), slice(2, 33))
+        assert picbbox(pic, margin=20) == (slice(0, 40), slice(0, 50))
+        # Block processing, RGB, float and grayscale pictures :
+        assert picbbox(pic, margin=0, chunk=120) == box
+        assert picbbox(pic[..., 0:3].copy(), margin=0) == box
+        assert picbbox(pic.astype(float), margin=0) == box
+        assert picbbox(pic[..., 1], margin=0) == (slice(25, 26), slice(12, 13))
+        # Uniform picture :
+        assert picbbox(pic[0:5, 30:, :], margin=0) == (slice(0, 5),
+                                                       slice(0, 20))
+        # Crop using the bounding box :
+        np.testing.assert_array_equal(piccrop(pic, box=box), pic[10:26, 5:30])
+
     def test_picresize(self):
         """Test function picresize."""
         shapes = [(10, 20), (30, 40), (50, 60)]
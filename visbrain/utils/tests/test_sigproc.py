@@ -1,10 +1,11 @@
 """Test functions in sigproc.py."""
 import numpy as np
 from itertools import product
+from tempfile import NamedTemporaryFile
 
 from visbrain.utils.sigproc import (normalize, derivative, tkeo, zerocrossing,
                                     power_of_ten, averaging, normalization,
-                                    smoothing, smooth_3d)
+                                    smoothing, smooth_3d, minmax_decimate)
 
 
 class TestSigproc(object):
@@ -72,3 +73,30 @@ class TestSigproc(object):
         """Test function smooth_3d."""
         x = np.random.rand(10, 20, 30)
         smooth_3d(x)
+
+    def test_minmax_decimate(self):
+        """Test function minmax_decimate."""
+        x = np.random.rand(3, 1003, 2).astype(np.float32)
+        # Short data are not decimated :
+        dec, index = minmax_decimate(x, 2000, axis=1)
+        assert np.array_equal(dec, x)
+        assert np.array_equal(index, np.arange(1003))
+        # Compare with extrema computed on each bin :
+        dec, index = minmax_decimate(x, 100, axis=1)
+        assert dec.shape == (3, 96, 2) and dec.dtype == np.float32
+        assert np.array_equal(index[::2], np.arange(48) * 21)
+        for k, start in enumerate(index[::2]):
+            assert np.array_equal(dec[:, 2 * k, :],
+                                  x[:, start:start + 21, :].min(1))
+            assert np.array_equal(dec[:, 2 * k + 1, :],
+                                  x[:, start:start + 21, :].max(1))
+        # Decimate by chunks of bins :
+        for budget in [1., 1e4]:
+            dec_c, _ = minmax_decimate(x, 100, axis=1, mem_budget=budget)
+            assert np.array_equal(dec, dec_c)
+        # Memory-mapped data :
+        with NamedTemporaryFile(suffix='.npy') as f:
+            np.save(f.name, x)
+            x_mm = np.load(f.name, mmap_mode='r')
+            dec_mm, _ = minmax_decimate(x_mm, 100, axis=1, mem_budget=1e4)
+            assert np.array_equal(dec, dec_mm)
@@ -19,6 +19,7 @@ from vispy.visuals import Visual
 import vispy.visuals.transforms as vist
 from vispy.scene.visuals import create_visual_node
 
+from .cmap_lut import CmapLUT
 from ..utils import (array2colormap, color2vb, convert_meshdata, vispy_array,
                      wrap_properties)
 
@@ -33,10 +34,14 @@ VERT_SHADER = """
 varying vec3 v_position;
 varying vec4 v_color;
 varying vec3 v_normal;
+varying float v_data;
+varying float v_cmap;
 
 void main() {
     v_position = $a_position;
     v_normal = $a_normal;
+    v_data = $a_data;
+    v_cmap = 0.;
 
     // Mask : (0. = (white, sulcus), 1. = color, 2. = mask_color)
     // Sulcus : (0. = white, sulcus = gray)
@@ -54,6 +59,8 @@ void main() {
     else if ($a_mask == 1.)
     {
         v_color = $a_color;
+        // Scalar data colored in the fragment shader :
+        v_cmap = $u_use_cmap;
     }
     else if ($a_mask == 2.)
     {
@@ -76,11 +83,21 @@ FRAG_SHADER = """
 varying vec3 v_position;
 varying vec4 v_color;
 varying vec3 v_normal;
+varying float v_data;
+varying float v_cmap;
 
 void main() {
 
+    // ----------------- Color -----------------
+    // Get the color from the colormap LUT (scalar data) :
+    vec4 color = v_color;
+    if (v_cmap > .5)
+    {
+        color = $cmap(v_data) * $u_light_color;
+    }
+
     // ----------------- Ambient light -----------------
-    vec3 ambientLight = $u_coef_ambient * v_color.rgb * $u_light_intensity;
+    vec3 ambientLight = $u_coef_ambient * color.rgb * $u_light_intensity;
 
 
     // ----------------- Diffuse light -----------------
@@ -94,7 +111,7 @@ void main() {
     brightness = max(min(brightness, 1.0), 0.0);
 
     // Get diffuse light :
-    vec3 diffuseLight =  v_color.rgb * brightness * $u_light_intensity;
+    vec3 diffuseLight =  color.rgb * brightness * $u_light_intensity;
 
 
     // ----------------- Specular light -----------------
@@ -142,6 +159,10 @@ class BrainVisual(Visual):
         * 1. : custom colors (e.g projection, activation...)
         * 2. : uniform mask color (e.g non-significant p-values...)
 
+    Custom colors can either be RGBA colors (see `color`) or scalar data (see
+    `set_scalar`). In the second case, the colormap is applied on the GPU and
+    can be updated without transferring data (see `set_colormap`).
+
     Parameters
     ----------
     vertices : array_like | None
@@ -200,6 +221,8 @@ class BrainVisual(Visual):
         self._translucent = True
         self._alpha = alpha
         self._hemisphere = hemisphere
+        self._is_scalar = False
+        self._cmap_lut = CmapLUT()
 
         # Initialize the vispy.Visual class with the vertex / fragment buffer :
         Visual.__init__(self, vcode=VERT_SHADER, fcode=FRAG_SHADER)
@@ -213,6 +236,7 @@ class BrainVisual(Visual):
         def_4 = np.zeros((0, 4), dtype=np.float32)
         self._vert_buffer = gloo.VertexBuffer(def_3)
         self._color_buffer = gloo.VertexBuffer(def_4)
+        self._data_buffer = gloo.VertexBuffer(np.zeros((0,), np.float32))
         self._normals_buffer = gloo.VertexBuffer(def_3)
         self._mask_buffer = gloo.VertexBuffer()
         self._sulcus_buffer = gloo.VertexBuffer()
@@ -222,6 +246,9 @@ class BrainVisual(Visual):
         self.shared_program.vert['a_position'] = self._vert_buffer
         self.shared_program.vert['a_color'] = self._color_buffer
         self.shared_program.vert['a_normal'] = self._normals_buffer
+        self.shared_program.vert['a_data'] = self._data_buffer
+        self.shared_program.vert['u_use_cmap'] = 0.
+        self.shared_program.frag['cmap'] = self._cmap_lut.fcn
         self.shared_program.frag['u_alpha'] = alpha
 
         # _________________ DATA / CAMERA / LIGHT _________________
@@ -314,6 +341,7 @@ class BrainVisual(Visual):
         self.shared_program.vert['a_sulcus'] = self._sulcus_buffer
         # Color :
         self.color = np.ones((len(self), 4), dtype=np.float32)
+        self._data_buffer.set_data(np.zeros((len(self),), np.float32))
 
     def set_color(self, data=None, color='white', alpha=1.0, **kwargs):
         """Set specific colors on the brain.
@@ -348,6 +376,44 @@ class BrainVisual(Visual):
         self._color_buffer.set_data(vispy_array(col))
         self.update()
 
+    def set_scalar(self, data):
+        """Set scalar data to the brain, colored on the GPU.
+
+        Data are only sent once. Then, use the `set_colormap` method to
+        update the colormap, the colorbar limits and the under / over colors.
+        Vertices that are displayed using the colormap are those for which
+        the mask is 1.
+
+        Parameters
+        ----------
+        data : array_like
+            Vector of data of shape (n_vertices,). For masked arrays, masked
+            values are replaced by the minimum of data.
+        """
+        if isinstance(data, np.ma.MaskedArray):
+            data = data.filled(data.min())
+        data = np.asarray(data).ravel()
+        assert len(data) == len(self)
+        self._data_buffer.set_data(data.astype(np.float32))
+        self._is_scalar = True
+        self.shared_program.vert['u_use_cmap'] = 1.
+        self.update()
+
+    def set_colormap(self, **kwargs):
+        """Update the colormap used for scalar data.
+
+        This method only update uniforms (and the colormap texture if the
+        colormap name changed).
+
+        Parameters
+        ----------
+        kwargs : dict | {}
+            Colormap arguments (cmap, clim, vmin, under, vmax, over, alpha).
+            See the `array2colormap` function.
+        """
+        self._cmap_lut.set_colormap(**kwargs)
+        self.update()
+
     def set_alpha(self, alpha, index=None):
         """Set transparency to the brain.
 
@@ -390,6 +456,7 @@ class BrainVisual(Visual):
         self._vert_buffer.delete()
         self._index_buffer.delete()
         self._color_buffer.delete()
+        self._data_buffer.delete()
         self._normals_buffer.delete()
 
     # =======================================================================
@@ -462,9 +529,18 @@ class BrainVisual(Visual):
         assert isinstance(value, np.ndarray) and value.ndim == 2
         assert value.shape[0] == len(self)
         self._color_buffer.set_data(value.astype(np.float32))
+        # RGBA colors replace scalar data :
+        self._is_scalar = False
+        self.shared_program.vert['u_use_cmap'] = 0.
         self.update()
         # self._color = value
 
+    # ----------- IS_SCALAR -----------
+    @property
+    def is_scalar(self):
+        """Get if the custom colors are defined using scalar data."""
+        return self._is_scalar
+
     # ----------- MASK -----------
     @property
     def mask(self):
@@ -583,6 +659,7 @@ class BrainVisual(Visual):
         """Set light_color value."""
         assert len(value) == 4
         self.shared_program.vert['u_light_color'] = value
+        self.shared_program.frag['u_light_color'] = value
         self._light_color = value
         self.update()
 
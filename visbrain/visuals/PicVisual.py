@@ -8,7 +8,7 @@ import numpy as np
 
 from vispy import gloo, visuals, scene
 
-from ..utils import array2colormap
+from ..utils import array2colormap, ring_slices
 
 __all__ = ('PicMesh')
 
@@ -50,6 +50,8 @@ class PicVisual(visuals.Visual):
         self._pos = pos
         self._dxyz = np.array(dxyz)
         self.camera = []
+        self._select = select
+        self._head = 0
 
         visuals.Visual.__init__(self, VERT_SHADER, FRAG_SHADER)
 
@@ -73,8 +75,8 @@ class PicVisual(visuals.Visual):
         # Re-order data :
         self._data = data.ravel()[np.argsort(grid.ravel())]
         # Define the color buffer :
-        color = np.zeros((self._data.shape[0], 4), dtype=np.float32)
-        self._color_buffer = gloo.VertexBuffer(color)
+        self._color = np.zeros((self._data.shape[0], 4), dtype=np.float32)
+        self._color_buffer = gloo.VertexBuffer(self._color)
         self.shared_program.vert['a_color'] = self._color_buffer
         self.shared_program.frag['u_alpha'] = alpha
         self.alpha = alpha
@@ -198,10 +200,55 @@ class PicVisual(visuals.Visual):
         if needupdate:
             a_position = self._data_to_pos(self._pos)
             self._pos_buffer.set_data(a_position)
-        # Update color properties :
-        color = array2colormap(self._data, **kwargs)
+        # Update color properties (the clim is kept for streaming) :
+        self._cmap_kwargs = kwargs.copy()
+        if kwargs.get('clim', None) is None:
+            self._cmap_kwargs['clim'] = (self._data.min(), self._data.max())
+        self._color = array2colormap(self._data, **self._cmap_kwargs)
         # Send the color to the buffer :
-        self._color_buffer.set_data(color)
+        self._color_buffer.set_data(self._color)
+        self.update()
+
+    def append(self, data):
+        """Append new columns to the pictures (streaming).
+
+        Columns of pictures are used as a ring buffer. New columns replace the
+        oldest ones (sweep display) and only the colors of the modified
+        columns are sent to the GPU.
+
+        Parameters
+        ----------
+        data : array_like
+            New columns of shape (n_sources, n_rows, n_new_columns). Only
+            scalar data are supported (colors are computed using the
+            colormap of the pictures).
+        """
+        if np.ndim(data) != 3:
+            raise ValueError("New columns should be an array of scalar data "
+                             "of shape (n_sources, n_rows, n_new_columns) "
+                             "(RGBA columns are not supported).")
+        if isinstance(self._select, (list, np.ndarray)):
+            data = data[self._select, ...]
+        nr, nc = self.nrows, self.ncols
+        assert data.shape[0:2] == (len(self), nr)
+        n_new = min(data.shape[2], nc)
+        data = data[..., -n_new:]
+        cols = (self._head + np.arange(n_new)) % nc
+        # Vertex index of each (picture, row, column) :
+        v_pic = np.arange(len(self)).reshape(-1, 1, 1) * nr * nc
+        v_col = (nc - 1 - cols).reshape(1, 1, -1) * nr
+        v_idx = (v_pic + v_col + np.arange(nr).reshape(1, -1, 1)).ravel()
+        self._data[v_idx] = data.ravel()
+        self._color[v_idx, :] = array2colormap(data.ravel(),
+                                               **self._cmap_kwargs)
+        # Columns are stored in reverse order inside each picture :
+        for start, stop in ring_slices(self._head, n_new, nc):
+            for k in range(len(self)):
+                v_start = k * nr * nc + (nc - stop) * nr
+                v_stop = k * nr * nc + (nc - start) * nr
+                self._color_buffer.set_subdata(self._color[v_start:v_stop],
+                                               offset=v_start)
+        self._head = (self._head + n_new) % nc
         self.update()
 
     # ----------- ALPHA -----------
@@ -0,0 +1,178 @@
+"""Line visual with persistent buffers that can be partially updated.
+
+Contrary to the vispy's Line visual, this visual owns its vertex and index
+buffers. Sub-ranges of those buffers can then be updated (see set_subdata)
+without re-uploading the full line (e.g. for streaming time-series).
+"""
+import numpy as np
+
+from vispy import gloo, visuals
+from vispy.scene.visuals import create_visual_node
+
+from ..utils import color2vb
+
+
+__all__ = ('StreamLine')
+
+
+VERT_SHADER = """
+#version 120
+attribute vec3 a_position;
+
+void main() {
+    gl_Position = $transform(vec4(a_position, 1.0));
+}
+"""
+
+FRAG_SHADER = """
+#version 120
+
+void main() {
+    gl_FragColor = $u_color;
+}
+"""
+
+
+class StreamLineVisual(visuals.Visual):
+    """Visual class for lines with partially updatable buffers.
+
+    Parameters
+    ----------
+    pos : array_like | None
+        Array of positions of shape (n_vertices, 3).
+    connect : array_like | None
+        Array of segments of shape (n_segments, 2).
+    color : array_like/tuple/string | 'white'
+        Line color.
+    width : float | 1.
+        Line width.
+    antialias : bool | False
+        Use smooth lines.
+    """
+
+    def __init__(self, pos=None, connect=None, color='white', width=1.,
+                 antialias=False):
+        """Init."""
+        self._width = width
+        self._antialias = antialias
+        self._color = None
+        self._pos_buffer = gloo.VertexBuffer(np.zeros((0, 3), np.float32))
+        self._connect_buffer = gloo.IndexBuffer(np.zeros((0,), np.uint32))
+        self._n_connect = 0
+
+        visuals.Visual.__init__(self, VERT_SHADER, FRAG_SHADER)
+        self.shared_program['a_position'] = self._pos_buffer
+        self.set_gl_state('translucent')
+        self._draw_mode = 'lines'
+        self._index_buffer = self._connect_buffer
+        self.set_data(pos, connect, color)
+        self.freeze()
+
+    def set_data(self, pos=None, connect=None, color=None):
+        """Set (and fully upload) line data.
+
+        Parameters
+        ----------
+        pos : array_like | None
+            Array of positions of shape (n_vertices, 3).
+        connect : array_like | None
+            Array of segments of shape (n_segments, 2).
+        color : array_like/tuple/string | None
+            Line color.
+        """
+        if pos is not None:
+            pos = np.ascontiguousarray(pos, dtype=np.float32)
+            self._pos_buffer.set_data(pos)
+        if connect is not None:
+            connect = np.ascontiguousarray(connect, dtype=np.uint32)
+            self._connect_buffer.set_data(connect)
+            self._n_connect = connect.size
+        if color is not None:
+            self.color = color
+        self.update()
+
+    def set_subdata(self, pos=None, connect=None, offset=0):
+        """Update a sub-range of the position or the index buffer.
+
+        Parameters
+        ----------
+        pos : array_like | None
+            Array of positions of shape (n, 3).
+        connect : array_like | None
+            Array of segments of shape (n, 2).
+        offset : int | 0
+            Offset (in number of vertices for pos and number of indices for
+            connect) of the sub-range.
+        """
+        if pos is not None:
+            pos = np.ascontiguousarray(pos, dtype=np.float32)
+            self._pos_buffer.set_subdata(pos, offset=offset)
+        if connect is not None:
+            connect = np.ascontiguousarray(connect, dtype=np.uint32)
+            self._connect_buffer.set_subdata(connect, offset=offset)
+        self.update()
+
+    def _prepare_transforms(self, view):
+        """Prepare transformation."""
+        view.view_program.vert['transform'] = view.transforms.get_transform()
+
+    def _prepare_draw(self, view):
+        """Function called everytime there's a camera update."""
+        width = view.transforms.pixel_scale * self._width
+        self.update_gl_state(line_width=max(width, 1.),
+                             line_smooth=bool(self._antialias))
+        return self._n_connect > 0
+
+    # ----------- COLOR -----------
+    @property
+    def color(self):
+        """Get the color value."""
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        """Set color value."""
+        self._color = color2vb(value).ravel()
+        self.shared_program.frag['u_color'] = self._color
+        self.update()
+
+    # ----------- ALPHA -----------
+    @property
+    def alpha(self):
+        """Get the alpha value."""
+        return self._color[-1]
+
+    @alpha.setter
+    def alpha(self, value):
+        """Set alpha value."""
+        self._color[-1] = value
+        self.shared_program.frag['u_color'] = self._color
+        self.update()
+
+    # ----------- WIDTH -----------
+    @property
+    def width(self):
+        """Get the width value."""
+        return self._width
+
+    @width.setter
+    def width(self, value):
+        """Set width value."""
+        self._width = value
+        self.update()
+
+    # ----------- ANTIALIAS -----------
+    @property
+    def antialias(self):
+        """Get the antialias value."""
+        return self._antialias
+
+    @antialias.setter
+    def antialias(self, value):
+        """Set antialias value."""
+        self._antialias = value
+        self.update()
+
+
+# Auto-generate a Visual+Node class for use in the scenegraph.
+StreamLine = create_visual_node(StreamLineVisual)
@@ -7,11 +7,10 @@ License: BSD (3-clause)
 import numpy as np
 
 import vispy.visuals.transforms as vist
-from vispy.scene.visuals import Image
 
 from ..visuals import CbarBase
-from ..utils import (morlet, array2colormap, vispy_array, averaging,
-                     normalization)
+from .cmap_lut import ScalarImage
+from ..utils import morlet, vispy_array, averaging, normalization
 
 
 __all__ = ('TFmapsMesh')
@@ -45,9 +44,9 @@ class TFmapsMesh(CbarBase):
         # Visualization of large images can occur GL bugs. So we fix a limit
         # number of time points :
         self._n_limits = 4000
-        # Initialize image object :
-        pos = np.random.rand(2, 2, 4)
-        self._image = Image(parent=parent, interpolation=interpolation)
+        # Initialize image object (colored on the GPU) :
+        pos = np.random.rand(2, 2)
+        self._image = ScalarImage(parent=parent, interpolation=interpolation)
         self._image.transform = vist.STTransform()
         self._image.set_data(pos)
 
@@ -111,18 +110,20 @@ class TFmapsMesh(CbarBase):
 
         # ======================= CLIM // CMAP =======================
         # Get contrast (if defined) :
+        self._minmax = (tf.min(), tf.max())
         self._clim = kwargs.get('clim', None)
         if isinstance(contrast, (int, float)) and (self._clim is None):
             self._clim = (tf.min() * contrast, tf.max() * contrast)
         if self._clim is None:
-            self._clim = (tf.min(), tf.max())
+            self._clim = self._minmax
         kwargs['clim'] = self._clim
         # Cmap :
         self._cmap = kwargs.get('cmap', 'viridis')
 
         # ======================= COLOR =======================
-        cmap = array2colormap(tf, **kwargs)
-        self._image.set_data(vispy_array(cmap))
+        # The TF map is sent once, the colormap is applied on the GPU :
+        self._image.set_data(vispy_array(tf))
+        self._image.set_colormap(**kwargs)
 
         # ======================= SCALE // TRANSLATE =======================
         # Scale and translate TF :
@@ -139,6 +140,18 @@ class TFmapsMesh(CbarBase):
         self.rect = (time[0], f_min, t_max - t_min, fr_max - fr_min)
         self.freqs = freqs
 
+    def set_colormap(self, **kwargs):
+        """Update the colormap without re-sending the TF map.
+
+        Parameters
+        ----------
+        kwargs : dict | {}
+            Colormap arguments (cmap, clim, vmin, under, vmax, over, alpha).
+        """
+        self._clim = kwargs.get('clim', self._clim)
+        self._cmap = kwargs.get('cmap', self._cmap)
+        self._image.set_colormap(**kwargs)
+
     def update(self):
         """Update image."""
         self._image.update()
@@ -1,9 +1,11 @@
 """Visual objects."""
 from .BrainVisual import BrainMesh  # noqa
 from .cbar import *  # noqa
+from .cmap_lut import CmapLUT, ScalarImage  # noqa
 from .GridSignalVisual import GridSignal  # noqa
 from .hypno_visual import Hypnogram  # noqa
 from .PicVisual import PicMesh  # noqa
+from .StreamLineVisual import StreamLine  # noqa
 from .TFmapsVisual import TFmapsMesh  # noqa
 from .TopoVisual import TopoMesh  # noqa
 
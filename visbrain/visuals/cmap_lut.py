@@ -0,0 +1,310 @@
+"""GPU colormapping using a 1-D lookup table.
+
+Scalar data (one float per vertex or per pixel) is sent once to the GPU. The
+colormap, the colorbar limits and the under / over colors are then applied in
+the shader, from a lookup table (LUT) texture and a few uniforms. Hence,
+changing the clim or the colormap doesn't require to re-compute and re-upload
+RGBA arrays.
+
+Authors: Etienne Combrisson <e.combrisson@gmail.com>
+
+License: BSD (3-clause)
+"""
+import numpy as np
+
+from matplotlib import cm
+
+from vispy import gloo
+from vispy.io import load_spatial_filters
+from vispy.visuals import Visual
+from vispy.visuals.shaders import Function
+from vispy.scene.visuals import create_visual_node
+
+from ..utils import color2vb
+
+
+__all__ = ('CmapLUT', 'ScalarImage')
+
+
+# Map a float to a RGBA color. Values under vmin (resp. over vmax) take the
+# under (resp. over) color. Others are normalized using clim and then used to
+# sample the LUT texture. Nearest sampling over the [0, 1] texture range
+# reproduces the matplotlib indexing int(t * n_colors).
+CMAP_LUT_GLSL = """
+vec4 cmap_lut(float x) {
+    if (($u_isvmin > .5) && (x < $u_vmin)) {
+        return $u_under;
+    }
+    if (($u_isvmax > .5) && (x > $u_vmax)) {
+        return $u_over;
+    }
+    float t = 0.;
+    if ($u_clim.y > $u_clim.x) {
+        t = clamp((x - $u_clim.x) / ($u_clim.y - $u_clim.x), 0., 1.);
+    }
+    return texture2D($u_lut, vec2(t, .5));
+}
+"""
+
+# Images are drawn as a textured quad. The single channel float texture is
+# sampled by a lookup function, then the LUT gives the color :
+IMAGE_VERT = """
+attribute vec2 a_position;
+attribute vec2 a_texcoord;
+varying vec2 v_texcoord;
+
+void main() {
+    v_texcoord = a_texcoord;
+    gl_Position = $transform(vec4(a_position, 0., 1.));
+}
+"""
+
+IMAGE_FRAG = """
+varying vec2 v_texcoord;
+
+void main() {
+    gl_FragColor = $cmap($lookup(v_texcoord).r);
+}
+"""
+
+# Texture lookup using the hardware interpolation (nearest or bilinear) :
+_TEXTURE_LOOKUP = """
+vec4 texture_lookup(vec2 texcoord) {
+    return texture2D($texture, texcoord);
+}
+"""
+
+# Texture lookup using a spatial filter of vispy (e.g bicubic, hanning) :
+_FILTERED_LOOKUP = """
+#include "misc/spatial-filters.frag"
+
+vec4 texture_lookup_filtered(vec2 texcoord) {
+    return %s($texture, $shape, texcoord);
+}
+"""
+
+
+class CmapLUT(object):
+    """Colormap lookup table applied on the GPU.
+
+    Parameters are the same as the ones of the `array2colormap` function.
+    """
+
+    def __init__(self, cmap='inferno', clim=None, alpha=1., vmin=None,
+                 vmax=None, under='dimgray', over='darkred'):
+        """Init."""
+        self._cmap = self._alpha = None
+        self._lut_data = np.zeros((2, 4), dtype=np.float32)
+        self._lut = gloo.Texture2D(np.zeros((1, 2, 4), dtype=np.float32),
+                                   interpolation='nearest',
+                                   wrapping='clamp_to_edge')
+        self.fcn = Function(CMAP_LUT_GLSL)
+        self.fcn['u_lut'] = self._lut
+        self.set_colormap(cmap, clim, alpha, vmin, vmax, under, over)
+
+    def set_colormap(self, cmap='inferno', clim=None, alpha=1., vmin=None,
+                     vmax=None, under='dimgray', over='darkred', **kwargs):
+        """Update the colormap.
+
+        Only the uniforms are updated, except if the colormap name or the
+        transparency change. In that case, the LUT texture (few hundreds
+        of colors) is also re-uploaded.
+
+        Parameters
+        ----------
+        cmap : string | inferno
+            Matplotlib colormap
+        clim : tuple/list | None
+            Limit of the colormap. If None, (0, 1) is used.
+        alpha : float | 1.0
+            The opacity to use.
+        vmin : float | None
+            Threshold from which every color will have the color defined using
+            the under parameter bellow.
+        vmax : float | None
+            Threshold from which every color will have the color defined using
+            the over parameter bellow.
+        under : tuple/string | 'dimgray'
+            Matplotlib color for values under vmin.
+        over : tuple/string | 'darkred'
+            Matplotlib color for values over vmax.
+        """
+        # LUT texture :
+        if (cmap != self._cmap) or (alpha != self._alpha):
+            mpl_cmap = cm.ScalarMappable(cmap=cmap).get_cmap()
+            lut = mpl_cmap(np.arange(mpl_cmap.N), alpha=alpha)
+            self._lut_data = lut.astype(np.float32)
+            self._lut.set_data(self._lut_data[np.newaxis, ...])
+            self._cmap, self._alpha = cmap, alpha
+        # Uniforms :
+        clim = (0., 1.) if clim is None else clim
+        assert len(clim) == 2
+        is_vmin = (vmin is not None) and (under is not None)
+        is_vmax = (vmax is not None) and (over is not None)
+        self.fcn['u_clim'] = (float(clim[0]), float(clim[1]))
+        self.fcn['u_isvmin'] = float(is_vmin)
+        self.fcn['u_vmin'] = float(vmin) if is_vmin else 0.
+        self.fcn['u_under'] = color2vb(under if is_vmin else None).ravel()
+        self.fcn['u_isvmax'] = float(is_vmax)
+        self.fcn['u_vmax'] = float(vmax) if is_vmax else 0.
+        self.fcn['u_over'] = color2vb(over if is_vmax else None).ravel()
+
+    def map(self, x):
+        """Apply the colormap on the CPU.
+
+        The computation is the same as the one of the shader.
+
+        Parameters
+        ----------
+        x : array_like
+            Array of data.
+
+        Returns
+        -------
+        color : array_like
+            Array of RGBA colors of shape (..., 4).
+        """
+        x = np.asarray(x, dtype=float)
+        c_min, c_max = self.fcn['u_clim'].value
+        t = np.zeros_like(x)
+        if c_max > c_min:
+            t = np.clip((x - c_min) / (c_max - c_min), 0., 1.)
+        # Nearest sampling of the LUT texture :
+        n_colors = len(self._lut_data)
+        idx = np.minimum((t * n_colors).astype(int), n_colors - 1)
+        color = self._lut_data[idx, :]
+        if self.fcn['u_isvmin'].value > .5:
+            color[x < self.fcn['u_vmin'].value, :] = self.fcn['u_under'].value
+        if self.fcn['u_isvmax'].value > .5:
+            color[x > self.fcn['u_vmax'].value, :] = self.fcn['u_over'].value
+        return color
+
+
+class ScalarImageVisual(Visual):
+    """Image visual colored on the GPU.
+
+    The image is a 2-D array of floats stored inside a single channel float
+    texture and drawn as a textured quad covering (0, 0) - (N, M). Colors are
+    obtained in the fragment shader using a `CmapLUT`.
+
+    Parameters
+    ----------
+    data : array_like | None
+        Image of shape (M, N).
+    interpolation : string | 'nearest'
+        Interpolation method ('nearest', 'bilinear' or one of the spatial
+        filters of vispy e.g 'bicubic', 'hanning', 'gaussian'...).
+    kwargs : dict | {}
+        Optional arguments are passed to the `set_colormap` method.
+    """
+
+    def __init__(self, data=None, interpolation='nearest', **kwargs):
+        """Init."""
+        self._data = self._texture = None
+        self._cmap_lut = CmapLUT(**kwargs)
+        # Spatial filters :
+        kernel, names = load_spatial_filters()
+        self._kernel = gloo.Texture2D(kernel, interpolation='nearest')
+        self._interp_filters = {k.lower(): k + '2D' for k in names}
+        self._interp_filters['bilinear'] = self._interp_filters.pop('linear')
+        self._interp_filters['bicubic'] = self._interp_filters.pop('cubic')
+        # Quad buffers :
+        self._pos_buffer = gloo.VertexBuffer(np.zeros((6, 2), np.float32))
+        self._tex_buffer = gloo.VertexBuffer(np.zeros((6, 2), np.float32))
+
+        Visual.__init__(self, vcode=IMAGE_VERT, fcode=IMAGE_FRAG)
+        self.shared_program['a_position'] = self._pos_buffer
+        self.shared_program['a_texcoord'] = self._tex_buffer
+        self.shared_program.frag['cmap'] = self._cmap_lut.fcn
+        self.shared_program['u_kernel'] = self._kernel
+        self.set_gl_state('translucent', cull_face=False)
+        self._draw_mode = 'triangles'
+        self.interpolation = interpolation
+        if data is not None:
+            self.set_data(data)
+        self.freeze()
+
+    def set_data(self, image):
+        """Set the image data.
+
+        The texture (and the quad) is only re-allocated if the shape of the
+        image changes.
+
+        Parameters
+        ----------
+        image : array_like
+            Image of shape (M, N).
+        """
+        data = np.asarray(image, dtype=np.float32)
+        assert data.ndim == 2
+        if (self._data is None) or (data.shape != self._data.shape):
+            n_rows, n_cols = data.shape
+            tex = np.array([[0, 0], [1, 0], [1, 1], [0, 0], [1, 1], [0, 1]],
+                           dtype=np.float32)
+            self._pos_buffer.set_data(tex * np.array([n_cols, n_rows],
+                                                     dtype=np.float32))
+            self._tex_buffer.set_data(tex)
+            self._texture = gloo.Texture2D(data[..., np.newaxis],
+                                           internalformat='r32f',
+                                           interpolation=self._tex_interp)
+            self._lookup['texture'] = self._texture
+            if 'shape' in self._lookup.template_vars:
+                self._lookup['shape'] = (n_cols, n_rows)
+        else:
+            self._texture.set_data(data[..., np.newaxis])
+        self._data = data
+        self.update()
+
+    def set_colormap(self, **kwargs):
+        """Update the colormap (see `CmapLUT.set_colormap`)."""
+        self._cmap_lut.set_colormap(**kwargs)
+        self.update()
+
+    def _compute_bounds(self, axis, view):
+        """Get the bounds of the image."""
+        if self._data is None:
+            return None
+        if axis > 1:
+            return (0, 0)
+        return (0, self._data.shape[1 - axis])
+
+    def _prepare_draw(self, view=None):
+        """Nothing to draw without data."""
+        return self._data is not None
+
+    @staticmethod
+    def _prepare_transforms(view):
+        """First rendering call."""
+        view.view_program.vert['transform'] = view.transforms.get_transform()
+
+    # ----------- INTERPOLATION -----------
+    @property
+    def interpolation(self):
+        """Get the interpolation value."""
+        return self._interpolation
+
+    @interpolation.setter
+    def interpolation(self, value):
+        """Set interpolation value."""
+        value = value.lower()
+        if value not in list(self._interp_filters.keys()):
+            raise ValueError("interpolation should be one of %s" % ', '.join(
+                sorted(self._interp_filters.keys())))
+        self._interpolation = value
+        if value in ['nearest', 'bilinear']:
+            self._lookup = Function(_TEXTURE_LOOKUP)
+            self._tex_interp = 'linear' if value == 'bilinear' else 'nearest'
+        else:
+            fcn = self._interp_filters[value]
+            self._lookup = Function(_FILTERED_LOOKUP % fcn)
+            self._tex_interp = 'nearest'
+        if self._texture is not None:
+            self._texture.interpolation = self._tex_interp
+            self._lookup['texture'] = self._texture
+            if 'shape' in self._lookup.template_vars:
+                self._lookup['shape'] = self._data.shape[::-1]
+        self.shared_program.frag['lookup'] = self._lookup
+        self.update()
+
+
+ScalarImage = create_visual_node(ScalarImageVisual)